@@ -1,173 +1,510 @@
+from collections import deque
 from heapq import heappush, heappop
-import pygame
+try:
+    import pygame
+except ImportError:  # Headless runs (see simulation.py) work without pygame
+    pygame = None
+from dstar_lite import DStarLite
+from hpa import HierarchicalPlanner
+from instrumentation import instrumented
+from jps import jump_point_search
+from path_cache import PathCache, cached_search
+from tour import INFINITY, distance_matrix, plan_tour, tour_cost
 
-class Agent(pygame.sprite.Sprite):
-    def __init__(self, environment, grid_size):
-        super().__init__()
-        self.image = pygame.Surface((grid_size, grid_size))
-        self.image.fill((0, 0, 255))  # Agent color is blue
-        self.rect = self.image.get_rect()
-        self.grid_size = grid_size
-        self.environment = environment
+# Algorithms the agent runs side by side. Adding one means adding its name here and a
+# find_nearest_task_<name> method; everything else is per-run state in an AlgorithmRun.
+ALGORITHMS = ("Astar", "UCS")
 
-        self.position_Astar = [0, 0]  # Starting at the top-left corner of the grid
-        self.rect.topleft = (0, 0)
+# AlgorithmRun fields that are also readable as <field>_<algorithm> on the agent (e.g. position_Astar)
+RUN_FIELDS = ("position", "path", "moving", "task_completed", "completed_tasks", "total_cost", "last_cost")
 
-        self.position_UCS = [0, 0]  # Starting at the top-left corner of the grid
 
+class AlgorithmRun:
+    """
+    The state of one algorithm's run: where it is, the path it is following, its costs, its
+    own view of the tasks, the map snapshot its last search read, and its own path cache and
+    search counters. The map and the task dict are shared with the other runs.
+    Fixed slots keep each run small and its attribute lookups fast.
+    """
+    __slots__ = ("name", "tasks", "world", "path_cache", "last_search_stats") + RUN_FIELDS
 
-        self.task_completed_Astar = 0
-        self.task_completed_UCS = 0
+    def __init__(self, name, tasks, start=(0, 0)):
+        self.name = name
+        self.tasks = tasks  # TaskOverlay: the shared tasks minus those this run completed
+        self.position = tuple(start)  # Positions are (x, y) tuples shared with the path, never copied
+        self.path = deque()  # Positions still to follow; popleft() is O(1) however long the path
+        self.moving = False  # Flag to indicate if the agent is moving
+        self.task_completed = 0
+        self.completed_tasks = []
+        self.total_cost = 0  # Cost accumulator for all moves
+        self.last_cost = 0  # Total cost when the last task was completed
+        self.world = None  # WorldSnapshot the latest search ran against
+        self.path_cache = PathCache()  # Set to None to always search from scratch
+        self.last_search_stats = {"expanded": 0, "pushes": 0, "pops": 0, "max_open_set": 0}  # Latest search
 
-        self.completed_tasks_Astar = []
-        self.completed_tasks_UCS = []
 
-        self.path_Astar = []  # List of positions to follow
-        self.moving_Astar = False  # Flag to indicate if the agent is moving
+def run_field(algorithm, field):
+    """Property mapping e.g. agent.position_Astar to agent.runs["Astar"].position."""
+    return property(lambda agent: getattr(agent.runs[algorithm], field),
+                    lambda agent, value: setattr(agent.runs[algorithm], field, value))
+
+
+class Agent(pygame.sprite.Sprite if pygame else object):
+    def __init__(self, environment, grid_size):
+        super().__init__()
+        if pygame:
+            self.image = pygame.Surface((grid_size, grid_size))
+            self.image.fill((0, 0, 255))  # Agent color is blue
+            self.rect = self.image.get_rect()
+        else:
+            self.image = self.rect = None  # Nothing to draw
+        self.grid_size = grid_size
+        self.environment = environment
+
+        # Every run starts at the top-left corner of the grid
+        self.runs = {algorithm: AlgorithmRun(algorithm, environment.task_overlay(algorithm)) for algorithm in ALGORITHMS}
+        self.place_sprite(self.position_Astar)
 
-        self.path_UCS = []  # List of positions to follow
-        self.moving_UCS = False  # Flag to indicate if the agent is moving
+        self.profiler = None  # Set to a SearchProfiler to record every search call
 
-        self.total_cost_Astar = 0  # Cost accumulator for all moves
-        self.total_cost_UCS = 0
+        self.planner_Astar = None  # Incremental planner, created on first use and kept between calls
+        self.hierarchy_Astar = None  # HPA* cluster graph, built on first use and kept between calls
 
-        self.last_cost_UCS = 0
-        self.last_cost_Astar = 0
+        self.tour_Astar = deque()  # Task positions still to visit in tour order (tour-planning mode)
+        self.tour_distance_cache = None  # (points and change counts, distance matrix) of the latest tour plan
 
-    def move_Astar(self):
-        """Move the agent along the path."""
-        if self.path_Astar:
-            next_position = self.path_Astar.pop(0)
-            self.position_Astar = list(next_position)
-            self.rect.topleft = (self.position_Astar[0] * self.grid_size, self.position_Astar[1] * self.grid_size)
-            self.total_cost_Astar += 1  # Increment cost for each move
-            self.check_task_completion_Astar()
-            return 1
+    def move(self, algorithm):
+        """Move the agent one step along the algorithm's path. Returns the step cost (0 if it stopped)."""
+        run = self.runs[algorithm]
+        if run.path:
+            next_position = run.path.popleft()
+            run.position = next_position
+            self.place_sprite(next_position)
+            step_cost = self.environment.terrain[self.environment.cell_index(*next_position)]
+            run.total_cost += step_cost  # Stepping onto a cell costs its terrain cost
+            self.check_task_completion(algorithm)
+            return step_cost
         else:
-            self.moving_Astar = False  # Stop moving when path is exhausted
+            run.moving = False  # Stop moving when path is exhausted
         return 0
 
+    def move_Astar(self):
+        return self.move("Astar")
+
     def move_UCS(self):
-        """Move the agent along the path."""
-        if self.path_UCS:
-            next_position = self.path_UCS.pop(0)
-            self.position_UCS = list(next_position)
-            self.rect.topleft = (self.position_UCS[0] * self.grid_size, self.position_UCS[1] * self.grid_size)
-            self.total_cost_UCS += 1  # Increment cost for each move
-            self.check_task_completion_UCS()
-            return 1
-        else:
-            self.moving_UCS = False  # Stop moving when path is exhausted
-        return 0
+        return self.move("UCS")
+
+    def place_sprite(self, position):
+        """Move the drawn sprite to a grid position (nothing to do without pygame)."""
+        if self.rect is not None:
+            self.rect.topleft = (position[0] * self.grid_size, position[1] * self.grid_size)
+
+    def check_task_completion(self, algorithm):
+        """Check if the algorithm's run has reached a task location."""
+        run = self.runs[algorithm]
+
+        if run.position in run.tasks:
+            task_number = self.environment.complete_task(run.tasks, run.position)
+            run.task_completed += 1
+            run.completed_tasks.append(f"{task_number} (Cost {run.total_cost - run.last_cost})")
+            run.last_cost = run.total_cost
 
     def check_task_completion_Astar(self):
-        """Check if the agent has reached a task location."""
-        position_tuple = tuple(self.position_Astar)
-        
-        if position_tuple in self.environment.task_locations_Astar:
-            task_number = self.environment.task_locations_Astar.pop(position_tuple)
-            self.task_completed_Astar += 1
-            self.completed_tasks_Astar.append(f"{task_number} (Cost {self.total_cost_Astar - self.last_cost_Astar})")
-            self.last_cost_Astar = self.total_cost_Astar
+        self.check_task_completion("Astar")
 
     def check_task_completion_UCS(self):
-        """Check if the agent has reached a task location."""
-        position_tuple = tuple(self.position_UCS)
-        
-        if position_tuple in self.environment.task_locations_UCS:
-            task_number = self.environment.task_locations_UCS.pop(position_tuple)
-            self.task_completed_UCS += 1
-            self.completed_tasks_UCS.append(f"{task_number} (Cost {self.total_cost_UCS - self.last_cost_UCS})")
-            self.last_cost_UCS = self.total_cost_UCS
-
-    def find_nearest_task_Astar(self):
-        """Find the nearest task using A* search."""
-        if not self.environment.task_locations_Astar:
-            self.path_Astar = []
-            self.moving_Astar = False
-            return
+        self.check_task_completion("UCS")
 
-        shortest_path = None
-        for task_position in self.environment.task_locations_Astar.keys():
-            path = self.find_path_to_Astar(task_position)
-            if path:
-                if not shortest_path or len(path) < len(shortest_path):
-                    shortest_path = path
-        if shortest_path:
-            self.path_Astar = shortest_path[1:]  # Exclude the current position
-            self.moving_Astar = True
+    def follow(self, algorithm, path):
+        """Start moving along a path from a search (it begins at the current position); None means stay."""
+        run = self.runs[algorithm]
+        if path:
+            run.path = deque(path)
+            run.path.popleft()  # Exclude the current position
+            run.moving = True
         else:
-            self.moving_Astar = []
+            run.path = deque()
+            run.moving = False
 
-    def find_nearest_task_UCS(self):
-        """Find the nearest task using A* search."""
-        if not self.environment.task_locations_UCS:
-            self.path_UCS = []
-            self.moving_UCS= False
+    def find_nearest_task(self, algorithm):
+        """Head for the nearest remaining task with the algorithm's own search."""
+        getattr(self, "find_nearest_task_" + algorithm)()
+
+    def find_nearest_task_Astar(self, engine="astar"):
+        """Find the nearest task using A* search ("astar"), Jump Point Search ("jps") or HPA* ("hpa")."""
+        tasks = self.runs["Astar"].tasks
+        if not tasks:
+            self.follow("Astar", None)
             return
 
-        shortest_path = None
-        for task_position in self.environment.task_locations_UCS.keys():
-            path = self.find_path_to_UCS(task_position)
+        # In tour-planning mode head for the next task of the tour instead of the nearest one
+        while self.tour_Astar:
+            target = self.tour_Astar[0]
+            path = self.find_path_to_Astar(target) if target in tasks else None
             if path:
-                if not shortest_path or len(path) < len(shortest_path):
-                    shortest_path = path
-        if shortest_path:
-            self.path_UCS = shortest_path[1:]  # Exclude the current position
-            self.moving_UCS = True
+                self.follow("Astar", path)
+                return
+            self.tour_Astar.popleft()  # Already completed on the way, or no longer reachable
+
+        if engine == "jps":
+            shortest_path = self.find_path_to_nearest_JPS(tasks)
+        elif engine == "hpa":
+            shortest_path = self.find_path_to_nearest_HPA(tasks)
         else:
-            self.moving_UCS = []
+            shortest_path = self.find_path_to_nearest_Astar(tasks)
+        self.follow("Astar", shortest_path)
+
+    def plan_task_tour_Astar(self):
+        """
+        Plan the order in which to visit all reachable tasks and switch to tour-planning mode.
+        Distances between the agent and every task come from one search per source cell and
+        are cached; the order is exact (Held-Karp) for small task counts and nearest insertion
+        + 2-opt otherwise. Returns the planned tour cost.
+        """
+        run = self.runs["Astar"]
+        world = self.search_world(run)
+        start = tuple(run.position)
+        # Walled-off tasks are left out up front so the distance searches never flood for them
+        points = [start] + [task for task in run.tasks if world.is_reachable(start, task)]
+        matrix = self.task_distance_matrix(world, points)
+        reachable = [0] + [index for index in range(1, len(points)) if matrix[0][index] < INFINITY]
+        reachable_matrix = [[matrix[a][b] for b in reachable] for a in reachable]
+        order = plan_tour(reachable_matrix)
+        self.tour_Astar = deque(points[reachable[index]] for index in order)
+        return tour_cost(order, reachable_matrix)
+
+    def task_distance_matrix(self, world, points):
+        """
+        Pairwise distances between points on a map snapshot, cached until the points, the
+        barriers or the terrain change. Only the latest matrix is kept: an older one is never
+        asked for again.
+        """
+        key = (tuple(points), world.occupancy, world.terrain)  # Map bytes: equal until barriers or terrain change
+        if self.tour_distance_cache is None or self.tour_distance_cache[0] != key:
+            self.tour_distance_cache = (key, distance_matrix(world, points))
+        return self.tour_distance_cache[1]
+
+    def find_nearest_task_incremental(self):
+        """
+        Find the nearest task with the incremental D* Lite planner.
+        The planner keeps its search state between calls and picks up barrier changes from
+        the environment, so replanning after small changes only repairs the affected cells.
+        """
+        tasks = self.runs["Astar"].tasks
+        if not tasks:
+            self.follow("Astar", None)
+            return
+
+        if self.planner_Astar is None:
+            self.planner_Astar = DStarLite(self.environment)
+        planner = self.planner_Astar
+        shortest_path = self.finish_search(self.runs["Astar"], planner.plan(tuple(self.position_Astar), tasks),
+                                           planner.expanded, planner.pushes)
+        self.follow("Astar", shortest_path)
+
+    def find_nearest_task_UCS(self):
+        """Find the nearest task using uniform cost search."""
+        tasks = self.runs["UCS"].tasks
+        if not tasks:
+            self.follow("UCS", None)
+            return
+        self.follow("UCS", self.find_path_to_nearest_UCS(tasks))
 
+    @instrumented("Astar")
+    @cached_search("Astar")
     def find_path_to_Astar(self, target):
-        """Find a path to the target position using A* search."""
-        start = tuple(self.position_Astar)
-        goal = target
+        """
+        Find a path to the target position using A* search. Stepping onto a cell costs its
+        terrain cost, so the Manhattan heuristic is scaled by the cheapest cost to stay admissible.
+        """
+        run = self.runs["Astar"]
+        world = self.search_world(run)
+        if not world.is_within_bounds(*target) or not world.is_reachable(run.position, target):
+            return self.finish_search(run, None, 0, 0)  # Walled off: no need to flood the region to find out
+        columns = world.columns
+        table, counts = world.neighbor_table, world.neighbor_count
+        terrain, scale = world.terrain, world.min_terrain_cost
+        start = world.cell_index(*run.position)
+        goal = world.cell_index(*target)
+        goal_x, goal_y = target
         open_set = []
-        heappush(open_set, (0, start))  # Priority queue with (cost, position)
+        heappush(open_set, (0, start))  # Priority queue with (cost, cell id)
         came_from = {}
         g_score = {start: 0}
-        f_score = {start: self.heuristic(start, goal)}
-
+        expanded, pushes = 0, 1  # The start cell is the first push
+        largest = 1  # Largest open-set size seen
         while open_set:
             _, current = heappop(open_set)
 
             if current == goal:
-                path = [current]
-                while current in came_from:
-                    current = came_from[current]
-                    path.append(current)
-                path.reverse()  # Reverse the path to get the order from start to goal
-                return path
-
-            for neighbor in self.get_neighbors(*current):
-                tentative_g_score = g_score[current] + 1  # Each move has a cost of 1
+                return self.finish_search(run, self.reconstruct_path(world, came_from, current), expanded, pushes,
+                                          pushes - len(open_set), largest)
 
+            current_g_score = g_score[current]
+            expanded += 1
+            base = 4 * current
+            for neighbor in table[base:base + counts[current]]:
+                tentative_g_score = current_g_score + terrain[neighbor]
                 if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
                     came_from[neighbor] = current
                     g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = tentative_g_score + self.heuristic(neighbor, goal)
-                    heappush(open_set, (f_score[neighbor], neighbor))
+                    ny, nx = divmod(neighbor, columns)
+                    heappush(open_set, (tentative_g_score + scale * (abs(nx - goal_x) + abs(ny - goal_y)), neighbor))
+                    pushes += 1
+            if len(open_set) > largest:
+                largest = len(open_set)
 
-        return None  # No path found
+        return self.finish_search(run, None, expanded, pushes, pushes - len(open_set), largest)  # No path found
 
+    @instrumented("UCS")
+    @cached_search("UCS")
     def find_path_to_UCS(self, target):
-        """Find a path to the target position using UCS."""
-        start = tuple(self.position_UCS)
-        goal = target
-        queue = [(0, start, [start])]
-        visited = set()
-
-        while queue:
-            cost, vertex, path = heappop(queue)
-            if vertex in visited:
-                continue
-            visited.add(vertex)
+        """
+        Find a path to the target position using UCS (Dijkstra over the terrain costs).
+        Step costs are small integers, so the frontier is a ring of cost buckets (Dial's
+        algorithm, see bucket_queue.py) instead of a heap.
+        """
+        run = self.runs["UCS"]
+        world = self.search_world(run)
+        if not world.is_within_bounds(*target) or not world.is_reachable(run.position, target):
+            return self.finish_search(run, None, 0, 0)  # Walled off: no need to flood the region to find out
+        table, counts = world.neighbor_table, world.neighbor_count
+        terrain = world.terrain
+        start = world.cell_index(*run.position)
+        goal = world.cell_index(*target)
+        # Bucket queue inlined in this hot loop: pending costs lie within max step cost of the current one
+        ring = world.max_terrain_cost + 1
+        buckets = [[] for _ in range(ring)]
+        buckets[0].append(start)
+        cost = 0
+        came_from = {}
+        best_cost_to = {start: 0}
+        expanded, pushes, pops = 0, 1, 0  # The start cell is the first push
+        largest = 1  # Largest open-set size seen
+        while pops < pushes:
+            bucket = buckets[cost % ring]
+            while not bucket:
+                cost += 1
+                bucket = buckets[cost % ring]
+            vertex = bucket.pop()
+            pops += 1
+            if cost > best_cost_to[vertex]:
+                continue  # A cheaper entry for this cell was already expanded
             if vertex == goal:
-                return path
-            for neighbor in self.get_neighbors(*vertex):
-                heappush(queue, (cost + 1, neighbor, path + [neighbor]))
-        return None
+                return self.finish_search(run, self.reconstruct_path(world, came_from, vertex), expanded, pushes, pops,
+                                          largest)
+            expanded += 1
+            base = 4 * vertex
+            for neighbor in table[base:base + counts[vertex]]:
+                # Only push a neighbor when this route beats the best cost seen so far
+                new_cost = cost + terrain[neighbor]
+                if new_cost < best_cost_to.get(neighbor, new_cost + 1):
+                    best_cost_to[neighbor] = new_cost
+                    came_from[neighbor] = vertex
+                    buckets[new_cost % ring].append(neighbor)
+                    pushes += 1
+            if pushes - pops > largest:
+                largest = pushes - pops
+        return self.finish_search(run, None, expanded, pushes, pops, largest)
+
+
+    @instrumented("Astar")
+    @cached_search("Astar")
+    def find_path_to_nearest_Astar(self, targets):
+        """Find a path to the closest of several targets with a single A* search.
+
+        The heuristic is the Manhattan distance to the nearest target times the cheapest
+        terrain cost, which stays admissible and consistent, so the first target popped is
+        a closest one.
+        Targets at the same distance are resolved in the order of ``targets`` so the
+        result matches searching each target separately and keeping the shortest.
+        """
+        run = self.runs["Astar"]
+        world = self.search_world(run)
+        columns = world.columns
+        table, counts = world.neighbor_table, world.neighbor_count
+        terrain, scale = world.terrain, world.min_terrain_cost
+        order = self.target_order(world, targets, run.position)
+        if not order:
+            return self.finish_search(run, None, 0, 0)
+        goal_positions = [world.cell_position(cell) for cell in order]
+        start = world.cell_index(*run.position)
+        open_set = []
+        heappush(open_set, (scale * self.nearest_heuristic(tuple(run.position), goal_positions), start))
+        came_from = {}
+        g_score = {start: 0}
+        best_goal = None
+        best_cost = None
+        expanded, pushes = 0, 1  # The start cell is the first push
+        largest = 1  # Largest open-set size seen
+        while open_set:
+            f, current = heappop(open_set)
+            if best_cost is not None and f > best_cost:
+                break  # Every remaining entry is farther than the goals found
+            if current in order:
+                cost = g_score[current]
+                if best_cost is None or (cost == best_cost and order[current] < order[best_goal]):
+                    best_goal, best_cost = current, cost
+                continue
+
+            current_g_score = g_score[current]
+            expanded += 1
+            base = 4 * current
+            for neighbor in table[base:base + counts[current]]:
+                tentative_g_score = current_g_score + terrain[neighbor]
+                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    ny, nx = divmod(neighbor, columns)
+                    estimate = scale * self.nearest_heuristic((nx, ny), goal_positions)
+                    heappush(open_set, (tentative_g_score + estimate, neighbor))
+                    pushes += 1
+            if len(open_set) > largest:
+                largest = len(open_set)
+
+        if best_goal is None:
+            # No target is reachable
+            return self.finish_search(run, None, expanded, pushes, pushes - len(open_set), largest)
+        return self.finish_search(run, self.reconstruct_path(world, came_from, best_goal), expanded, pushes,
+                                  pushes - len(open_set), largest)
+
+    @instrumented("UCS")
+    @cached_search("UCS")
+    def find_path_to_nearest_UCS(self, targets):
+        """Find a path to the closest of several targets with a single UCS (bucket queue) expansion."""
+        run = self.runs["UCS"]
+        world = self.search_world(run)
+        table, counts = world.neighbor_table, world.neighbor_count
+        terrain = world.terrain
+        order = self.target_order(world, targets, run.position)
+        if not order:
+            return self.finish_search(run, None, 0, 0)
+        start = world.cell_index(*run.position)
+        ring = world.max_terrain_cost + 1
+        buckets = [[] for _ in range(ring)]
+        buckets[0].append(start)
+        cost = 0
+        came_from = {}
+        best_cost_to = {start: 0}
+        best_goal = None
+        best_cost = None
+        expanded, pushes, pops = 0, 1, 0  # The start cell is the first push
+        largest = 1  # Largest open-set size seen
+        while pops < pushes:
+            bucket = buckets[cost % ring]
+            while not bucket:
+                cost += 1
+                bucket = buckets[cost % ring]
+            if best_cost is not None and cost > best_cost:
+                break  # Every remaining entry is farther than the goals found
+            vertex = bucket.pop()
+            pops += 1
+            if cost > best_cost_to[vertex]:
+                continue  # A cheaper entry for this cell was already expanded
+            if vertex in order:
+                if best_cost is None or order[vertex] < order[best_goal]:
+                    best_goal, best_cost = vertex, cost
+                continue
+            expanded += 1
+            base = 4 * vertex
+            for neighbor in table[base:base + counts[vertex]]:
+                new_cost = cost + terrain[neighbor]
+                if new_cost < best_cost_to.get(neighbor, new_cost + 1):
+                    best_cost_to[neighbor] = new_cost
+                    came_from[neighbor] = vertex
+                    buckets[new_cost % ring].append(neighbor)
+                    pushes += 1
+            if pushes - pops > largest:
+                largest = pushes - pops
+
+        if best_goal is None:
+            return self.finish_search(run, None, expanded, pushes, pops, largest)  # No target is reachable
+        return self.finish_search(run, self.reconstruct_path(world, came_from, best_goal), expanded, pushes, pops,
+                                  largest)
+
+    def find_path_to_JPS(self, target):
+        """Find a path to the target position using Jump Point Search."""
+        return self.find_path_to_nearest_JPS([target])
+
+    @instrumented("Astar")
+    @cached_search("Astar")
+    def find_path_to_nearest_JPS(self, targets):
+        """
+        Find a path to the closest of several targets with a single Jump Point Search.
+        Jumping over straight runs assumes every step costs the same, so on mixed terrain
+        this falls back to A*.
+        """
+        run = self.runs["Astar"]
+        world = self.search_world(run)
+        if not world.uniform_terrain:
+            return self.find_path_to_nearest_Astar(targets)
+        order = self.target_order(world, targets, run.position)
+        if not order:
+            return self.finish_search(run, None, 0, 0)
+        path, expanded, pushes, pops, largest = jump_point_search(world, tuple(run.position), order)
+        return self.finish_search(run, path, expanded, pushes, pops, largest)
+
+    def find_path_to_HPA(self, target):
+        """Find a near-optimal path to the target position with hierarchical search (HPA*)."""
+        return self.find_path_to_nearest_HPA([target])
+
+    @instrumented("Astar")
+    @cached_search("Astar")
+    def find_path_to_nearest_HPA(self, targets):
+        """
+        Find a near-optimal path to the closest of several targets with HPA*. The cluster
+        graph is built on the first call and only the changed clusters are rebuilt later.
+        """
+        run = self.runs["Astar"]
+        world = self.search_world(run)
+        order = self.target_order(world, targets, run.position)
+        if not order:
+            return self.finish_search(run, None, 0, 0)
+        if self.hierarchy_Astar is None:
+            self.hierarchy_Astar = HierarchicalPlanner(self.environment)
+        start = world.cell_index(*run.position)
+        path, expanded, pushes, pops, largest = self.hierarchy_Astar.plan(start, order)
+        return self.finish_search(run, path, expanded, pushes, pops, largest)
+
+    def search_world(self, run):
+        """
+        Point a run at the current snapshot of the map and return it. A search reads only that
+        snapshot, so changes to the live map cannot reach it halfway, and runs share one
+        snapshot until the map changes.
+        """
+        run.world = self.environment.snapshot()
+        return run.world
+
+    def finish_search(self, run, result, expanded, pushes, pops=0, largest_open_set=0):
+        """Record the counters of the run's search that just ran and pass its result through."""
+        run.last_search_stats = {"expanded": expanded, "pushes": pushes, "pops": pops,
+                                 "max_open_set": largest_open_set}
+        return result
+
+    def target_order(self, world, targets, start):
+        """
+        Map the cell id of each target that can be reached from start to its position in
+        ``targets``. Out-of-bounds and walled-off targets are dropped before any search runs.
+        """
+        order = {}
+        for index, target in enumerate(targets):
+            if world.is_within_bounds(*target) and world.is_reachable(start, target):
+                order.setdefault(world.cell_index(*target), index)
+        return order
+
+    def reconstruct_path(self, world, came_from, current):
+        """Walk the came-from links back to the start and return the path as positions."""
+        path = [current]
+        while current in came_from:
+            current = came_from[current]
+            path.append(current)
+        path.reverse()
+        return [world.cell_position(cell) for cell in path]
 
+    def nearest_heuristic(self, position, targets):
+        """Manhattan distance to the closest of several targets."""
+        x, y = position
+        return min(abs(x - tx) + abs(y - ty) for tx, ty in targets)
 
     def heuristic(self, position, goal):
         """Calculate Manhattan distance as the heuristic."""
@@ -175,14 +512,11 @@ class Agent(pygame.sprite.Sprite):
 
     def get_neighbors(self, x, y):
         """Get walkable neighboring positions."""
-        neighbors = []
-        directions = [("up", (0, -1)), ("down", (0, 1)), ("left", (-1, 0)), ("right", (1, 0))]
-        for _, (dx, dy) in directions:
-            nx, ny = x + dx, y + dy
-            if self.environment.is_within_bounds(nx, ny) and not self.environment.is_barrier(nx, ny):
-                neighbors.append((nx, ny))
-        return neighbors
-    
-    
+        environment = self.environment
+        return [environment.cell_position(cell) for cell in environment.neighbor_cells(environment.cell_index(x, y))]
 
 
+# Old per-algorithm attribute names (position_Astar, path_UCS, ...) read and write the runs
+for algorithm in ALGORITHMS:
+    for field in RUN_FIELDS:
+        setattr(Agent, f"{field}_{algorithm}", run_field(algorithm, field))
@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from benchmarks import (cache, fleet, following, hpa, jps, memory, profiling, replanning, scaling, simulation,
+                        sweep, tour, trajectory)
+
+# Suite name -> module with main(args) and, for suites with options, add_arguments(parser)
+SUITES = {
+    "sweep": sweep,
+    "scaling": scaling,
+    "memory": memory,
+    "replanning": replanning,
+    "tour": tour,
+    "jps": jps,
+    "cache": cache,
+    "fleet": fleet,
+    "simulation": simulation,
+    "hpa": hpa,
+    "profile": profiling,
+    "trajectory": trajectory,
+    "following": following,
+}
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in SUITES and argv[0] not in ("-h", "--help"):
+        argv.insert(0, "sweep")  # Options without a suite name go to the default sweep
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the Lab_Task_2 pathfinding code.")
+    suites = parser.add_subparsers(dest="suite", metavar="suite", required=True)
+    for name, module in SUITES.items():
+        suite_parser = suites.add_parser(name, help=module.__doc__, description=module.__doc__)
+        if hasattr(module, "add_arguments"):
+            module.add_arguments(suite_parser)
+    args = parser.parse_args(argv)
+    SUITES[args.suite].main(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Headless benchmark suites for the Lab_Task_2 pathfinding code, one module per suite (run them with benchmark.py)."""
@@ -0,0 +1,42 @@
+"""Repeated planning on a static map with the path cache, then after one barrier change."""
+from agent import Agent
+from benchmarks.common import GRID_SIZE, random_environment, time_call
+
+CACHE_SIZE = 200
+CACHE_REPEATS = 50
+
+
+def repeated_planning(size=CACHE_SIZE, repeats=CACHE_REPEATS):
+    """
+    Plan the same nearest-task and per-task searches again and again on a static map.
+    Returns (first pass seconds, mean repeated pass seconds, seconds after the change,
+    {run name: cache stats}); the change flips one barrier to show the version change
+    forcing fresh searches.
+    """
+    environment = random_environment(size, 20)
+    agent = Agent(environment, GRID_SIZE)
+    tasks = environment.task_locations_Astar
+
+    def plan():
+        agent.find_path_to_nearest_Astar(tasks)
+        for task_position in tasks:
+            agent.find_path_to_UCS(task_position)
+
+    _, first_time = time_call(plan)
+    repeated_time = sum(time_call(plan)[1] for _ in range(repeats)) / repeats
+    if environment.is_barrier(size - 1, size - 1):
+        environment.remove_barrier(size - 1, size - 1)
+    else:
+        environment.add_barrier(size - 1, size - 1)
+    _, changed_time = time_call(plan)
+    return first_time, repeated_time, changed_time, {name: run.path_cache.stats() for name, run in agent.runs.items()}
+
+
+def main(args):
+    first_time, repeated_time, changed_time, run_stats = repeated_planning()
+    print(f"first plan:            {first_time * 1000:10.2f} ms")
+    print(f"repeated plan (mean):  {repeated_time * 1000:10.2f} ms")
+    print(f"after barrier change:  {changed_time * 1000:10.2f} ms")
+    for name, stats in run_stats.items():
+        print(f"{name} cache: {stats['hits']} hits, {stats['misses']} misses, hit rate {stats['hit_rate']:.1%}, "
+              f"{stats['size']}/{stats['maxsize']} entries")
@@ -0,0 +1,54 @@
+"""Constants and helpers shared by the benchmark suites."""
+import os
+import time
+import tracemalloc
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from agent import Agent
+from environment import Environment
+
+# Constants shared by the suites
+GRID_SIZE = 1
+BARRIER_RATIO = 0.2
+SEED = 366
+SEEDS = [SEED, SEED + 1, SEED + 2]
+
+
+def random_environment(size, num_tasks, density=BARRIER_RATIO, seed=SEED, **options):
+    """Seeded square environment of size x size cells with density of them barriers."""
+    return Environment(size * GRID_SIZE, size * GRID_SIZE, GRID_SIZE, num_tasks=num_tasks,
+                       num_barriers=int(size * size * density), seed=seed, **options)
+
+
+def uncached_agent(environment):
+    """Agent without a path cache, so every call measures a real search."""
+    agent = Agent(environment, GRID_SIZE)
+    for run in agent.runs.values():
+        run.path_cache = None
+    return agent
+
+
+def path_cost(environment, path):
+    """Summed terrain cost of the steps of path (the start cell is free), or None for no path."""
+    if not path:
+        return None
+    terrain = environment.terrain
+    return sum(terrain[environment.cell_index(*position)] for position in path[1:])
+
+
+def time_call(function, *args):
+    """Run function once and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def peak_memory(function, *args):
+    """Run function once and return (result, peak bytes allocated while it ran)."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        result = function(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
@@ -0,0 +1,38 @@
+"""Multi-agent fleet planning with one worker against every core."""
+import os
+from fleet import Fleet
+from benchmarks.common import random_environment, time_call
+
+FLEET_SIZE = 100
+FLEET_AGENT_COUNTS = [10, 50, 100]
+FLEET_TASKS = 200
+
+
+def fleet_planning(agent_counts=FLEET_AGENT_COUNTS, size=FLEET_SIZE, num_tasks=FLEET_TASKS):
+    """
+    Plan a whole fleet with one worker and with every core. Returns per agent count:
+    (serial seconds, parallel seconds, workers, makespan, collisions, unassigned tasks).
+    """
+    rows_out = []
+    workers = os.cpu_count() or 1
+    for agent_count in agent_counts:
+        environment = random_environment(size, num_tasks)
+        free_cells = [(x, y) for y in range(environment.rows) for x in range(environment.columns)
+                      if not environment.is_barrier(x, y) and (x, y) not in environment.task_locations_Astar]
+        starts = environment.random.sample(free_cells, agent_count)
+
+        serial = Fleet(environment, starts, workers=1)
+        _, serial_time = time_call(serial.plan)
+        parallel = Fleet(environment, starts, workers=workers)
+        _, parallel_time = time_call(parallel.plan)
+        rows_out.append((agent_count, serial_time, parallel_time, workers, parallel.makespan(),
+                         len(parallel.collisions()), len(parallel.unassigned)))
+    return rows_out
+
+
+def main(args):
+    print(f"{'agents':>6} {'1 worker (s)':>13} {'all workers (s)':>16} {'workers':>8} {'makespan':>9} "
+          f"{'collisions':>11} {'unassigned':>11}")
+    for agent_count, serial_time, parallel_time, workers, makespan, collisions, unassigned in fleet_planning():
+        print(f"{agent_count:>6} {serial_time:>13.2f} {parallel_time:>16.2f} {workers:>8} {makespan:>9} "
+              f"{collisions:>11} {unassigned:>11}")
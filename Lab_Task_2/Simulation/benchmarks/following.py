@@ -0,0 +1,60 @@
+"""Per-step cost of path following as the path grows, against the old list.pop(0) follower."""
+from agent import Agent
+from environment import Environment
+from benchmarks.common import GRID_SIZE, time_call
+
+FOLLOW_PATH_LENGTHS = [1000, 10000, 100000]
+
+
+def serpentine_path(columns, length):
+    """A path of length cells snaking row by row across an open grid, starting at (0, 0)."""
+    path = []
+    for index in range(length):
+        y, x = divmod(index, columns)
+        path.append((x if y % 2 == 0 else columns - 1 - x, y))
+    return path
+
+
+def follow_with_list_pops(agent, path):
+    """Reference path following as it used to be: list.pop(0) and a list copy of every position."""
+    run = agent.runs["Astar"]
+    environment = agent.environment
+    remaining = path[1:]
+    while remaining:
+        next_position = remaining.pop(0)
+        position = list(next_position)
+        agent.place_sprite(position)
+        run.total_cost += environment.terrain[environment.cell_index(*next_position)]
+        if tuple(position) in run.tasks:
+            agent.check_task_completion("Astar")
+
+
+def follow_with_moves(agent, path):
+    """Follow the path one Agent.move() at a time."""
+    agent.follow("Astar", path)
+    run = agent.runs["Astar"]
+    while run.path:
+        agent.move("Astar")
+
+
+def path_following(path_lengths=FOLLOW_PATH_LENGTHS):
+    """
+    Per-step time of following a path of each length with Agent.move() and with the old
+    list.pop(0) follower. Returns per length: (length, move seconds per step, list-pop seconds per step).
+    """
+    rows_out = []
+    for length in path_lengths:
+        side = int(length ** 0.5) + 1
+        environment = Environment(side, side, GRID_SIZE, num_tasks=0, num_barriers=0)
+        path = serpentine_path(side, length)
+        steps = length - 1
+        _, move_time = time_call(follow_with_moves, Agent(environment, GRID_SIZE), path)
+        _, pop_time = time_call(follow_with_list_pops, Agent(environment, GRID_SIZE), path)
+        rows_out.append((length, move_time / steps, pop_time / steps))
+    return rows_out
+
+
+def main(args):
+    print(f"{'path length':>11} {'move (us/step)':>15} {'list.pop(0) (us/step)':>22}")
+    for length, move_time, pop_time in path_following():
+        print(f"{length:>11} {move_time * 1e6:>15.3f} {pop_time * 1e6:>22.3f}")
@@ -0,0 +1,53 @@
+"""HPA* against flat A* on large maps: build and rebuild time, query latency and path cost / optimal cost."""
+from hpa import HierarchicalPlanner
+from benchmarks.common import path_cost, random_environment, time_call, uncached_agent
+
+HPA_SIZES = [128, 256, 512]
+HPA_QUERIES = 20
+HPA_CHANGES = 5  # Barriers flipped before the rebuild
+
+
+def hierarchical_against_astar(sizes=HPA_SIZES, queries=HPA_QUERIES, changes=HPA_CHANGES):
+    """
+    HPA* against flat A* on random start/goal pairs. Returns per size: (build seconds, abstract
+    nodes, rebuild seconds after a few barrier changes, mean HPA* query seconds, mean A* query
+    seconds, mean and worst HPA* cost / optimal cost).
+    """
+    rows_out = []
+    for size in sizes:
+        environment = random_environment(size, 1)
+        rng = environment.random
+        planner, build_time = time_call(HierarchicalPlanner, environment)
+        for _ in range(changes):
+            x, y = rng.randrange(size), rng.randrange(size)
+            if environment.is_barrier(x, y):
+                environment.remove_barrier(x, y)
+            else:
+                environment.add_barrier(x, y)
+        _, rebuild_time = time_call(planner.apply_changes)
+
+        agent = uncached_agent(environment)
+        hpa_times, astar_times, ratios = [], [], []
+        while len(ratios) < queries:
+            start, goal = rng.randrange(size * size), rng.randrange(size * size)
+            if environment.occupancy[start] or environment.occupancy[goal] or start == goal:
+                continue
+            (path, *_), hpa_time = time_call(planner.plan, start, {goal: 0})
+            agent.position_Astar = environment.cell_position(start)
+            optimal, astar_time = time_call(agent.find_path_to_Astar, environment.cell_position(goal))
+            assert (path is None) == (optimal is None), "HPA* and A* disagree on reachability"
+            if optimal:
+                hpa_times.append(hpa_time)
+                astar_times.append(astar_time)
+                ratios.append(path_cost(environment, path) / path_cost(environment, optimal))
+        rows_out.append((size, build_time, len(planner.edges), rebuild_time, sum(hpa_times) / queries,
+                         sum(astar_times) / queries, sum(ratios) / queries, max(ratios)))
+    return rows_out
+
+
+def main(args):
+    print(f"{'size':>5} {'build (s)':>10} {'nodes':>7} {'rebuild (ms)':>13} {'HPA* (ms)':>10} {'A* (ms)':>8} "
+          f"{'mean ratio':>11} {'max ratio':>10}")
+    for size, build_time, nodes, rebuild_time, hpa_time, astar_time, mean_ratio, max_ratio in hierarchical_against_astar():
+        print(f"{size:>5} {build_time:>10.2f} {nodes:>7} {rebuild_time * 1000:>13.2f} {hpa_time * 1000:>10.2f} "
+              f"{astar_time * 1000:>8.2f} {mean_ratio:>11.4f} {max_ratio:>10.4f}")
@@ -0,0 +1,38 @@
+"""Jump Point Search against A*: path cost (must match) and node expansions."""
+from benchmarks.common import SEEDS, path_cost, random_environment, time_call, uncached_agent
+
+JPS_SIZES = [50, 100, 200, 400]
+JPS_BARRIER_DENSITIES = [0.0, 0.1, 0.3]
+
+
+def jps_against_astar(sizes=JPS_SIZES, barrier_densities=JPS_BARRIER_DENSITIES, seeds=SEEDS):
+    """
+    Nearest-task search with A* and with Jump Point Search on seeded environments.
+    Both must return the same path cost; JPS should expand far fewer nodes on open maps.
+    """
+    rows_out = []
+    for size in sizes:
+        for density in barrier_densities:
+            for seed in seeds:
+                environment = random_environment(size, 5, density, seed)
+                agent = uncached_agent(environment)
+                tasks = environment.task_locations_Astar
+                astar_path, astar_time = time_call(agent.find_path_to_nearest_Astar, tasks)
+                astar_expanded = agent.runs["Astar"].last_search_stats["expanded"]
+                jps_path, jps_time = time_call(agent.find_path_to_nearest_JPS, tasks)
+                jps_expanded = agent.runs["Astar"].last_search_stats["expanded"]
+
+                astar_cost = path_cost(environment, astar_path)
+                jps_cost = path_cost(environment, jps_path)
+                if astar_cost != jps_cost:  # Not an assert: python -O must not skip the check
+                    raise RuntimeError(f"cost mismatch on seed {seed}: {astar_cost} != {jps_cost}")
+                rows_out.append((size, density, seed, astar_cost, astar_expanded, jps_expanded, astar_time, jps_time))
+    return rows_out
+
+
+def main(args):
+    print(f"{'size':>5} {'density':>8} {'seed':>5} {'cost':>5} {'A* expanded':>12} {'JPS expanded':>13} "
+          f"{'A* (ms)':>8} {'JPS (ms)':>9}")
+    for size, density, seed, cost, astar_expanded, jps_expanded, astar_time, jps_time in jps_against_astar():
+        print(f"{size:>5} {density:>8} {seed:>5} {str(cost):>5} {astar_expanded:>12} {jps_expanded:>13} "
+              f"{astar_time * 1000:>8.2f} {jps_time * 1000:>9.2f}")
@@ -0,0 +1,71 @@
+"""UCS absolute peak allocation and run time as the path gets longer on a map of fixed size, against a path-copying UCS."""
+from heapq import heappush, heappop
+from environment import Environment
+from benchmarks.common import GRID_SIZE, peak_memory, time_call, uncached_agent
+
+MEMORY_SIDE = 121
+CORRIDOR_WIDTHS = [MEMORY_SIDE, 15, 7, 3, 1]  # The full width is the open grid; narrower lanes make longer paths
+
+
+def serpentine_corridor(side, width):
+    """
+    side x side grid split by barrier rows into lanes width cells high, joined by a one-cell
+    gap at alternating ends. Returns (environment, far end of the last lane). The path from
+    (0, 0) to the far end snakes through every lane, so narrower lanes give a longer path
+    through about the same number of open cells.
+    """
+    environment = Environment(side * GRID_SIZE, side * GRID_SIZE, GRID_SIZE, num_tasks=0, num_barriers=0)
+    walls = range(width, side, width + 1)
+    for index, y in enumerate(walls):
+        gap = side - 1 if index % 2 == 0 else 0
+        for x in range(side):
+            if x != gap:
+                environment.add_barrier(x, y)
+    return environment, (side - 1 if len(walls) % 2 == 0 else 0, side - 1)
+
+
+def ucs_with_path_copies(agent, target):
+    """Reference UCS that stores a copy of the whole path in every heap entry."""
+    environment = agent.environment
+    start = environment.cell_index(*agent.position_UCS)
+    goal = environment.cell_index(*target)
+    queue = [(0, start, [start])]
+    visited = set()
+    while queue:
+        cost, vertex, path = heappop(queue)
+        if vertex in visited:
+            continue
+        visited.add(vertex)
+        if vertex == goal:
+            return path
+        for neighbor in environment.neighbor_cells(vertex):
+            heappush(queue, (cost + 1, neighbor, path + [neighbor]))
+    return None
+
+
+def ucs_memory_profile(side=MEMORY_SIDE, widths=CORRIDOR_WIDTHS):
+    """
+    Absolute peak allocation and run time of UCS through serpentine_corridor() layouts of one
+    size, from (0, 0) to the far end. The explored area stays about the same while the path
+    gets longer, so the peak of the parent-pointer UCS should stay flat. Returns per width:
+    (width, path length, open cells, peak bytes, path-copy peak bytes, seconds, path-copy seconds).
+    """
+    rows_out = []
+    for width in widths:
+        environment, target = serpentine_corridor(side, width)
+        agent = uncached_agent(environment)
+        path, parent_peak = peak_memory(agent.find_path_to_UCS, target)
+        _, copy_peak = peak_memory(ucs_with_path_copies, agent, target)
+        _, parent_time = time_call(agent.find_path_to_UCS, target)
+        _, copy_time = time_call(ucs_with_path_copies, agent, target)
+        open_cells = side * side - len(environment.barrier_locations)
+        rows_out.append((width, len(path) - 1, open_cells, parent_peak, copy_peak, parent_time, copy_time))
+    return rows_out
+
+
+def main(args):
+    print(f"{'lane width':>10} {'path length':>11} {'open cells':>10} {'peak (KB)':>10} {'peak (copies)':>14} "
+          f"{'ms':>7} {'ms (copies)':>12}")
+    for width, length, open_cells, parent_peak, copy_peak, parent_time, copy_time in ucs_memory_profile():
+        print(f"{width:>10} {length:>11} {open_cells:>10} {parent_peak / 1024:>10.1f} {copy_peak / 1024:>14.1f} "
+              f"{parent_time * 1000:>7.2f} {copy_time * 1000:>12.2f}")
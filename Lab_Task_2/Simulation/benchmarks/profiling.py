@@ -0,0 +1,86 @@
+"""Search instrumentation overhead with the profiler disabled and enabled, as best-of-N timings."""
+import json
+import statistics
+import timeit
+from agent import Agent
+from instrumentation import SearchProfiler, instrumented
+from benchmarks.common import random_environment, time_call, uncached_agent
+
+PROFILE_SIZE = 100
+PROFILE_REPEATS = 200
+PROFILE_ROUNDS = 15
+HOOK_CALLS = 200000  # Calls per round when timing the hook alone
+
+
+class HookOnly:
+    """Stand-in agent whose search does nothing, so timing it measures the instrumentation hook alone."""
+    profiler = None
+
+    def search(self, targets):
+        return None
+
+    hooked_search = instrumented("Astar")(search)
+
+
+def hook_overhead(calls=HOOK_CALLS, rounds=PROFILE_ROUNDS):
+    """Best-of-rounds seconds per call of an empty search, called directly and through @instrumented."""
+    stand_in = HookOnly()
+    direct = min(timeit.repeat(lambda: stand_in.search(()), number=calls, repeat=rounds)) / calls
+    hooked = min(timeit.repeat(lambda: stand_in.hooked_search(()), number=calls, repeat=rounds)) / calls
+    return direct, hooked
+
+
+def instrumentation_overhead(size=PROFILE_SIZE, repeats=PROFILE_REPEATS, rounds=PROFILE_ROUNDS):
+    """
+    Seconds per nearest-task A* search in each of rounds interleaved rounds of repeats calls:
+    called directly (twice, so the gap between the two shows the timing noise), through the
+    instrumentation hook with no profiler, and with a profiler recording every call.
+    Returns ({"direct", "direct again", "disabled", "enabled"} -> per-round times, profiler).
+    """
+    environment = random_environment(size, 10)
+    agent = uncached_agent(environment)
+    tasks = list(environment.task_locations_Astar)
+    undecorated = Agent.find_path_to_nearest_Astar.__wrapped__
+    decorated = agent.find_path_to_nearest_Astar
+    profiler = SearchProfiler()
+
+    def repeat(search, *args):
+        for _ in range(repeats):
+            search(*args)
+
+    times = {"direct": [], "direct again": [], "disabled": [], "enabled": []}
+    for _ in range(rounds):
+        # Interleaved, so drift in machine speed hits every variant alike
+        agent.profiler = None
+        times["direct"].append(time_call(repeat, undecorated, agent, tasks)[1] / repeats)
+        times["disabled"].append(time_call(repeat, decorated, tasks)[1] / repeats)
+        agent.profiler = profiler
+        times["enabled"].append(time_call(repeat, decorated, tasks)[1] / repeats)
+        agent.profiler = None
+        times["direct again"].append(time_call(repeat, undecorated, agent, tasks)[1] / repeats)
+    return times, profiler
+
+
+def add_arguments(parser):
+    parser.add_argument("--rounds", type=int, default=PROFILE_ROUNDS, help="timing rounds; the best one is reported")
+    parser.add_argument("--repeats", type=int, default=PROFILE_REPEATS, help="searches per round")
+
+
+def main(args):
+    direct_call, hooked_call = hook_overhead(rounds=args.rounds)
+    hook = hooked_call - direct_call
+    print(f"hook alone, best of {args.rounds} rounds x {HOOK_CALLS} empty calls: "
+          f"{direct_call * 1e9:.0f} ns direct, {hooked_call * 1e9:.0f} ns hooked, {hook * 1e9:+.0f} ns per call")
+
+    times, profiler = instrumentation_overhead(repeats=args.repeats, rounds=args.rounds)
+    direct = min(times["direct"])
+    print(f"A* search, best of {args.rounds} rounds x {args.repeats} searches (median in brackets):")
+    for name, round_times in times.items():
+        best = min(round_times)
+        print(f"  {name + ':':<14} {best * 1e6:10.1f} us ({statistics.median(round_times) * 1e6:8.1f} us)  "
+              f"{best / direct - 1:+7.2%}")
+    noise = abs(min(times["direct again"]) / direct - 1)
+    print(f"timing noise (direct against direct again): {noise:.2%}")
+    print(f"profiler disabled adds {hook * 1e9:.0f} ns to a {direct * 1e6:.0f} us search: {hook / direct:.3%}")
+    record = profiler.records[-1]
+    print(f"last record: {json.dumps(record)}")
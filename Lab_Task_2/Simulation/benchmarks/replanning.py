@@ -0,0 +1,46 @@
+"""Incremental D* Lite replanning against an A* search from scratch after barrier changes near the agent."""
+from benchmarks.common import path_cost, random_environment, time_call, uncached_agent
+
+REPLAN_SIZE = 300
+REPLAN_ROUNDS = 20
+REPLAN_CHANGES = 5  # Barriers flipped between replans
+REPLAN_RADIUS = 15  # Changes land within this many cells of the agent
+
+
+def replanning_latency(size=REPLAN_SIZE, rounds=REPLAN_ROUNDS, changes=REPLAN_CHANGES):
+    """
+    Replanning time after a few barrier changes near the agent: a search from scratch
+    against the incremental planner. The agent advances a few steps along its plan each round.
+    """
+    environment = random_environment(size, 20)
+    agent = uncached_agent(environment)
+    agent.find_nearest_task_incremental()  # Initial full search, not timed
+    rng = environment.random
+    rows_out = []
+    for _ in range(rounds):
+        if agent.path_Astar:
+            agent.position_Astar = agent.path_Astar[min(len(agent.path_Astar), 3) - 1]
+        ax, ay = agent.position_Astar
+        for _ in range(changes):
+            x = rng.randint(max(ax - REPLAN_RADIUS, 0), min(ax + REPLAN_RADIUS, environment.columns - 1))
+            y = rng.randint(max(ay - REPLAN_RADIUS, 0), min(ay + REPLAN_RADIUS, environment.rows - 1))
+            if (x, y) != agent.position_Astar and (x, y) not in environment.task_locations_Astar:
+                if environment.is_barrier(x, y):
+                    environment.remove_barrier(x, y)
+                else:
+                    environment.add_barrier(x, y)
+
+        scratch_path, scratch_time = time_call(agent.find_path_to_nearest_Astar, environment.task_locations_Astar)
+        _, incremental_time = time_call(agent.find_nearest_task_incremental)
+        scratch_cost = path_cost(environment, scratch_path)
+        incremental_cost = path_cost(environment, [agent.position_Astar] + list(agent.path_Astar)) \
+            if agent.moving_Astar else None
+        assert scratch_cost == incremental_cost, f"cost mismatch: {scratch_cost} != {incremental_cost}"
+        rows_out.append((scratch_time, incremental_time, agent.runs["Astar"].last_search_stats["expanded"]))
+    return rows_out
+
+
+def main(args):
+    print(f"{'round':>5} {'from scratch (ms)':>18} {'incremental (ms)':>17} {'repaired cells':>15}")
+    for index, (scratch_time, incremental_time, expanded) in enumerate(replanning_latency(), 1):
+        print(f"{index:>5} {scratch_time * 1000:>18.2f} {incremental_time * 1000:>17.2f} {expanded:>15}")
@@ -0,0 +1,41 @@
+"""Replanning time of the per-task A* loop against the single-pass nearest-task search as tasks grow."""
+from benchmarks.common import path_cost, random_environment, time_call, uncached_agent
+
+TASK_COUNTS = [5, 10, 25, 50, 100, 200]
+SCALING_SIZE = 200
+
+
+def nearest_by_task_loop(agent, tasks):
+    """Reference nearest-task search: one A* search per task, keep the cheapest."""
+    environment = agent.environment
+    shortest_path = None
+    for task_position in tasks:
+        path = agent.find_path_to_Astar(task_position)
+        if path:
+            if not shortest_path or path_cost(environment, path) < path_cost(environment, shortest_path):
+                shortest_path = path
+    return shortest_path
+
+
+def task_count_scaling(task_counts=TASK_COUNTS, size=SCALING_SIZE):
+    """Compare replanning time of the per-task loop against the single-pass search."""
+    rows_out = []
+    for num_tasks in task_counts:
+        environment = random_environment(size, num_tasks)
+        agent = uncached_agent(environment)
+        tasks = environment.task_locations_Astar
+
+        loop_path, loop_time = time_call(nearest_by_task_loop, agent, tasks)
+        single_path, single_time = time_call(agent.find_path_to_nearest_Astar, tasks)
+
+        loop_cost = path_cost(environment, loop_path)
+        single_cost = path_cost(environment, single_path)
+        assert loop_cost == single_cost, f"cost mismatch: {loop_cost} != {single_cost}"
+        rows_out.append((num_tasks, loop_time, single_time, single_cost))
+    return rows_out
+
+
+def main(args):
+    print(f"{'tasks':>6} {'per-task (ms)':>14} {'single-pass (ms)':>17} {'cost':>6}")
+    for num_tasks, loop_time, single_time, cost in task_count_scaling():
+        print(f"{num_tasks:>6} {loop_time * 1000:>14.2f} {single_time * 1000:>17.2f} {str(cost):>6}")
@@ -0,0 +1,31 @@
+"""Headless fast-forward of the simulation core to completion: ticks per second and run costs."""
+from agent import Agent
+from simulation import ALGORITHMS, Simulation
+from benchmarks.common import GRID_SIZE, SEEDS, random_environment, time_call
+
+SIMULATION_SIZES = [20, 50, 100]
+SIMULATION_TASKS = 20
+
+
+def fast_forward(sizes=SIMULATION_SIZES, num_tasks=SIMULATION_TASKS, seeds=SEEDS):
+    """
+    Run the headless simulation core to completion with both searches started. Returns per run:
+    (size, seed, ticks, seconds, A* cost, UCS cost).
+    """
+    rows_out = []
+    for size in sizes:
+        for seed in seeds:
+            environment = random_environment(size, num_tasks, seed=seed)
+            agent = Agent(environment, GRID_SIZE)
+            simulation = Simulation(environment, agent)
+            for algorithm in ALGORITHMS:
+                simulation.start(algorithm)
+            ticks, elapsed = time_call(simulation.run)
+            rows_out.append((size, seed, ticks, elapsed, agent.total_cost_Astar, agent.total_cost_UCS))
+    return rows_out
+
+
+def main(args):
+    print(f"{'size':>5} {'seed':>5} {'ticks':>7} {'seconds':>8} {'ticks/s':>9} {'A* cost':>8} {'UCS cost':>9}")
+    for size, seed, ticks, elapsed, astar_cost, ucs_cost in fast_forward():
+        print(f"{size:>5} {seed:>5} {ticks:>7} {elapsed:>8.3f} {ticks / elapsed:>9.0f} {astar_cost:>8} {ucs_cost:>9}")
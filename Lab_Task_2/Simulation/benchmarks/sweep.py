@@ -0,0 +1,114 @@
+"""A*, UCS and JPS over a sweep of grid sizes, task counts and barrier densities (the default suite)."""
+import csv
+import json
+from environment import Environment
+from benchmarks.common import GRID_SIZE, SEEDS, path_cost, peak_memory, time_call, uncached_agent
+
+# Default sweep
+SWEEP_SIZES = [50, 100, 200]
+SWEEP_TASK_COUNTS = [5, 50]
+SWEEP_BARRIER_DENSITIES = [0.0, 0.2, 0.35]
+RESULT_FIELDS = ["label", "size", "num_tasks", "barrier_density", "num_barriers", "seed", "algorithm",
+                 "wall_time_ms", "nodes_expanded", "heap_pushes", "peak_memory_kb", "path_cost"]
+
+# Searches compared by the suite: name -> (agent method, whether it takes all tasks or one target, run it uses)
+ALGORITHMS = {
+    "Astar": ("find_path_to_Astar", False, "Astar"),
+    "UCS": ("find_path_to_UCS", False, "UCS"),
+    "nearest_Astar": ("find_path_to_nearest_Astar", True, "Astar"),
+    "nearest_UCS": ("find_path_to_nearest_UCS", True, "UCS"),
+    "JPS": ("find_path_to_JPS", False, "Astar"),
+    "nearest_JPS": ("find_path_to_nearest_JPS", True, "Astar"),
+}
+
+
+def prepare_search(environment, algorithm):
+    """Create a fresh agent and return (the run the search uses, search method, target argument)."""
+    method_name, takes_all_tasks, run_name = ALGORITHMS[algorithm]
+    agent = uncached_agent(environment)
+    tasks = environment.task_locations_Astar
+    target = tasks if takes_all_tasks else next(iter(tasks))
+    return agent.runs[run_name], getattr(agent, method_name), target
+
+
+def sweep(sizes=SWEEP_SIZES, task_counts=SWEEP_TASK_COUNTS, barrier_densities=SWEEP_BARRIER_DENSITIES,
+          seeds=SEEDS, algorithms=tuple(ALGORITHMS), label="", max_terrain_cost=1):
+    """
+    Run every algorithm on seeded environments over a grid of sizes, task counts and
+    barrier densities. Returns one result dict per (environment, algorithm); path_cost is
+    the summed terrain cost of the path, so it stays right on weighted maps.
+    """
+    results = []
+    for size in sizes:
+        cells = size * size
+        for num_tasks in task_counts:
+            for density in barrier_densities:
+                num_barriers = min(int(cells * density), cells - num_tasks)
+                for seed in seeds:
+                    environment = Environment(size * GRID_SIZE, size * GRID_SIZE, GRID_SIZE, num_tasks=num_tasks,
+                                              num_barriers=num_barriers, seed=seed, max_terrain_cost=max_terrain_cost)
+                    for algorithm in algorithms:
+                        _, search, target = prepare_search(environment, algorithm)
+                        _, peak = peak_memory(search, target)
+                        run, search, target = prepare_search(environment, algorithm)
+                        path, elapsed = time_call(search, target)
+                        results.append({
+                            "label": label,
+                            "size": size,
+                            "num_tasks": num_tasks,
+                            "barrier_density": density,
+                            "num_barriers": num_barriers,
+                            "seed": seed,
+                            "algorithm": algorithm,
+                            "wall_time_ms": round(elapsed * 1000, 3),
+                            "nodes_expanded": run.last_search_stats["expanded"],
+                            "heap_pushes": run.last_search_stats["pushes"],
+                            "peak_memory_kb": round(peak / 1024, 1),
+                            "path_cost": path_cost(environment, path),
+                        })
+    return results
+
+
+def write_results(results, output):
+    """Write sweep results as JSON (.json) or CSV (anything else)."""
+    with open(output, "w", newline="") as handle:
+        if output.endswith(".json"):
+            json.dump(results, handle, indent=2)
+        else:
+            writer = csv.DictWriter(handle, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+
+
+def print_summary(results):
+    """Print mean time, expansions and memory per algorithm."""
+    print(f"{'algorithm':>14} {'runs':>5} {'time (ms)':>10} {'expanded':>10} {'pushes':>10} {'peak (KB)':>10}")
+    for algorithm in ALGORITHMS:
+        runs = [result for result in results if result["algorithm"] == algorithm]
+        if not runs:
+            continue
+        mean = lambda field: sum(result[field] for result in runs) / len(runs)
+        print(f"{algorithm:>14} {len(runs):>5} {mean('wall_time_ms'):>10.2f} {mean('nodes_expanded'):>10.0f} "
+              f"{mean('heap_pushes'):>10.0f} {mean('peak_memory_kb'):>10.1f}")
+
+
+def add_arguments(parser):
+    parser.add_argument("--sizes", type=int, nargs="+", default=SWEEP_SIZES, help="grid side lengths in cells")
+    parser.add_argument("--tasks", type=int, nargs="+", default=SWEEP_TASK_COUNTS, help="task counts")
+    parser.add_argument("--barrier-densities", type=float, nargs="+", default=SWEEP_BARRIER_DENSITIES,
+                        help="fraction of cells that are barriers")
+    parser.add_argument("--seeds", type=int, nargs="+", default=SEEDS, help="environment seeds")
+    parser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), choices=list(ALGORITHMS))
+    parser.add_argument("--max-terrain-cost", type=int, default=1,
+                        help="terrain costs are random in 1..this (1: uniform cost)")
+    parser.add_argument("--label", default="", help="version label stored with every result row")
+    parser.add_argument("--output", help="write sweep results to this .csv or .json file")
+
+
+def main(args):
+    results = sweep(args.sizes, args.tasks, args.barrier_densities, args.seeds, args.algorithms, args.label,
+                    args.max_terrain_cost)
+    print_summary(results)
+    if args.output:
+        write_results(results, args.output)
+        print(f"Wrote {len(results)} results to {args.output}")
@@ -0,0 +1,37 @@
+"""Total A* cost of a planned task tour against the greedy nearest-task order."""
+from benchmarks.common import SEEDS, random_environment, time_call, uncached_agent
+
+TOUR_TASK_COUNTS = [8, 12, 30, 100]
+TOUR_SIZE = 60
+
+
+def run_until_done(agent, find_next_task):
+    """Let the A* agent complete every reachable task and return its total cost."""
+    while agent.environment.task_locations_Astar:
+        find_next_task()
+        if not agent.moving_Astar:
+            break  # No reachable task is left
+        while agent.path_Astar:
+            agent.move_Astar()
+    return agent.total_cost_Astar
+
+
+def tour_against_greedy(task_counts=TOUR_TASK_COUNTS, size=TOUR_SIZE, seeds=SEEDS):
+    """Total A* cost of visiting tasks greedily (nearest first) against the planned tour."""
+    rows_out = []
+    for num_tasks in task_counts:
+        for seed in seeds:
+            greedy_agent = uncached_agent(random_environment(size, num_tasks, seed=seed))
+            greedy_cost = run_until_done(greedy_agent, greedy_agent.find_nearest_task_Astar)
+
+            tour_agent = uncached_agent(random_environment(size, num_tasks, seed=seed))
+            (planned_cost, planning_time) = time_call(tour_agent.plan_task_tour_Astar)
+            tour_cost = run_until_done(tour_agent, tour_agent.find_nearest_task_Astar)
+            rows_out.append((num_tasks, seed, greedy_cost, planned_cost, tour_cost, planning_time))
+    return rows_out
+
+
+def main(args):
+    print(f"{'tasks':>5} {'seed':>5} {'greedy cost':>12} {'planned':>8} {'tour cost':>10} {'planning (ms)':>14}")
+    for num_tasks, seed, greedy_cost, planned_cost, tour_cost, planning_time in tour_against_greedy():
+        print(f"{num_tasks:>5} {seed:>5} {greedy_cost:>12} {planned_cost:>8} {tour_cost:>10} {planning_time * 1000:>14.1f}")
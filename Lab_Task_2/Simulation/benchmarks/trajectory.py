@@ -0,0 +1,59 @@
+"""Trajectory recording: log size, recording overhead and replay frame lookup time."""
+import os
+import random
+import shutil
+import tempfile
+import time
+from agent import Agent
+from simulation import ALGORITHMS, Simulation
+from trajectory import Trajectory, TrajectoryRecorder
+from benchmarks.common import GRID_SIZE, SEED, random_environment, time_call
+
+TRAJECTORY_SIZES = [50, 100, 200]
+TRAJECTORY_TASKS = 20
+TRAJECTORY_FRAMES = 1000  # Random ticks looked up when scrubbing
+
+
+def trajectory_recording(sizes=TRAJECTORY_SIZES, num_tasks=TRAJECTORY_TASKS, frames=TRAJECTORY_FRAMES):
+    """
+    Record a full fast-forward run, save it and scrub the saved log. Returns per size:
+    (size, ticks, recorded moves, log bytes, run seconds without and with the recorder,
+    save seconds, open seconds, mean frame lookup seconds).
+    """
+    rows_out = []
+    for size in sizes:
+        times = []
+        for record in (False, True):
+            environment = random_environment(size, num_tasks)
+            simulation = Simulation(environment, Agent(environment, GRID_SIZE))
+            recorder = TrajectoryRecorder(simulation)
+            if record:
+                simulation.add_observer(recorder)
+            for algorithm in ALGORITHMS:
+                simulation.start(algorithm)
+            times.append(time_call(simulation.run)[1])
+
+        directory = tempfile.mkdtemp()
+        try:
+            save_time = time_call(recorder.save, directory)[1]
+            log_bytes = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+            trajectory, open_time = time_call(Trajectory, directory)
+            ticks = [random.Random(SEED).randint(0, trajectory.last_tick) for _ in range(frames)]
+            start = time.perf_counter()
+            for tick in ticks:
+                trajectory.frame(tick)
+            frame_time = (time.perf_counter() - start) / frames
+            rows_out.append((size, simulation.ticks, len(trajectory.steps), log_bytes, times[0], times[1],
+                             save_time, open_time, frame_time))
+            del trajectory  # Release the memory maps before removing the files
+        finally:
+            shutil.rmtree(directory)
+    return rows_out
+
+
+def main(args):
+    print(f"{'size':>5} {'ticks':>6} {'moves':>6} {'log (KB)':>9} {'run (s)':>8} {'recorded (s)':>13} "
+          f"{'save (ms)':>10} {'open (ms)':>10} {'frame (us)':>11}")
+    for size, ticks, moves, log_bytes, run_time, recorded_time, save_time, open_time, frame_time in trajectory_recording():
+        print(f"{size:>5} {ticks:>6} {moves:>6} {log_bytes / 1024:>9.1f} {run_time:>8.3f} {recorded_time:>13.3f} "
+              f"{save_time * 1000:>10.2f} {open_time * 1000:>10.2f} {frame_time * 1e6:>11.1f}")
@@ -0,0 +1,33 @@
+# bucket_queue.py
+
+
+class BucketQueue:
+    """
+    Priority queue for Dijkstra/UCS with small integer step costs (Dial's algorithm).
+    Costs popped never decrease and a pushed cost is at most the last popped cost plus
+    max_step, so max_step + 1 buckets used as a ring hold everything pending. Push and pop
+    are O(1) apart from skipping empty buckets; there is no log factor as with a heap.
+    Items with the same cost come out last in, first out.
+    """
+
+    def __init__(self, max_step):
+        self.buckets = [[] for _ in range(max_step + 1)]
+        self.cost = 0  # Cost of the bucket currently being emptied
+        self.size = 0
+
+    def push(self, cost, item):
+        self.buckets[cost % len(self.buckets)].append(item)
+        self.size += 1
+
+    def pop(self):
+        """Remove and return (cost, item) with the lowest cost."""
+        buckets = self.buckets
+        bucket = buckets[self.cost % len(buckets)]
+        while not bucket:
+            self.cost += 1
+            bucket = buckets[self.cost % len(buckets)]
+        self.size -= 1
+        return self.cost, bucket.pop()
+
+    def __len__(self):
+        return self.size
@@ -0,0 +1,177 @@
+# dstar_lite.py
+from heapq import heappush, heappop
+
+INFINITY = float("inf")
+
+
+class DStarLite:
+    """
+    Incremental nearest-task planner (D* Lite).
+    The search runs backwards from every task cell towards the agent, so g(cell) is the
+    cost from cell to its closest task (stepping onto a cell costs its terrain cost). The
+    g/rhs values and the open list are kept between calls: when barriers or terrain change
+    or tasks are completed only the affected cells are repaired instead of searching the
+    whole map again.
+    """
+
+    def __init__(self, environment):
+        self.environment = environment
+        self.g = {}
+        self.rhs = {}
+        self.open_list = []  # Heap of (key, cell); stale entries are skipped when popped
+        self.open_keys = {}  # cell -> key of its live entry in open_list
+        self.goals = set()
+        self.start = None
+        self.last_start = None
+        self.km = 0  # Key modifier that accounts for the agent moving between calls
+        self.change_index = len(environment.barrier_changes)  # Barrier changes already applied
+        self.terrain_change_index = len(environment.terrain_changes)  # Terrain changes already applied
+        self.scale = environment.min_terrain_cost  # Heuristic scale the stored keys were computed with
+        self.expanded = 0  # Counters of the most recent plan() call
+        self.pushes = 0
+
+    def heuristic(self, cell):
+        """Manhattan distance from the agent to cell, times the cheapest terrain cost."""
+        columns = self.environment.columns
+        y, x = divmod(cell, columns)
+        sy, sx = divmod(self.start, columns)
+        return self.scale * (abs(x - sx) + abs(y - sy))
+
+    def reset(self):
+        """Forget the search state; the next plan() searches from scratch."""
+        self.g.clear()
+        self.rhs.clear()
+        self.open_list.clear()
+        self.open_keys.clear()
+        self.goals = set()
+        self.last_start = None
+        self.km = 0
+
+    def predecessors(self, cell):
+        """
+        Cells that can step into cell: all of its in-bounds neighbors, barriers included,
+        since an agent standing on a barrier cell can still move off it.
+        """
+        environment = self.environment
+        columns = environment.columns
+        y, x = divmod(cell, columns)
+        cells = []
+        if y > 0:
+            cells.append(cell - columns)
+        if y < environment.rows - 1:
+            cells.append(cell + columns)
+        if x > 0:
+            cells.append(cell - 1)
+        if x < columns - 1:
+            cells.append(cell + 1)
+        return cells
+
+    def calculate_key(self, cell):
+        best = min(self.g.get(cell, INFINITY), self.rhs.get(cell, INFINITY))
+        return (best + self.heuristic(cell) + self.km, best)
+
+    def top_key(self):
+        """Key of the first live entry in the open list."""
+        open_list = self.open_list
+        while open_list and self.open_keys.get(open_list[0][1]) != open_list[0][0]:
+            heappop(open_list)
+        return open_list[0][0] if open_list else (INFINITY, INFINITY)
+
+    def update_vertex(self, cell):
+        """Recompute rhs(cell) from its neighbors and put it on the open list if inconsistent."""
+        # Barrier cells never appear in a neighbor list, so nothing can route through them
+        if cell in self.goals:
+            rhs = 0
+        else:
+            g, terrain = self.g, self.environment.terrain
+            rhs = INFINITY
+            for neighbor in self.environment.neighbor_cells(cell):
+                cost = g.get(neighbor, INFINITY) + terrain[neighbor]  # Stepping onto neighbor costs its terrain
+                if cost < rhs:
+                    rhs = cost
+        self.rhs[cell] = rhs
+
+        if self.g.get(cell, INFINITY) != rhs:
+            key = self.calculate_key(cell)
+            self.open_keys[cell] = key
+            heappush(self.open_list, (key, cell))
+            self.pushes += 1
+        else:
+            self.open_keys.pop(cell, None)
+
+    def compute_shortest_path(self):
+        """Process inconsistent cells until the agent's cell is consistent."""
+        g, rhs, open_keys = self.g, self.rhs, self.open_keys
+        predecessors = self.predecessors
+        start = self.start
+        while True:
+            top = self.top_key()
+            if not (top < self.calculate_key(start) or rhs.get(start, INFINITY) != g.get(start, INFINITY)):
+                break
+            if top == (INFINITY, INFINITY):
+                break  # Nothing left to process: the agent cannot reach any task
+            key, cell = heappop(self.open_list)
+            new_key = self.calculate_key(cell)
+            if key < new_key:
+                open_keys[cell] = new_key
+                heappush(self.open_list, (new_key, cell))
+                self.pushes += 1
+                continue
+            del open_keys[cell]
+            self.expanded += 1
+            if g.get(cell, INFINITY) > rhs.get(cell, INFINITY):
+                g[cell] = rhs[cell]
+                for neighbor in predecessors(cell):
+                    self.update_vertex(neighbor)
+            else:
+                g[cell] = INFINITY
+                self.update_vertex(cell)
+                for neighbor in predecessors(cell):
+                    self.update_vertex(neighbor)
+
+    def apply_changes(self, start, tasks):
+        """Bring the search state up to date with the agent, the tasks and the barriers."""
+        environment = self.environment
+        if environment.min_terrain_cost != self.scale:
+            # Stored keys used the old heuristic scale, which may no longer be admissible
+            self.scale = environment.min_terrain_cost
+            self.reset()
+        self.start = start
+        if self.last_start is not None:
+            self.km += self.heuristic(self.last_start)
+        self.last_start = start
+
+        goals = {environment.cell_index(*task) for task in tasks if environment.is_within_bounds(*task)}
+        changed = goals ^ self.goals
+        self.goals = goals
+
+        changes = environment.barrier_changes
+        for cell in changes[self.change_index:]:
+            changed.add(cell)
+            changed.update(self.predecessors(cell))
+        self.change_index = len(changes)
+        terrain_changes = environment.terrain_changes
+        for cell in terrain_changes[self.terrain_change_index:]:
+            changed.update(self.predecessors(cell))  # Only the cost of stepping onto cell changed
+        self.terrain_change_index = len(terrain_changes)
+
+        for cell in changed:
+            self.update_vertex(cell)
+
+    def plan(self, position, tasks):
+        """Return the path from position to the closest task, or None if no task is reachable."""
+        environment = self.environment
+        self.expanded = self.pushes = 0
+        self.apply_changes(environment.cell_index(*position), tasks)
+        self.compute_shortest_path()
+
+        g, terrain = self.g, environment.terrain
+        current = self.start
+        if g.get(current, INFINITY) == INFINITY:
+            return None
+        path = [current]
+        while current not in self.goals:
+            current = min(environment.neighbor_cells(current),
+                          key=lambda neighbor: g.get(neighbor, INFINITY) + terrain[neighbor])
+            path.append(current)
+        return [environment.cell_position(cell) for cell in path]
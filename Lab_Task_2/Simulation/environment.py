@@ -1,30 +1,98 @@
 # environment.py
 import random
-import copy
+from array import array
+from collections import deque
+from types import MappingProxyType
+from world import GridIndex, TaskOverlay, WorldSnapshot
 
-class Environment:
-    def __init__(self, width, height, grid_size, num_tasks, num_barriers):
+# Neighbor order used everywhere: up, down, left, right
+DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+class Environment(GridIndex):
+    def __init__(self, width, height, grid_size, num_tasks, num_barriers, seed=None, ensure_reachable=False,
+                 max_terrain_cost=1):
+        # A fixed seed gives the same layout every time; otherwise use the global random module
+        self.random = random.Random(seed) if seed is not None else random
         self.width = width
         self.height = height
         self.grid_size = grid_size
         self.columns = width // grid_size
         self.rows = height // grid_size
 
-        self.task_locations_Astar = self.generate_tasks(num_tasks)
-        self.task_locations_UCS = copy.deepcopy(self.task_locations_Astar) 
+        # One read-only task dict shared by every run; each run only keeps an overlay of what it completed
+        self.tasks = MappingProxyType(self.generate_tasks(num_tasks))
+        self.task_overlays = {}
+
+        if ensure_reachable:
+            self.barrier_locations = set()  # Placed one by one below, once the connectivity index exists
+        else:
+            self.barrier_locations = self.generate_random_locations(num_barriers, exclude=set(self.tasks))
+
+        # Flat occupancy grid (1 = barrier) indexed by cell id = y * columns + x
+        self.occupancy = bytearray(self.columns * self.rows)
+        for (bx, by) in self.barrier_locations:
+            self.occupancy[self.cell_index(bx, by)] = 1
+        self.build_neighbor_table()
+        self.build_components()
+        # Cost of stepping onto each cell (1 = plain ground); random in 1..max_terrain_cost if above 1
+        self.terrain = bytearray([1]) * len(self.occupancy)
+        if max_terrain_cost > 1:
+            for cell in range(len(self.terrain)):
+                self.terrain[cell] = self.random.randint(1, max_terrain_cost)
+        self.update_terrain_bounds()
+        self.terrain_changes = []  # Cell ids whose terrain cost changed, in order (read by incremental planners)
+        self.barrier_changes = []  # Cell ids whose barrier state changed, in order (read by incremental planners)
+        self.version = 0  # Bumped whenever barriers or tasks change, so cached plans can be invalidated
+        self.current_snapshot = None  # Latest snapshot(), reused until the version changes
+        if ensure_reachable:
+            self.place_reachable_barriers(num_barriers)
+
+    def task_overlay(self, name):
+        """The remaining tasks of the named run (an overlay on the shared task dict, created on first use)."""
+        overlay = self.task_overlays.get(name)
+        if overlay is None:
+            overlay = self.task_overlays[name] = TaskOverlay(self.tasks)
+        return overlay
+
+    # Names from before the shared task dict, kept for existing callers
+    @property
+    def task_locations_Astar(self):
+        return self.task_overlay("Astar")
+
+    @property
+    def task_locations_UCS(self):
+        return self.task_overlay("UCS")
 
-        self.barrier_locations = self.generate_random_locations(num_barriers, exclude=set(self.task_locations_Astar.keys()))
-        self.barrier_locations_UCS = copy.deepcopy(self.barrier_locations)
-        
-        self.completed_task_locations_Astar = set()
-        self.completed_task_locations_UCS = set()
+    @property
+    def completed_task_locations_Astar(self):
+        return self.task_overlay("Astar").completed
+
+    @property
+    def completed_task_locations_UCS(self):
+        return self.task_overlay("UCS").completed
+
+    @property
+    def barrier_locations_UCS(self):
+        return self.barrier_locations  # Barriers are shared by every run
+
+    def snapshot(self):
+        """
+        Read-only copy of the current map and tasks to share with other runs, threads or processes.
+        Taken again only after the version changes, so callers in between share one copy.
+        """
+        snapshot = self.current_snapshot
+        if snapshot is None or snapshot.version != self.version:
+            snapshot = self.current_snapshot = WorldSnapshot(
+                self.columns, self.rows, self.occupancy, self.terrain, self.tasks, self.version,
+                self.neighbor_table, self.neighbor_count, self.component_labels, self.component_parent)
+        return snapshot
 
     def generate_tasks(self, count):
         """Generate task locations with unique task numbers."""
         tasks = {}
         for task_number in range(1, count + 1):
             while True:
-                location = (random.randint(0, self.columns - 1), random.randint(0, self.rows - 1))
+                location = (self.random.randint(0, self.columns - 1), self.random.randint(0, self.rows - 1))
                 if location not in tasks:
                     tasks[location] = task_number
                     break
@@ -34,15 +102,232 @@ class Environment:
         """Generate unique random locations that are not in the exclude set."""
         locations = set()
         while len(locations) < count:
-            location = (random.randint(0, self.columns - 1), random.randint(0, self.rows - 1))
+            location = (self.random.randint(0, self.columns - 1), self.random.randint(0, self.rows - 1))
             if location not in exclude:
                 locations.add(location)
         return locations
 
-    def is_within_bounds(self, x, y):
-        """Check if (x, y) is within the grid boundaries."""
-        return 0 <= x < self.columns and 0 <= y < self.rows
+    def place_reachable_barriers(self, count):
+        """
+        Add up to count random barriers, skipping any that would cut a task off from the
+        agent's start cell (0, 0). Placing them does not count as a barrier change.
+        """
+        tasks = [self.cell_index(x, y) for x, y in self.tasks]
+        exclude = set(self.tasks) | {(0, 0)}
+        candidates = [(x, y) for y in range(self.rows) for x in range(self.columns) if (x, y) not in exclude]
+        self.random.shuffle(candidates)
+        placed = 0
+        for x, y in candidates:
+            if placed == count:
+                break
+            self.add_barrier(x, y)
+            start = self.component_of(0)
+            if all(self.component_of(task) == start for task in tasks):
+                placed += 1
+            else:
+                self.remove_barrier(x, y)
+        self.barrier_changes = []
+        self.version = 0
+        self.current_snapshot = None
+
+    def complete_task(self, task_locations, position):
+        """Remove a finished task from task_locations and return its number."""
+        task_number = task_locations.pop(position)
+        self.version += 1
+        return task_number
+
+    def build_neighbor_table(self):
+        """
+        Precompute the walkable neighbors of every cell.
+        The table is CSR-style with a fixed row width of 4: the neighbors of cell i are
+        neighbor_table[4 * i : 4 * i + neighbor_count[i]].
+        """
+        columns, rows, occupancy = self.columns, self.rows, self.occupancy
+        cell_count = columns * rows
+        table = array('i', bytes(4 * cell_count * array('i').itemsize))
+        counts = bytearray(cell_count)
+        for y in range(rows):
+            for x in range(columns):
+                cell = y * columns + x
+                base = count = 4 * cell
+                for neighbor, inside in ((cell - columns, y > 0), (cell + columns, y < rows - 1),
+                                         (cell - 1, x > 0), (cell + 1, x < columns - 1)):
+                    if inside and not occupancy[neighbor]:
+                        table[count] = neighbor
+                        count += 1
+                counts[cell] = count - base
+        self.neighbor_table = table
+        self.neighbor_count = counts
+
+    def update_neighbor_row(self, cell):
+        """Recompute the walkable neighbors of one cell."""
+        x, y = self.cell_position(cell)
+        base = 4 * cell
+        count = 0
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.columns and 0 <= ny < self.rows:
+                neighbor = ny * self.columns + nx
+                if not self.occupancy[neighbor]:
+                    self.neighbor_table[base + count] = neighbor
+                    count += 1
+        self.neighbor_count[cell] = count
+
+    def build_components(self):
+        """
+        Label the connected components of the free cells with a flood fill.
+        component_labels holds a label per cell (-1 for barriers). Labels are merged with a
+        union-find over component_parent when a barrier is removed, so always compare
+        component_of() results rather than raw labels.
+        """
+        occupancy, table, counts = self.occupancy, self.neighbor_table, self.neighbor_count
+        labels = array('i', [-1]) * len(occupancy)
+        self.component_parent = []
+        for source in range(len(occupancy)):
+            if occupancy[source] or labels[source] != -1:
+                continue
+            label = len(self.component_parent)
+            self.component_parent.append(label)
+            labels[source] = label
+            frontier = [source]
+            while frontier:
+                next_frontier = []
+                for cell in frontier:
+                    base = 4 * cell
+                    for neighbor in table[base:base + counts[cell]]:
+                        if labels[neighbor] == -1:
+                            labels[neighbor] = label
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+        self.component_labels = labels
+
+    def component_of(self, cell):
+        """Connected-component id of a cell id, or -1 for a barrier."""
+        label = self.component_labels[cell]
+        parent = self.component_parent
+        while label >= 0 and parent[label] != label:
+            parent[label] = parent[parent[label]]  # Path halving
+            label = parent[label]
+        return label
+
+    def merge_components(self, cell):
+        """A barrier was removed from cell: give it a label and join the components around it."""
+        parent = self.component_parent
+        label = len(parent)
+        parent.append(label)
+        self.component_labels[cell] = label
+        for neighbor in self.neighbor_cells(cell):
+            other = self.component_of(neighbor)
+            if other != label:
+                parent[other] = label
+
+    def split_components(self, cell):
+        """
+        A barrier was placed on cell: if that cut its component apart, relabel the cut-off parts.
+        Breadth-first searches start from every free neighbor and take turns one cell at a time.
+        Searches that meet are merged; a search that runs out of cells has found a separate
+        part. Only the smaller parts are ever fully explored.
+        """
+        self.component_labels[cell] = -1
+        starts = list(self.neighbor_cells(cell))
+        if len(starts) < 2 or self.ring_connected(cell):
+            return
+        owner = {start: index for index, start in enumerate(starts)}  # Cell -> search that reached it
+        merged_into = list(range(len(starts)))
+        queues = {index: deque([start]) for index, start in enumerate(starts)}
+
+        def search_of(index):
+            while merged_into[index] != index:
+                index = merged_into[index]
+            return index
+
+        while len(queues) > 1:
+            for index in list(queues):
+                if index not in queues:
+                    continue  # Merged into another search this round
+                queue = queues[index]
+                if not queue:
+                    # Cut off: everything this search reached becomes a new component
+                    label = len(self.component_parent)
+                    self.component_parent.append(label)
+                    for reached, search in owner.items():
+                        if search_of(search) == index:
+                            self.component_labels[reached] = label
+                    del queues[index]
+                    if len(queues) == 1:
+                        break
+                    continue
+                current = queue.popleft()
+                for neighbor in self.neighbor_cells(current):
+                    search = owner.get(neighbor)
+                    if search is None:
+                        owner[neighbor] = index
+                        queue.append(neighbor)
+                    else:
+                        other = search_of(search)
+                        if other != index:
+                            merged_into[other] = index
+                            queue.extend(queues.pop(other))
+
+    def ring_connected(self, cell):
+        """
+        Whether the free neighbors of cell are still connected through the eight cells around
+        it. If so, blocking cell cannot split its component.
+        """
+        x, y = self.cell_position(cell)
+        ring = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1))
+        free = [self.is_within_bounds(x + dx, y + dy) and not self.occupancy[self.cell_index(x + dx, y + dy)]
+                for dx, dy in ring]
+        # Count the runs of free ring cells that contain a direct (up/down/left/right) neighbor
+        runs = 0
+        for index in range(0, 8, 2):
+            if free[index] and not (free[index - 1] and free[index - 2]):
+                runs += 1
+        return runs <= 1
+
+    def update_terrain_bounds(self):
+        """Cache the cheapest and dearest step cost; searches scale their heuristics by the cheapest."""
+        self.min_terrain_cost = min(self.terrain, default=1)
+        self.max_terrain_cost = max(self.terrain, default=1)
+        self.uniform_terrain = self.min_terrain_cost == self.max_terrain_cost
+
+    def set_terrain(self, x, y, cost):
+        """Set the cost of stepping onto (x, y) to a small integer from 1 to 255."""
+        if not 1 <= cost <= 255:
+            raise ValueError(f"terrain cost must be between 1 and 255, got {cost}")
+        cell = self.cell_index(x, y)
+        if self.terrain[cell] == cost:
+            return
+        self.terrain[cell] = cost
+        self.update_terrain_bounds()
+        self.terrain_changes.append(cell)
+        self.version += 1
+
+    def add_barrier(self, x, y):
+        """Place a barrier at (x, y) and update only the neighbor rows it affects."""
+        self.set_barrier(x, y, True)
+
+    def remove_barrier(self, x, y):
+        """Remove the barrier at (x, y) and update only the neighbor rows it affects."""
+        self.set_barrier(x, y, False)
 
-    def is_barrier(self, x, y):
-        """Check if (x, y) is a barrier."""
-        return (x, y) in self.barrier_locations
\ No newline at end of file
+    def set_barrier(self, x, y, blocked):
+        """Set or clear a barrier and refresh the rows of the surrounding cells."""
+        cell = self.cell_index(x, y)
+        if self.occupancy[cell] == blocked:
+            return
+        self.occupancy[cell] = 1 if blocked else 0
+        if blocked:
+            self.barrier_locations.add((x, y))
+        else:
+            self.barrier_locations.discard((x, y))
+        self.barrier_changes.append(cell)
+        self.version += 1
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if self.is_within_bounds(nx, ny):
+                self.update_neighbor_row(self.cell_index(nx, ny))
+        if blocked:
+            self.split_components(cell)
+        else:
+            self.merge_components(cell)
\ No newline at end of file
@@ -0,0 +1,346 @@
+# fleet.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappush, heappop
+
+INFINITY = float("inf")
+
+# WorldSnapshot shared with every worker process by the pool initializer
+worker_world = None
+
+
+def init_worker(world):
+    """Pool initializer: receive the read-only map once per worker instead of once per task."""
+    global worker_world
+    worker_world = world
+
+
+def breadth_first_distances(columns, rows, occupancy, source, targets, step_cost=1):
+    """Breadth-first path costs from source to each target cell id when every step costs step_cost."""
+    remaining = set(targets)
+    found = {}
+    seen = bytearray(occupancy)  # Barriers start out as seen so they are never entered
+    seen[source] = 1
+    frontier = [source]
+    step = 0
+    last_row = (rows - 1) * columns
+    while frontier and remaining:
+        next_frontier = []
+        for cell in frontier:
+            if cell in remaining:
+                remaining.discard(cell)
+                found[cell] = step * step_cost
+            x = cell % columns
+            if cell >= columns and not seen[cell - columns]:
+                seen[cell - columns] = 1
+                next_frontier.append(cell - columns)
+            if cell < last_row and not seen[cell + columns]:
+                seen[cell + columns] = 1
+                next_frontier.append(cell + columns)
+            if x > 0 and not seen[cell - 1]:
+                seen[cell - 1] = 1
+                next_frontier.append(cell - 1)
+            if x < columns - 1 and not seen[cell + 1]:
+                seen[cell + 1] = 1
+                next_frontier.append(cell + 1)
+        frontier = next_frontier
+        step += 1
+    return [found.get(target, INFINITY) for target in targets]
+
+
+def grid_distances(columns, rows, occupancy, terrain, source, targets):
+    """
+    Terrain-weighted path costs from source to each target cell id (INFINITY if unreachable):
+    Dijkstra where stepping onto a cell costs its terrain cost. Step costs are small integers,
+    so the frontier is a ring of cost buckets (Dial's algorithm, as in the agent's UCS); on
+    uniform terrain the plain breadth_first_distances() gives the same costs faster.
+    """
+    if min(terrain) == max(terrain):
+        return breadth_first_distances(columns, rows, occupancy, source, targets, terrain[0])
+    remaining = set(targets)
+    found = {}
+    ring = max(terrain) + 1
+    buckets = [[] for _ in range(ring)]
+    buckets[0].append(source)
+    best = [INFINITY] * len(occupancy)
+    best[source] = 0
+    pending = 1
+    cost = 0
+    last_row = (rows - 1) * columns
+
+    def relax(neighbor):
+        new_cost = cost + terrain[neighbor]
+        if new_cost < best[neighbor]:
+            best[neighbor] = new_cost
+            buckets[new_cost % ring].append(neighbor)
+            return 1
+        return 0
+
+    while pending and remaining:
+        bucket = buckets[cost % ring]
+        if not bucket:
+            cost += 1
+            continue
+        cell = bucket.pop()
+        pending -= 1
+        if cost > best[cell]:
+            continue  # A cheaper entry for this cell was already expanded
+        if cell in remaining:
+            remaining.discard(cell)
+            found[cell] = cost
+        x = cell % columns
+        if cell >= columns and not occupancy[cell - columns]:
+            pending += relax(cell - columns)
+        if cell < last_row and not occupancy[cell + columns]:
+            pending += relax(cell + columns)
+        if x > 0 and not occupancy[cell - 1]:
+            pending += relax(cell - 1)
+        if x < columns - 1 and not occupancy[cell + 1]:
+            pending += relax(cell + 1)
+    return [found.get(target, INFINITY) for target in targets]
+
+
+def worker_distances(job):
+    """Process-pool entry point: distances from one source using the worker's shared map."""
+    source, targets = job
+    world = worker_world
+    return grid_distances(world.columns, world.rows, world.occupancy, world.terrain, source, targets)
+
+
+class ReservationTable:
+    """
+    Space-time reservations for cooperative A*.
+    A cell is taken at a time step, a move between two cells is taken between two steps
+    (so agents cannot swap places), and an agent that has finished parks on its cell forever.
+    The start cell of an agent that is not planned yet is held at every time step: nobody
+    knows yet when it will leave, so nobody else may enter it.
+    """
+
+    def __init__(self):
+        self.cells = {}  # (cell, t) -> agent id
+        self.moves = set()  # (from cell, to cell, t): move from t to t + 1
+        self.parked = {}  # cell -> first time step from which an agent stays there forever
+        self.last_reserved = {}  # cell -> last time step it is reserved (before parking)
+        self.held = {}  # Start cell -> id of the agent waiting there to be planned
+
+    def is_free(self, cell, t):
+        parked_from = self.parked.get(cell)
+        return (cell, t) not in self.cells and (parked_from is None or t < parked_from) and cell not in self.held
+
+    def can_move(self, cell, neighbor, t):
+        """Can an agent go from cell at t to neighbor at t + 1?"""
+        return self.is_free(neighbor, t + 1) and (neighbor, cell, t) not in self.moves
+
+    def can_park(self, cell, t):
+        """Can an agent stay on cell from t onwards?"""
+        return self.last_reserved.get(cell, -1) < t and cell not in self.parked and cell not in self.held
+
+    def hold(self, agent_id, cell):
+        """Keep cell for an agent that has not been planned yet, at every time step."""
+        self.held[cell] = agent_id
+
+    def release(self, cell):
+        """Give up a hold once its agent is being planned; its route then reserves the cell."""
+        del self.held[cell]
+
+    def reserve(self, agent_id, cells, start_time):
+        """Reserve a timed path (one cell per time step starting at start_time)."""
+        for offset, cell in enumerate(cells):
+            t = start_time + offset
+            self.cells[(cell, t)] = agent_id
+            if t > self.last_reserved.get(cell, -1):
+                self.last_reserved[cell] = t
+            if offset:
+                self.moves.add((cells[offset - 1], cell, t - 1))
+
+    def park(self, cell, t):
+        self.parked[cell] = t
+
+
+class Fleet:
+    """
+    Plans collision-free routes for many agents on one Environment.
+    Tasks are allocated greedily on true terrain-weighted path costs (computed with one search
+    per agent and per task, spread over a process pool), then each agent's route is planned in
+    priority order with space-time A* against a shared reservation table (cooperative A*).
+    """
+
+    def __init__(self, environment, starts, workers=None, horizon=None):
+        self.environment = environment
+        self.starts = [environment.cell_index(*start) for start in starts]
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        # Longest time an agent may spend on one leg before giving up
+        self.horizon = horizon if horizon is not None else 4 * (environment.columns + environment.rows) + len(starts)
+
+        self.assignments = [[] for _ in starts]  # Task positions per agent, in visiting order
+        self.paths = [[] for _ in starts]  # Position per time step per agent
+        self.completion_times = {}  # Task position -> time step it was completed
+        self.unassigned = []  # Tasks no agent can reach
+        self.failed = []  # Agents whose route could not be planned within the horizon
+
+    def distance_rows(self, sources, targets):
+        """Terrain-weighted path costs from each source cell to every target cell."""
+        world = self.environment.snapshot()
+        jobs = [(source, targets) for source in sources]
+        if self.workers <= 1 or len(jobs) < 2:
+            return [grid_distances(world.columns, world.rows, world.occupancy, world.terrain, source, targets)
+                    for source, targets in jobs]
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker, initargs=(world,)) as pool:
+            return list(pool.map(worker_distances, jobs, chunksize=max(1, len(jobs) // (4 * self.workers))))
+
+    def allocate(self, tasks):
+        """
+        Greedy allocation: repeatedly give the task that finishes cheapest to the agent that
+        would finish it, where an agent's finish cost is its current load plus the path cost
+        from its last task.
+        """
+        environment = self.environment
+        task_cells = [environment.cell_index(*task) for task in tasks]
+        rows = self.distance_rows(self.starts + task_cells, task_cells)
+        agent_rows, task_rows = rows[:len(self.starts)], rows[len(self.starts):]
+
+        ends = list(agent_rows)  # Distance row of each agent's current end point
+        loads = [0] * len(self.starts)
+        remaining = set(range(len(tasks)))
+        assignments = [[] for _ in self.starts]
+        while remaining:
+            best = None
+            for agent_id, row in enumerate(ends):
+                for task in remaining:
+                    finish = loads[agent_id] + row[task]
+                    if best is None or finish < best[0]:
+                        best = (finish, agent_id, task)
+            finish, agent_id, task = best
+            if finish == INFINITY:
+                break  # No agent can reach any remaining task
+            remaining.remove(task)
+            assignments[agent_id].append(tasks[task])
+            loads[agent_id] = finish
+            ends[agent_id] = task_rows[task]
+        self.unassigned = [tasks[task] for task in sorted(remaining)]
+        return assignments
+
+    def plan(self, tasks=None):
+        """Allocate tasks and plan every agent's collision-free route. Returns the paths."""
+        environment = self.environment
+        if tasks is None:
+            tasks = list(environment.task_locations_Astar)
+        self.assignments = self.allocate(list(tasks))
+        self.completion_times = {}
+        self.failed = []
+
+        table = ReservationTable()
+        for agent_id, start in enumerate(self.starts):
+            table.hold(agent_id, start)  # Nobody may run into an agent that has not moved yet
+
+        # Idle agents are planned first: they simply park where they stand
+        order = sorted(range(len(self.starts)), key=lambda agent_id: bool(self.assignments[agent_id]))
+        for agent_id in order:
+            table.release(self.starts[agent_id])
+            route = [self.starts[agent_id]]
+            for task in self.assignments[agent_id]:
+                is_last = task == self.assignments[agent_id][-1]
+                leg = self.space_time_search(table, route[-1], len(route) - 1, environment.cell_index(*task), is_last)
+                if leg is None:
+                    self.failed.append(agent_id)  # Its remaining tasks are not done
+                    break
+                route.extend(leg[1:])
+                self.completion_times[task] = len(route) - 1
+            if not table.can_park(route[-1], len(route) - 1):
+                # A failed leg left the agent where a later reservation runs through: move it
+                # to the nearest cell it can stay on (if none is in reach it parks regardless)
+                leg = self.space_time_search(table, route[-1], len(route) - 1)
+                if leg is not None:
+                    route.extend(leg[1:])
+            table.reserve(agent_id, route, 0)
+            table.park(route[-1], len(route) - 1)
+            self.paths[agent_id] = [environment.cell_position(cell) for cell in route]
+        return self.paths
+
+    def space_time_search(self, table, start, start_time, goal=None, park_at_goal=True):
+        """
+        A* over (cell, time) states with a wait move, avoiding reserved cells and swaps.
+        Stepping onto a cell costs its terrain cost and waiting costs 1, as on plain ground.
+        When park_at_goal is set the goal must stay free from the arrival time onwards; with
+        no goal the search ends on the cheapest cell the agent can park on.
+        Returns the cells visited from start_time to arrival, or None.
+        """
+        environment = self.environment
+        columns = environment.columns
+        terrain = environment.terrain
+        scale = environment.min_terrain_cost  # Keeps the Manhattan estimate admissible on any terrain
+        limit = start_time + self.horizon
+        if goal is not None:
+            goal_y, goal_x = divmod(goal, columns)
+            if table.parked.get(goal, INFINITY) <= start_time:
+                return None  # Another agent has already parked on the goal for good
+
+        def heuristic(cell):
+            if goal is None:
+                return 0
+            y, x = divmod(cell, columns)
+            return scale * (abs(x - goal_x) + abs(y - goal_y))
+
+        def is_done(cell, t):
+            if goal is None or park_at_goal:
+                return (goal is None or cell == goal) and table.can_park(cell, t)
+            return cell == goal
+
+        open_set = [(heuristic(start), start_time, start)]
+        g_score = {(start, start_time): 0}
+        came_from = {}
+        closed = set()
+        while open_set:
+            _, t, cell = heappop(open_set)
+            if (cell, t) in closed:
+                continue
+            closed.add((cell, t))
+            if is_done(cell, t):
+                cells = [cell]
+                state = (cell, t)
+                while state in came_from:
+                    state = came_from[state]
+                    cells.append(state[0])
+                cells.reverse()
+                return cells
+            if t >= limit:
+                continue
+            g = g_score[(cell, t)]
+            for neighbor in (cell, *environment.neighbor_cells(cell)):
+                state = (neighbor, t + 1)
+                if state in closed or not table.can_move(cell, neighbor, t):
+                    continue
+                tentative_g_score = g + (1 if neighbor == cell else terrain[neighbor])
+                if tentative_g_score < g_score.get(state, INFINITY):
+                    g_score[state] = tentative_g_score
+                    came_from[state] = (cell, t)
+                    heappush(open_set, (tentative_g_score + heuristic(neighbor), t + 1, neighbor))
+        return None
+
+    def collisions(self):
+        """Pairs of agents that share a cell at the same time or swap cells (should be empty)."""
+        found = []
+        length = max((len(path) for path in self.paths), default=0)
+        at = lambda path, t: path[min(t, len(path) - 1)]
+        for t in range(length):
+            seen = {}
+            for agent_id, path in enumerate(self.paths):
+                position = at(path, t)
+                if position in seen:
+                    found.append((seen[position], agent_id, t))
+                seen[position] = agent_id
+            if t:
+                moves = {(at(path, t - 1), at(path, t)): agent_id for agent_id, path in enumerate(self.paths)}
+                for (a, b), agent_id in moves.items():
+                    other = moves.get((b, a))
+                    if a != b and other is not None and other < agent_id:
+                        found.append((other, agent_id, t))
+        return found
+
+    def makespan(self):
+        """Time step at which the last agent finishes."""
+        return max((len(path) - 1 for path in self.paths), default=0)
+
+    def sum_of_costs(self):
+        """Total number of time steps the agents spend before parking."""
+        return sum(len(path) - 1 for path in self.paths)
@@ -0,0 +1,348 @@
+# hpa.py
+from heapq import heappush, heappop
+from bucket_queue import BucketQueue
+
+CLUSTER_SIZE = 16  # Cluster side length in cells
+ENTRANCE_SPLIT = 6  # Entrances at least this wide get a transition at each end instead of one in the middle
+GOAL_CACHE_SIZE = 1024  # Goals whose cluster search is kept between queries
+
+
+class HierarchicalPlanner:
+    """
+    HPA* (hierarchical path-finding A*) for large grids; stepping onto a cell costs its terrain cost.
+    The grid is split into square clusters. Each run of open cells along a border between two
+    clusters is an entrance with one or two transitions (a pair of facing cells). The abstract
+    graph links the two cells of a transition with the cost of stepping across and the
+    transition cells of one cluster with their distance inside that cluster. A query connects the start and goals to
+    their clusters, searches the small abstract graph and refines each abstract edge into
+    cells, reusing refined segments until their cluster changes. Paths stay close to optimal
+    but are not guaranteed optimal, since a path may only cross borders at transitions.
+    Barrier and terrain changes are read from the environment and only the clusters (and
+    borders) they touch are rebuilt.
+    """
+
+    def __init__(self, environment, cluster_size=CLUSTER_SIZE):
+        self.environment = environment
+        self.cluster_size = cluster_size
+        self.cluster_columns = -(-environment.columns // cluster_size)
+        self.cluster_rows = -(-environment.rows // cluster_size)
+
+        self.borders = {}  # (cluster, neighbor cluster) with cluster < neighbor -> [(cell, facing cell)]
+        self.cluster_nodes = {}  # Cluster -> transition cells inside it
+        self.edges = {}  # Transition cell -> {neighbor transition cell: cost}
+        self.segments = {}  # (cell, cell) in one cluster -> refined path between them
+        self.cluster_versions = {}  # Cluster -> number of times it was built, so cached searches can be checked
+        self.goal_searches = {}  # Goal cell -> (cluster version, distances, parents) of its reverse cluster search
+        self.change_index = len(environment.barrier_changes)
+        self.terrain_change_index = len(environment.terrain_changes)
+        self.expanded = 0  # Counters of the most recent plan() call
+        self.pushes = 0
+        self.pops = 0
+        self.largest_open_set = 0
+
+        clusters = range(self.cluster_columns * self.cluster_rows)
+        for cluster in clusters:
+            for neighbor in self.neighbor_clusters(cluster):
+                if cluster < neighbor:
+                    self.build_border(cluster, neighbor)
+        for cluster in clusters:
+            self.build_cluster(cluster)
+
+    def cluster_of(self, cell):
+        y, x = divmod(cell, self.environment.columns)
+        return (y // self.cluster_size) * self.cluster_columns + x // self.cluster_size
+
+    def cluster_bounds(self, cluster):
+        """(x0, y0, x1, y1) with x1 and y1 exclusive."""
+        cy, cx = divmod(cluster, self.cluster_columns)
+        x0, y0 = cx * self.cluster_size, cy * self.cluster_size
+        return (x0, y0, min(x0 + self.cluster_size, self.environment.columns),
+                min(y0 + self.cluster_size, self.environment.rows))
+
+    def neighbor_clusters(self, cluster):
+        cy, cx = divmod(cluster, self.cluster_columns)
+        if cy > 0:
+            yield cluster - self.cluster_columns
+        if cy < self.cluster_rows - 1:
+            yield cluster + self.cluster_columns
+        if cx > 0:
+            yield cluster - 1
+        if cx < self.cluster_columns - 1:
+            yield cluster + 1
+
+    def build_border(self, cluster, neighbor):
+        """Find the entrances between two adjacent clusters (cluster < neighbor)."""
+        columns, occupancy = self.environment.columns, self.environment.occupancy
+        x0, y0, x1, y1 = self.cluster_bounds(cluster)
+        if neighbor == cluster + 1 and neighbor % self.cluster_columns:
+            # Side by side: cells in the last column of cluster face the first column of neighbor
+            pairs = [(y * columns + x1 - 1, y * columns + x1) for y in range(y0, y1)]
+        else:
+            # Stacked: cells in the last row of cluster face the first row of neighbor
+            pairs = [((y1 - 1) * columns + x, y1 * columns + x) for x in range(x0, x1)]
+
+        transitions = []
+        run = []
+        for pair in pairs + [None]:  # None closes the last run
+            if pair is not None and not occupancy[pair[0]] and not occupancy[pair[1]]:
+                run.append(pair)
+                continue
+            if len(run) >= ENTRANCE_SPLIT:
+                transitions.extend((run[0], run[-1]))
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        self.borders[(cluster, neighbor)] = transitions
+
+    def build_cluster(self, cluster):
+        """Collect the cluster's transition cells and link them inside and across the cluster."""
+        for node in self.cluster_nodes.get(cluster, ()):
+            del self.edges[node]
+        nodes = set()
+        for neighbor in self.neighbor_clusters(cluster):
+            for a, b in self.borders[(min(cluster, neighbor), max(cluster, neighbor))]:
+                node, facing = (a, b) if cluster < neighbor else (b, a)
+                nodes.add(node)
+                self.edges.setdefault(node, {})[facing] = self.environment.terrain[facing]  # Crossing the border
+        for node in nodes:
+            distances, _ = self.cluster_search(node, nodes)
+            links = self.edges[node]
+            for other in nodes:
+                if other != node and other in distances:
+                    links[other] = distances[other]
+        self.cluster_nodes[cluster] = nodes
+        self.cluster_versions[cluster] = self.cluster_versions.get(cluster, 0) + 1
+
+    def cluster_search(self, source, targets=(), reverse=False):
+        """
+        Dijkstra search that never leaves the source's cluster, stopping once every cell in
+        targets is settled (or the cluster is exhausted). Distances are costs from source,
+        or costs to source when reverse is set. Returns (distances, parents).
+        """
+        environment = self.environment
+        columns = environment.columns
+        table, counts = environment.neighbor_table, environment.neighbor_count
+        terrain = environment.terrain
+        x0, y0, x1, y1 = self.cluster_bounds(self.cluster_of(source))
+        first, last = y0 * columns, y1 * columns  # Cell ids of the cluster's rows lie in [first, last)
+        distances = {source: 0}
+        parents = {source: None}
+        remaining = set(targets)
+        remaining.discard(source)
+
+        if environment.uniform_terrain:
+            # Every step costs the same: a breadth-first search settles cells as it finds them
+            step_cost = environment.min_terrain_cost
+            frontier = [source]
+            cost = 0
+            while frontier and (remaining or not targets):
+                cost += step_cost
+                next_frontier = []
+                for cell in frontier:
+                    base = 4 * cell
+                    for neighbor in table[base:base + counts[cell]]:
+                        if neighbor not in parents and first <= neighbor < last and x0 <= neighbor % columns < x1:
+                            distances[neighbor] = cost
+                            parents[neighbor] = cell
+                            next_frontier.append(neighbor)
+                            remaining.discard(neighbor)
+                frontier = next_frontier
+            return distances, parents
+
+        queue = BucketQueue(environment.max_terrain_cost)
+        queue.push(0, source)
+        while queue and (remaining or not targets):
+            cost, cell = queue.pop()
+            if cost > distances[cell]:
+                continue  # A cheaper entry for this cell was already settled
+            remaining.discard(cell)
+            base = 4 * cell
+            for neighbor in table[base:base + counts[cell]]:
+                if first <= neighbor < last and x0 <= neighbor % columns < x1:
+                    # Backwards, the step from neighbor onto cell is the one being paid for
+                    new_cost = cost + (terrain[cell] if reverse else terrain[neighbor])
+                    if new_cost < distances.get(neighbor, new_cost + 1):
+                        distances[neighbor] = new_cost
+                        parents[neighbor] = cell
+                        queue.push(new_cost, neighbor)
+        return distances, parents
+
+    def goal_search(self, goal):
+        """
+        Reverse cluster_search() from goal to the transitions of its cluster, cached until that
+        cluster is rebuilt, so repeated queries for the same task skip it. Returns (distances, parents).
+        """
+        cluster = self.cluster_of(goal)
+        version = self.cluster_versions[cluster]
+        cached = self.goal_searches.get(goal)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+        distances, parents = self.cluster_search(goal, self.cluster_nodes[cluster], reverse=True)
+        if len(self.goal_searches) >= GOAL_CACHE_SIZE:
+            del self.goal_searches[next(iter(self.goal_searches))]  # Drop the oldest entry
+        self.goal_searches[goal] = (version, distances, parents)
+        return distances, parents
+
+    def apply_changes(self):
+        """Rebuild the clusters and borders touched by barrier or terrain changes since the last query."""
+        environment = self.environment
+        changes = (environment.barrier_changes[self.change_index:]
+                   + environment.terrain_changes[self.terrain_change_index:])
+        if not changes:
+            return
+        columns = environment.columns
+        dirty = set()
+        dirty_borders = set()
+        for cell in changes:
+            cluster = self.cluster_of(cell)
+            dirty.add(cluster)
+            y, x = divmod(cell, columns)
+            x0, y0, x1, y1 = self.cluster_bounds(cluster)
+            for neighbor in self.neighbor_clusters(cluster):
+                nx0, ny0, _, _ = self.cluster_bounds(neighbor)
+                # Only a cell on the shared edge can change the entrances of that border (or their costs)
+                if (nx0 < x0 and x == x0) or (nx0 >= x1 and x == x1 - 1) or \
+                        (ny0 < y0 and y == y0) or (ny0 >= y1 and y == y1 - 1):
+                    dirty_borders.add((min(cluster, neighbor), max(cluster, neighbor)))
+        self.change_index = len(environment.barrier_changes)
+        self.terrain_change_index = len(environment.terrain_changes)
+
+        for cluster, neighbor in dirty_borders:
+            self.build_border(cluster, neighbor)
+            dirty.update((cluster, neighbor))
+        for cluster in dirty:
+            self.build_cluster(cluster)
+        self.segments = {key: path for key, path in self.segments.items() if self.cluster_of(key[0]) not in dirty}
+
+    def plan(self, start, order):
+        """
+        Path from start (cell id) to the closest goal found in the abstract graph. ``order``
+        maps goal cell ids to their tie-break rank. Returns (path as positions or None,
+        abstract nodes expanded, heap pushes, heap pops, largest open set).
+        """
+        self.apply_changes()
+        environment = self.environment
+        columns = environment.columns
+        self.expanded, self.pushes, self.pops, self.largest_open_set = 0, 0, 0, 0  # Until the search below
+
+        goal_parents = {}
+        exits = {}  # Transition cell -> [(cost to goal, rank, goal)]
+        for goal, rank in order.items():
+            if environment.occupancy[goal] and goal != start:
+                continue  # A barrier cannot be entered
+            distances, goal_parents[goal] = self.goal_search(goal)
+            for node in self.cluster_nodes[self.cluster_of(goal)]:
+                if node in distances:
+                    exits.setdefault(node, []).append((distances[node], rank, goal))
+        # The start search stops once its cluster's transitions and any goals inside it are settled
+        start_cluster = self.cluster_of(start)
+        start_targets = self.cluster_nodes[start_cluster] | {goal for goal in goal_parents
+                                                             if self.cluster_of(goal) == start_cluster}
+        start_distances, start_parents = self.cluster_search(start, start_targets)
+        goal_positions = [environment.cell_position(goal) for goal in goal_parents]
+        if not goal_positions:
+            return None, 0, 0, 0, 0
+
+        scale = environment.min_terrain_cost  # Keeps the Manhattan estimate admissible on any terrain
+        if len(goal_positions) == 1:
+            (gx, gy), = goal_positions
+
+            def heuristic(cell):
+                y, x = divmod(cell, columns)
+                return scale * (abs(x - gx) + abs(y - gy))
+        else:
+            def heuristic(cell):
+                y, x = divmod(cell, columns)
+                return scale * min(abs(x - gx) + abs(y - gy) for gx, gy in goal_positions)
+
+        # Heap entries: (f, 0 for a goal / 1 for a cell, tie, g, state). A goal state is ("goal", goal)
+        # and its tie is its rank, so equally close goals come off the heap first and in rank order.
+        # A cell's tie is -g, so among equal f the deepest cell is expanded first.
+        open_set = []
+        g_score = {}
+        came_from = {}
+        edges = self.edges
+        expanded, pushes, pops = 0, 0, 0
+
+        def push(state, cost, parent, kind, tie):
+            nonlocal pushes
+            if cost < g_score.get(state, cost + 1):
+                g_score[state] = cost
+                came_from[state] = parent
+                h = heuristic(state) if kind else 0  # Only computed for improved entries
+                heappush(open_set, (cost + h, kind, tie, cost, state))
+                pushes += 1
+
+        for goal, rank in order.items():
+            if goal in start_distances and goal in goal_parents:
+                push(("goal", goal), start_distances[goal], None, 0, rank)  # Same cluster, no border crossed
+        for node in self.cluster_nodes[start_cluster]:
+            if node in start_distances:
+                push(node, start_distances[node], None, 1, -start_distances[node])
+
+        path = None
+        largest = len(open_set)
+        while open_set:
+            _, kind, _, cost, state = heappop(open_set)
+            pops += 1
+            if cost > g_score[state]:
+                continue  # A cheaper entry for this state was already expanded
+            if not kind:
+                path = self.refine(state, came_from, start_parents, goal_parents[state[1]])
+                break
+            expanded += 1
+            # push() inlined for the abstract edges: this loop is most of a query's time
+            for neighbor, step in edges[state].items():
+                new_cost = cost + step
+                if new_cost < g_score.get(neighbor, new_cost + 1):
+                    g_score[neighbor] = new_cost
+                    came_from[neighbor] = state
+                    heappush(open_set, (new_cost + heuristic(neighbor), 1, -new_cost, new_cost, neighbor))
+                    pushes += 1
+            for to_goal, rank, goal in exits.get(state, ()):
+                push(("goal", goal), cost + to_goal, state, 0, rank)
+            if len(open_set) > largest:
+                largest = len(open_set)
+        self.expanded, self.pushes, self.pops, self.largest_open_set = expanded, pushes, pops, largest
+        return path, expanded, pushes, pops, largest
+
+    def refine(self, goal_state, came_from, start_parents, goal_parents):
+        """Turn the abstract path ending at goal_state into a cell-by-cell path of positions."""
+        transitions = []
+        state = came_from[goal_state]
+        while state is not None:
+            transitions.append(state)
+            state = came_from[state]
+        transitions.reverse()
+        goal = goal_state[1]
+
+        # Start to the first transition (or straight to the goal) inside the start cluster
+        first = transitions[0] if transitions else goal
+        cells = walk(start_parents, first)
+        cells.reverse()
+        for a, b in zip(transitions, transitions[1:]):
+            if self.cluster_of(a) != self.cluster_of(b):
+                cells.append(b)  # Border crossing
+            else:
+                cells.extend(self.segment(a, b)[1:])
+        if transitions:
+            cells.extend(walk(goal_parents, transitions[-1])[1:])  # Parents point towards the goal
+        return [self.environment.cell_position(cell) for cell in cells]
+
+    def segment(self, a, b):
+        """Cells from a to b inside their cluster, refined once and reused until the cluster changes."""
+        path = self.segments.get((a, b))
+        if path is None:
+            _, parents = self.cluster_search(a, (b,))
+            path = walk(parents, b)
+            path.reverse()
+            self.segments[(a, b)] = path = tuple(path)
+        return path
+
+
+def walk(parents, cell):
+    """Follow parent links from cell back to the search source."""
+    cells = [cell]
+    while parents[cells[-1]] is not None:
+        cells.append(parents[cells[-1]])
+    return cells
@@ -0,0 +1,117 @@
+# instrumentation.py
+import cProfile
+import io
+import json
+import pstats
+import time
+from functools import wraps
+
+
+class SearchProfiler:
+    """
+    Per-query search statistics for an agent. Enable it with ``agent.profiler = SearchProfiler()``.
+    Every instrumented search call adds one record: search name, nodes expanded, heap pushes
+    and pops, largest open-set size, elapsed time, path length and whether the path cache
+    answered. Records are kept in ``records`` and can also be appended to a JSONL file and
+    passed to hooks. ``sample_every`` keeps only every n-th call, and ``profile=True`` runs
+    the recorded calls under cProfile.
+    """
+
+    def __init__(self, log_path=None, sample_every=1, profile=False, keep_records=True):
+        self.records = []
+        self.keep_records = keep_records
+        self.sample_every = sample_every
+        self.calls = 0
+        self.hooks = []  # Called with every record
+        self.log = open(log_path, "a") if log_path else None
+        self.profile = cProfile.Profile() if profile else None
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def run(self, search, agent, algorithm, *args):
+        """Run one search call of the named run and record it (or just run it when it is not sampled)."""
+        self.calls += 1
+        if self.calls % self.sample_every:
+            return search(agent, *args)
+        run = agent.runs[algorithm]
+        cache = run.path_cache
+        hits = cache.hits if cache is not None else 0
+        start = time.perf_counter()
+        if self.profile is not None:
+            result = self.profile.runcall(search, agent, *args)
+        else:
+            result = search(agent, *args)
+        elapsed = time.perf_counter() - start
+
+        stats = run.last_search_stats
+        cached = cache is not None and cache.hits > hits
+        record = {
+            "search": search.__name__,
+            "time": time.time(),
+            "elapsed_ms": elapsed * 1000,
+            "expanded": stats["expanded"],
+            "pushes": stats["pushes"],
+            "pops": stats["pops"],
+            "max_open_set": stats["max_open_set"],
+            "path_length": len(result) - 1 if result else None,
+            "cached": cached,
+        }
+        if self.keep_records:
+            self.records.append(record)
+        if self.log is not None:
+            self.log.write(json.dumps(record) + "\n")
+            self.log.flush()  # Dashboards tail the file
+        for hook in self.hooks:
+            hook(record)
+        return result
+
+    def query(self, search=None, cached=None):
+        """Records, optionally only those of one search name and/or cache outcome."""
+        return [record for record in self.records
+                if (search is None or record["search"] == search) and (cached is None or record["cached"] == cached)]
+
+    def summary(self):
+        """Per search name: call count, mean and max elapsed ms, mean nodes expanded and cache hits."""
+        totals = {}
+        for record in self.records:
+            entry = totals.setdefault(record["search"], {"calls": 0, "elapsed_ms": 0.0, "max_elapsed_ms": 0.0,
+                                                         "expanded": 0, "cache_hits": 0})
+            entry["calls"] += 1
+            entry["elapsed_ms"] += record["elapsed_ms"]
+            entry["max_elapsed_ms"] = max(entry["max_elapsed_ms"], record["elapsed_ms"])
+            entry["expanded"] += record["expanded"]
+            entry["cache_hits"] += record["cached"]
+        for entry in totals.values():
+            entry["mean_elapsed_ms"] = entry.pop("elapsed_ms") / entry["calls"]
+            entry["mean_expanded"] = entry.pop("expanded") / entry["calls"]
+        return totals
+
+    def profile_report(self, sort="cumulative", limit=20):
+        """cProfile statistics of the recorded calls as text (empty unless profile=True)."""
+        if self.profile is None:
+            return ""
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+
+def instrumented(algorithm):
+    """
+    Report calls of the named run's search method to ``agent.profiler``; costs one check when
+    it is None.
+    """
+    def decorate(search):
+        @wraps(search)
+        def wrapper(agent, *args):
+            profiler = agent.profiler
+            if profiler is None:
+                return search(agent, *args)
+            return profiler.run(search, agent, algorithm, *args)
+        return wrapper
+    return decorate
@@ -0,0 +1,164 @@
+# jps.py
+from bisect import bisect_left, bisect_right
+from heapq import heappush, heappop
+
+
+def jump_point_search(environment, start, order):
+    """
+    Jump Point Search for a 4-connected grid where every move costs 1.
+    Straight runs of cells with no branching choice are skipped in one jump, so only jump
+    points are pushed to the open list. ``order`` maps goal cell ids to their tie-break
+    rank; the closest goal wins and equally close goals are resolved by rank.
+    Returns (path as positions or None, nodes expanded, heap pushes, heap pops, largest open set).
+    """
+    columns, rows = environment.columns, environment.rows
+    occupancy = environment.occupancy
+    goal_positions = [environment.cell_position(cell) for cell in order]
+
+    def free(x, y):
+        return 0 <= x < columns and 0 <= y < rows and not occupancy[y * columns + x]
+
+    # Goal columns per row, sorted, so a horizontal scan can find the next goal with bisect
+    goal_columns = {}
+    for gx, gy in goal_positions:
+        goal_columns.setdefault(gy, []).append(gx)
+    for xs in goal_columns.values():
+        xs.sort()
+
+    def jump_horizontal(x, y, dx):
+        """
+        Scan left or right until a goal, a forced neighbor or a wall.
+        A side cell that is open here but was blocked one step back forces a turn. Instead
+        of stepping cell by cell, the row and its two neighbor rows are searched with
+        bytearray.find / rfind for the next wall and the next forced cell. Every scan stays
+        inside its own row, so a cell at the other end of the next or previous row is never read.
+        """
+        if not 0 <= x < columns or not 0 <= y < rows:
+            return None
+        row = y * columns
+        if dx > 0:
+            wall = occupancy.find(1, row + x, row + columns)
+            stop = wall - row if wall != -1 else columns  # First column that cannot be reached
+            candidates = []
+            xs = goal_columns.get(y)
+            if xs:
+                index = bisect_left(xs, x)
+                if index < len(xs):
+                    candidates.append(xs[index])
+            for side in (y - 1, y + 1):
+                if 0 <= side < rows:
+                    side_row = side * columns
+                    blocked = occupancy.find(1, side_row + max(x - 1, 0), side_row + columns)
+                    if blocked != -1:
+                        opened = occupancy.find(0, blocked, side_row + columns)
+                        if opened != -1:
+                            candidates.append(opened - side_row)
+            best = min(candidates, default=columns)
+            return (best, y) if best < stop else None
+
+        wall = occupancy.rfind(1, row, row + x + 1)
+        stop = wall - row if wall != -1 else -1  # Last column that cannot be reached
+        candidates = []
+        xs = goal_columns.get(y)
+        if xs:
+            index = bisect_right(xs, x)
+            if index:
+                candidates.append(xs[index - 1])
+        for side in (y - 1, y + 1):
+            if 0 <= side < rows:
+                side_row = side * columns
+                blocked = occupancy.rfind(1, side_row, side_row + min(x + 2, columns))
+                if blocked != -1:
+                    opened = occupancy.rfind(0, side_row, blocked)
+                    if opened != -1:
+                        candidates.append(opened - side_row)
+        best = max(candidates, default=-1)
+        return (best, y) if best > stop else None
+
+    def jump_vertical(x, y, dy):
+        """Scan up or down; any horizontal jump point reachable from a cell makes it a jump point."""
+        while True:
+            if not free(x, y):
+                return None
+            if y * columns + x in order:
+                return (x, y)
+            if (free(x - 1, y) and not free(x - 1, y - dy)) or (free(x + 1, y) and not free(x + 1, y - dy)):
+                return (x, y)
+            if jump_horizontal(x + 1, y, 1) or jump_horizontal(x - 1, y, -1):
+                return (x, y)
+            y += dy
+
+    def heuristic(x, y):
+        return min(abs(x - gx) + abs(y - gy) for gx, gy in goal_positions)
+
+    def successors(x, y, parent):
+        """Pruned directions to scan from (x, y) given the jump point it was reached from."""
+        if parent is None:
+            return ((0, -1), (0, 1), (-1, 0), (1, 0))
+        px, py = parent
+        dx = (x > px) - (x < px)
+        dy = (y > py) - (y < py)
+        if dx:
+            return ((0, -1), (0, 1), (dx, 0))
+        return ((-1, 0), (1, 0), (0, dy))
+
+    open_set = [(heuristic(*start), start)]
+    came_from = {}
+    g_score = {start: 0}
+    best_goal = None
+    best_cost = None
+    expanded, pushes, pops, largest = 0, 1, 0, 1  # The start cell is the first push
+
+    while open_set:
+        f, current = heappop(open_set)
+        pops += 1
+        if best_cost is not None and f > best_cost:
+            break  # Every remaining entry is farther than the goals found
+        x, y = current
+        cell = y * columns + x
+        if cell in order:
+            cost = g_score[current]
+            if best_cost is None or (cost == best_cost and order[cell] < order[best_goal[1] * columns + best_goal[0]]):
+                best_goal, best_cost = current, cost
+            continue
+        if f > g_score[current] + heuristic(x, y):
+            continue  # A cheaper entry for this jump point was already expanded
+
+        expanded += 1
+        for dx, dy in successors(x, y, came_from.get(current)):
+            if dx:
+                jump_point = jump_horizontal(x + dx, y, dx)
+            else:
+                jump_point = jump_vertical(x, y + dy, dy)
+            if jump_point is None:
+                continue
+            jx, jy = jump_point
+            tentative_g_score = g_score[current] + abs(jx - x) + abs(jy - y)
+            if jump_point not in g_score or tentative_g_score < g_score[jump_point]:
+                came_from[jump_point] = current
+                g_score[jump_point] = tentative_g_score
+                heappush(open_set, (tentative_g_score + heuristic(jx, jy), jump_point))
+                pushes += 1
+                largest = max(largest, len(open_set))
+
+    if best_goal is None:
+        return None, expanded, pushes, pops, largest
+    return expand_jump_points(came_from, best_goal), expanded, pushes, pops, largest
+
+
+def expand_jump_points(came_from, goal):
+    """Rebuild the full cell-by-cell path from the straight segments between jump points."""
+    jump_points = [goal]
+    while jump_points[-1] in came_from:
+        jump_points.append(came_from[jump_points[-1]])
+    jump_points.reverse()
+
+    path = [jump_points[0]]
+    for (x, y) in jump_points[1:]:
+        px, py = path[-1]
+        dx = (x > px) - (x < px)
+        dy = (y > py) - (y < py)
+        while (px, py) != (x, y):
+            px, py = px + dx, py + dy
+            path.append((px, py))
+    return path
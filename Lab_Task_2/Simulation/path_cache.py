@@ -0,0 +1,74 @@
+# path_cache.py
+from collections import OrderedDict
+from functools import wraps
+
+MISSING = object()
+
+
+class PathCache:
+    """
+    Bounded LRU cache of search results keyed by (search, start, goal, environment version).
+    The environment version changes whenever barriers or tasks change, so stale entries are
+    never returned; they simply age out of the cache.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached result for key, or MISSING."""
+        result = self.entries.get(key, MISSING)
+        if result is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)  # Evict the least recently used entry
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+        }
+
+
+def cached_search(algorithm):
+    """
+    Put a run's path cache in front of a search method taking one target or a collection of
+    targets. algorithm names the run (in agent.runs) whose position, cache and stats it uses.
+    """
+    def decorate(search):
+        @wraps(search)
+        def wrapper(agent, targets):
+            run = agent.runs[algorithm]
+            cache = run.path_cache
+            if cache is None:
+                return search(agent, targets)
+            key = (search.__name__, tuple(run.position), tuple(targets), agent.environment.version)
+            result = cache.get(key)
+            if result is MISSING:
+                result = search(agent, targets)
+                cache.put(key, tuple(result) if result is not None else None)
+                return result
+            # A hit searches nothing, so every counter a search would record is zero
+            return agent.finish_search(run, list(result) if result is not None else None, 0, 0)
+        return wrapper
+    return decorate
@@ -0,0 +1,172 @@
+# renderer.py
+import pygame
+
+# Colors
+BACKGROUND_COLOR = (255, 255, 255)
+GRID_LINE_COLOR = (200, 200, 200)
+BARRIER_COLOR = (0, 0, 0)       # Barrier color is black
+TASK_COLOR = (255, 0, 0)        # Task color is red
+TASK_TEXT_COLOR = (255, 255, 255)
+PATH_COLOR_ASTAR = (0, 255, 0)  # A* path outline is green
+PATH_COLOR_UCS = (255, 165, 0)  # UCS path outline is orange
+TEXT_COLOR = (0, 0, 0)
+BUTTON_COLOR = (0, 200, 0)
+BUTTON_HOVER_COLOR = (0, 255, 0)
+BUTTON_TEXT_COLOR = (255, 255, 255)
+PATH_COLORS = {"Astar": PATH_COLOR_ASTAR, "UCS": PATH_COLOR_UCS}
+PANEL_TITLES = {"Astar": "A* Details:", "UCS": "UCS Details:"}
+PANEL_SECTION_HEIGHT = 210  # Vertical space for one algorithm's details in the status panel
+TERRAIN_SHADE_STEP = 20  # Each extra point of terrain cost darkens a cell by this much
+
+
+class GridRenderer:
+    """
+    Layered renderer for the grid view.
+    Grid lines and barriers are drawn once to a cached static surface. Each frame only the
+    cells whose overlays (paths, tasks, agent) changed are restored from that surface and
+    redrawn, and the status panel is redrawn only when its text or button hover changes.
+    render() returns the dirty rectangles to pass to pygame.display.update().
+    """
+
+    def __init__(self, screen, environment, font, grid_width, buttons):
+        self.screen = screen
+        self.environment = environment
+        self.font = font
+        self.grid_size = environment.grid_size
+        self.grid_width = grid_width  # The status panel starts right of this x
+        self.buttons = buttons  # List of (label, rect)
+
+        self.static_layer = self.build_static_layer()
+        self.task_labels = {}  # Task number -> rendered label surface
+        self.drawn_overlays = {}  # (x, y) -> overlays drawn in that cell last frame
+        self.drawn_panel = None  # Panel state drawn last frame
+        self.barrier_change_index = len(environment.barrier_changes)
+        self.terrain_change_index = len(environment.terrain_changes)
+        self.full_redraw = True
+
+    def build_static_layer(self):
+        """Background, grid lines, barriers and the panel separator."""
+        layer = pygame.Surface(self.screen.get_size())
+        layer.fill(BACKGROUND_COLOR)
+        for x in range(self.environment.columns):
+            for y in range(self.environment.rows):
+                self.draw_static_cell(layer, x, y)
+        height = self.screen.get_height()
+        pygame.draw.line(layer, (0, 0, 0), (self.grid_width, 0), (self.grid_width, height))
+        return layer
+
+    def draw_static_cell(self, layer, x, y):
+        rect = self.cell_rect(x, y)
+        if self.environment.is_barrier(x, y):
+            pygame.draw.rect(layer, BARRIER_COLOR, rect)
+        else:
+            # Costlier terrain is drawn darker; plain ground (cost 1) keeps the background color
+            shade = max(255 - TERRAIN_SHADE_STEP * (self.environment.terrain[y * self.environment.columns + x] - 1), 90)
+            pygame.draw.rect(layer, (shade, shade, shade), rect)
+            pygame.draw.rect(layer, GRID_LINE_COLOR, rect, 1)  # Draw grid lines
+
+    def cell_rect(self, x, y):
+        return pygame.Rect(x * self.grid_size, y * self.grid_size, self.grid_size, self.grid_size)
+
+    def task_label(self, task_number):
+        label = self.task_labels.get(task_number)
+        if label is None:
+            label = self.task_labels[task_number] = self.font.render(str(task_number), True, TASK_TEXT_COLOR)
+        return label
+
+    def cell_overlays(self, agent):
+        """Everything drawn on top of the static layer, grouped by cell, in drawing order."""
+        overlays = {}
+        for name, run in agent.runs.items():
+            color = PATH_COLORS.get(name, PATH_COLOR_ASTAR)
+            for position in run.path:
+                overlays.setdefault(tuple(position), []).append(("path", color))
+        for run in agent.runs.values():
+            for position, task_number in run.tasks.items():
+                overlays.setdefault(position, []).append(("task", task_number))
+        agent_cell = (agent.rect.x // self.grid_size, agent.rect.y // self.grid_size)
+        overlays.setdefault(agent_cell, []).append(("agent", agent.image))
+        return {position: tuple(items) for position, items in overlays.items()}
+
+    def draw_cell(self, position, overlays):
+        rect = self.cell_rect(*position)
+        self.screen.blit(self.static_layer, rect, rect)
+        for kind, value in overlays:
+            if kind == "path":
+                pygame.draw.rect(self.screen, value, rect, 3)
+            elif kind == "task":
+                pygame.draw.rect(self.screen, TASK_COLOR, rect)
+                label = self.task_label(value)
+                self.screen.blit(label, label.get_rect(center=rect.center))
+            else:
+                self.screen.blit(value, rect)
+        return rect
+
+    def refresh_barriers(self):
+        """Redraw cells whose barrier state or terrain changed since the last frame onto the static layer."""
+        environment = self.environment
+        changed = set()
+        for cell in (environment.barrier_changes[self.barrier_change_index:]
+                     + environment.terrain_changes[self.terrain_change_index:]):
+            position = environment.cell_position(cell)
+            self.draw_static_cell(self.static_layer, *position)
+            changed.add(position)
+        self.barrier_change_index = len(environment.barrier_changes)
+        self.terrain_change_index = len(environment.terrain_changes)
+        return changed
+
+    def panel_state(self, agent):
+        """Text lines and button hover flags shown in the status panel."""
+        mouse_pos = pygame.mouse.get_pos()
+        lines = []
+        for index, (name, run) in enumerate(agent.runs.items()):
+            y = 10 + index * PANEL_SECTION_HEIGHT
+            completed = ", ".join(map(str, run.completed_tasks))
+            lines.extend([
+                (PANEL_TITLES.get(name, name + " Details:"), y),
+                (f"Tasks Completed: {run.task_completed}", y + 30),
+                (f"Position: {run.position}", y + 60),
+                (f"Completed Tasks: {completed}", y + 90),
+                (f"Total Path Cost: {run.total_cost}", y + 120),
+            ])
+        hovered = tuple(rect.collidepoint(mouse_pos) for _, rect in self.buttons)
+        return tuple(lines), hovered
+
+    def draw_panel(self, state):
+        lines, hovered = state
+        width, height = self.screen.get_size()
+        panel_rect = pygame.Rect(self.grid_width + 1, 0, width - self.grid_width - 1, height)
+        self.screen.fill(BACKGROUND_COLOR, panel_rect)
+        status_x = self.grid_width + 30
+        for text, y in lines:
+            self.screen.blit(self.font.render(text, True, TEXT_COLOR), (status_x, y))
+        for (label, rect), hover in zip(self.buttons, hovered):
+            pygame.draw.rect(self.screen, BUTTON_HOVER_COLOR if hover else BUTTON_COLOR, rect)
+            text = self.font.render(label, True, BUTTON_TEXT_COLOR)
+            self.screen.blit(text, text.get_rect(center=rect.center))
+        return panel_rect
+
+    def render(self, agent):
+        """Draw what changed since the last frame and return the dirty rectangles."""
+        overlays = self.cell_overlays(agent)
+        changed_barriers = self.refresh_barriers()
+        panel = self.panel_state(agent)
+
+        if self.full_redraw:
+            self.screen.blit(self.static_layer, (0, 0))
+            for position, items in overlays.items():
+                self.draw_cell(position, items)
+            self.draw_panel(panel)
+            self.drawn_overlays, self.drawn_panel = overlays, panel
+            self.full_redraw = False
+            return [self.screen.get_rect()]
+
+        dirty = []
+        for position in set(overlays) | set(self.drawn_overlays) | changed_barriers:
+            items = overlays.get(position, ())
+            if items != self.drawn_overlays.get(position, ()) or position in changed_barriers:
+                dirty.append(self.draw_cell(position, items))
+        if panel != self.drawn_panel:
+            dirty.append(self.draw_panel(panel))
+        self.drawn_overlays, self.drawn_panel = overlays, panel
+        return dirty
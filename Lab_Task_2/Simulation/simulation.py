@@ -0,0 +1,74 @@
+# simulation.py
+from agent import ALGORITHMS  # Algorithms the agent runs side by side, one AlgorithmRun each
+
+
+class Simulation:
+    """
+    Fixed-timestep simulation core with no display dependency.
+    Each step() is one tick for every started algorithm: an idle agent looks for its nearest
+    task and a moving agent takes one step along its path. Observers are called after every
+    tick with the simulation, so a renderer or recorder can watch but is never required.
+    """
+
+    def __init__(self, environment, agent):
+        self.environment = environment
+        self.agent = agent
+        self.started = {algorithm: False for algorithm in ALGORITHMS}
+        self.stalled = {algorithm: False for algorithm in ALGORITHMS}  # Last search found no reachable task
+        self.ticks = 0
+        self.observers = []
+
+    def add_observer(self, observer):
+        """Call observer(simulation) after every tick."""
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        self.observers.remove(observer)
+
+    def tasks(self, algorithm):
+        return self.agent.runs[algorithm].tasks
+
+    def is_moving(self, algorithm):
+        return self.agent.runs[algorithm].moving
+
+    def start(self, algorithm):
+        """Start an algorithm and plan its first path right away (what its button does)."""
+        if self.started[algorithm]:
+            return
+        self.started[algorithm] = True
+        if self.tasks(algorithm):
+            self.find_next_task(algorithm)
+
+    def find_next_task(self, algorithm):
+        self.agent.find_nearest_task(algorithm)
+        self.stalled[algorithm] = not self.is_moving(algorithm)
+
+    def step(self):
+        """Advance the simulation by one tick."""
+        for algorithm in ALGORITHMS:
+            if not self.started[algorithm]:
+                continue
+            if not self.is_moving(algorithm) and self.tasks(algorithm):
+                self.find_next_task(algorithm)
+            elif self.is_moving(algorithm):
+                self.agent.move(algorithm)
+        self.ticks += 1
+        for observer in self.observers:
+            observer(self)
+
+    def is_finished(self, algorithm):
+        """Every task is done, or the last search found none of the remaining tasks reachable."""
+        return self.started[algorithm] and (not self.tasks(algorithm) or self.stalled[algorithm])
+
+    def is_complete(self):
+        """Every started algorithm is finished (true when nothing has been started)."""
+        return all(self.is_finished(algorithm) for algorithm in ALGORITHMS if self.started[algorithm])
+
+    def run(self, max_ticks=None):
+        """Fast-forward until complete or until max_ticks more ticks. Returns the ticks run."""
+        first_tick = self.ticks
+        while not self.is_complete():
+            if max_ticks is not None and self.ticks - first_tick >= max_ticks:
+                break
+            self.step()
+        return self.ticks - first_tick
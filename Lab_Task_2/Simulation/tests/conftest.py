@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The simulation modules are flat, top-level modules next to this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from benchmarks.common import path_cost, uncached_agent
+from environment import Environment
+
+
+def edge_environment(columns, rows, seed):
+    """Seeded non-square grid with random barriers and extra barriers along all four edges."""
+    environment = Environment(columns, rows, 1, num_tasks=6, num_barriers=columns * rows // 6, seed=seed)
+    rng = random.Random(seed)
+    edges = [(x, y) for x in range(columns) for y in (0, rows - 1)] + \
+            [(x, y) for y in range(rows) for x in (0, columns - 1)]
+    for x, y in rng.sample(edges, len(edges) // 3):
+        if (x, y) not in environment.tasks:
+            environment.add_barrier(x, y)
+    return environment
+
+
+@pytest.mark.parametrize("columns, rows", [(37, 11), (9, 41), (64, 33)])
+@pytest.mark.parametrize("seed", range(5))
+def test_jps_matches_astar_cost(columns, rows, seed):
+    environment = edge_environment(columns, rows, seed)
+    agent = uncached_agent(environment)
+    tasks = list(environment.task_locations_Astar)
+    free_cells = [(x, y) for y in range(rows) for x in range(columns) if not environment.is_barrier(x, y)]
+    # Start from edge and corner cells as well as random ones
+    starts = [cell for cell in free_cells if cell[0] in (0, columns - 1) or cell[1] in (0, rows - 1)][:10]
+    starts += random.Random(seed).sample(free_cells, 10)
+    for start in starts:
+        agent.position_Astar = start
+        astar_path = agent.find_path_to_nearest_Astar(tasks)
+        jps_path = agent.find_path_to_nearest_JPS(tasks)
+        assert path_cost(environment, jps_path) == path_cost(environment, astar_path), start
+        if jps_path:
+            assert jps_path[0] == start and jps_path[-1] in tasks
+            steps = zip(jps_path, jps_path[1:])
+            assert all(abs(ax - bx) + abs(ay - by) == 1 and not environment.is_barrier(bx, by)
+                       for (ax, ay), (bx, by) in steps)
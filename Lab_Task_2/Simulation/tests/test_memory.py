@@ -0,0 +1,12 @@
+from benchmarks.memory import ucs_memory_profile
+
+
+def test_ucs_peak_memory_stays_flat_as_the_path_grows():
+    # One map size, lanes from the full width down to one cell: the path gets over 10x longer
+    rows = ucs_memory_profile(side=61, widths=[61, 7, 3, 1])
+    lengths = [length for _, length, _, _, _, _, _ in rows]
+    peaks = [peak for _, _, _, peak, _, _, _ in rows]
+    assert lengths == sorted(lengths) and lengths[-1] > 10 * lengths[0]
+    # Parent pointers keep one entry per explored cell, so the peak follows the map, not the path
+    assert max(peaks) < 1.5 * peaks[0]
+    assert max(peaks) < 200 * 61 * 61
@@ -0,0 +1,30 @@
+from agent import Agent
+from environment import Environment
+
+
+def test_snapshot_is_shared_until_the_map_changes():
+    environment = Environment(20, 20, 1, num_tasks=3, num_barriers=0, seed=1)
+    snapshot = environment.snapshot()
+    assert environment.snapshot() is snapshot
+    # Wall off the right column: the old snapshot still sees an open map
+    for y in range(20):
+        environment.add_barrier(18, y)
+    assert environment.snapshot() is not snapshot
+    assert not snapshot.is_barrier(18, 5) and snapshot.is_reachable((0, 0), (19, 19))
+    assert not environment.is_reachable((0, 0), (19, 19))
+
+
+def test_runs_keep_their_own_snapshot_cache_and_stats():
+    environment = Environment(30, 30, 1, num_tasks=5, num_barriers=100, seed=2)
+    agent = Agent(environment, 1)
+    astar, ucs = agent.runs["Astar"], agent.runs["UCS"]
+    assert astar.path_cache is not ucs.path_cache
+    path = agent.find_path_to_nearest_Astar(astar.tasks)
+    astar_stats = astar.last_search_stats
+    assert astar.world is environment.snapshot() and astar_stats["expanded"] > 0
+    agent.find_path_to_nearest_UCS(ucs.tasks)
+    assert astar.last_search_stats is astar_stats  # The UCS search left the A* counters alone
+    assert ucs.path_cache.stats()["misses"] == 1 and astar.path_cache.stats()["misses"] == 1
+    assert agent.find_path_to_nearest_Astar(astar.tasks) == path
+    assert astar.path_cache.hits == 1 and astar.last_search_stats["expanded"] == 0
+    assert set(astar.last_search_stats) == {"expanded", "pushes", "pops", "max_open_set"}
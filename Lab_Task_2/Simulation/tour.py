@@ -0,0 +1,176 @@
+# tour.py
+from collections import deque
+from itertools import combinations
+from bucket_queue import BucketQueue
+
+INFINITY = float("inf")
+HELD_KARP_LIMIT = 12  # Largest number of tasks solved exactly
+
+
+def distances_from(environment, source, targets):
+    """
+    Shortest-path cost from one source position to each target position (INFINITY if
+    unreachable), stopping once every target is found. Breadth-first when every cell costs
+    the same, Dijkstra with a bucket queue on mixed terrain.
+    """
+    if not environment.uniform_terrain:
+        return weighted_distances_from(environment, source, targets)
+    columns = environment.columns
+    table, counts = environment.neighbor_table, environment.neighbor_count
+    start = environment.cell_index(*source)
+    wanted = {environment.cell_index(*target) for target in targets}
+    found = {}
+    distance = {start: 0}
+    queue = deque([start])
+    while queue and len(found) < len(wanted):
+        cell = queue.popleft()
+        if cell in wanted:
+            found[cell] = distance[cell]
+        step = distance[cell] + 1  # Each move has a cost of 1
+        base = 4 * cell
+        for neighbor in table[base:base + counts[cell]]:
+            if neighbor not in distance:
+                distance[neighbor] = step
+                queue.append(neighbor)
+    step_cost = environment.min_terrain_cost
+    return [found.get(y * columns + x, INFINITY) * step_cost for x, y in targets]
+
+
+def weighted_distances_from(environment, source, targets):
+    """Dijkstra version of distances_from, paying the terrain cost of every cell stepped onto."""
+    columns, terrain = environment.columns, environment.terrain
+    table, counts = environment.neighbor_table, environment.neighbor_count
+    start = environment.cell_index(*source)
+    wanted = {environment.cell_index(*target) for target in targets}
+    found = {}
+    distance = {start: 0}
+    queue = BucketQueue(environment.max_terrain_cost)
+    queue.push(0, start)
+    while queue and len(found) < len(wanted):
+        cost, cell = queue.pop()
+        if cost > distance[cell]:
+            continue  # A cheaper entry for this cell was already settled
+        if cell in wanted:
+            found[cell] = cost
+        base = 4 * cell
+        for neighbor in table[base:base + counts[cell]]:
+            new_cost = cost + terrain[neighbor]
+            if new_cost < distance.get(neighbor, new_cost + 1):
+                distance[neighbor] = new_cost
+                queue.push(new_cost, neighbor)
+    return [found.get(y * columns + x, INFINITY) for x, y in targets]
+
+
+def distance_matrix(environment, points):
+    """Pairwise shortest-path distances between points, with one search per source point."""
+    return [distances_from(environment, source, points) for source in points]
+
+
+def tour_cost(order, matrix):
+    """Cost of visiting order (indices into matrix) starting from index 0."""
+    cost, previous = 0, 0
+    for index in order:
+        cost += matrix[previous][index]
+        previous = index
+    return cost
+
+
+def held_karp(matrix):
+    """
+    Exact shortest open tour from index 0 through every other index (Held-Karp).
+    Runs in O(2^n * n^2), so only use it for small task counts.
+    """
+    count = len(matrix) - 1
+    if count <= 0:
+        return []
+    full = (1 << count) - 1
+    # best[mask][last]: cheapest way to visit the tasks in mask, ending at task `last`
+    best = [[INFINITY] * count for _ in range(full + 1)]
+    parent = [[-1] * count for _ in range(full + 1)]
+    for task in range(count):
+        best[1 << task][task] = matrix[0][task + 1]
+
+    for size in range(2, count + 1):
+        for members in combinations(range(count), size):
+            mask = 0
+            for task in members:
+                mask |= 1 << task
+            for last in members:
+                previous_mask = mask ^ (1 << last)
+                row = best[previous_mask]
+                for previous in members:
+                    if previous == last:
+                        continue
+                    cost = row[previous] + matrix[previous + 1][last + 1]
+                    if cost < best[mask][last]:
+                        best[mask][last] = cost
+                        parent[mask][last] = previous
+
+    last = min(range(count), key=lambda task: best[full][task])
+    order, mask = [], full
+    while last != -1:
+        order.append(last + 1)
+        mask, last = mask ^ (1 << last), parent[mask][last]
+    order.reverse()
+    return order
+
+
+def nearest_insertion(matrix):
+    """Build an open tour from index 0 by repeatedly inserting the closest unvisited index."""
+    tour = [0]
+    remaining = set(range(1, len(matrix)))
+    # closest[i]: distance from unvisited index i to the nearest index already in the tour
+    closest = {index: matrix[0][index] for index in remaining}
+    while remaining:
+        index = min(remaining, key=lambda candidate: (closest[candidate], candidate))
+        remaining.remove(index)
+
+        best_position = len(tour)
+        best_increase = matrix[tour[-1]][index]  # Appending to the end of the open tour
+        for position in range(1, len(tour)):
+            before, after = tour[position - 1], tour[position]
+            increase = matrix[before][index] + matrix[index][after] - matrix[before][after]
+            if increase < best_increase:
+                best_position, best_increase = position, increase
+        tour.insert(best_position, index)
+
+        for other in remaining:
+            if matrix[index][other] < closest[other]:
+                closest[other] = matrix[index][other]
+    return tour[1:]
+
+
+def two_opt(order, matrix):
+    """
+    Improve an open tour from index 0 by reversing segments until no reversal helps.
+    On terrain the matrix is not symmetric (a step costs the cell stepped onto), and going
+    a segment b..c backwards costs matrix[c][b] - matrix[b][c] more than going it forwards.
+    """
+    tour = [0] + list(order)
+    last = len(tour) - 1
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, last):
+            a, b = tour[i - 1], tour[i]
+            for j in range(i + 1, last + 1):
+                c = tour[j]
+                flip = matrix[c][b] - matrix[b][c]
+                if j == last:
+                    # Reversing the tail of an open tour only changes its first edge
+                    delta = matrix[a][c] - matrix[a][b] + flip
+                else:
+                    d = tour[j + 1]
+                    delta = matrix[a][c] + matrix[b][d] - matrix[a][b] - matrix[c][d] + flip
+                if delta < 0:
+                    tour[i:j + 1] = reversed(tour[i:j + 1])
+                    b = tour[i]
+                    improved = True
+    return tour[1:]
+
+
+def plan_tour(matrix, exact_limit=HELD_KARP_LIMIT):
+    """Order the tasks: exact for small counts, nearest insertion + 2-opt otherwise."""
+    if len(matrix) - 1 <= exact_limit:
+        return held_karp(matrix)
+    return two_opt(nearest_insertion(matrix), matrix)
@@ -0,0 +1,288 @@
+# trajectory.py
+import json
+import os
+from array import array
+from collections import deque
+from types import MappingProxyType
+
+import numpy as np
+
+from environment import Environment
+from simulation import ALGORITHMS
+
+# One row per move: 16 bytes. Rows are grouped by algorithm and in tick order within a group.
+STEP_DTYPE = np.dtype([
+    ("tick", "<u4"),      # Simulation tick after which the agent stood here
+    ("algorithm", "u1"),  # Index into ALGORITHMS
+    ("x", "<u2"),
+    ("y", "<u2"),
+    ("cost", "u1"),       # Terrain cost of this step
+    ("task", "<i2"),      # Number of the task completed by this step, or -1
+    ("total", "<u4"),     # Total path cost after this step
+])
+# One row per barrier or terrain change made while recording
+MAP_EVENT_DTYPE = np.dtype([
+    ("tick", "<u4"),
+    ("cell", "<u4"),
+    ("kind", "u1"),   # BARRIER_EVENT or TERRAIN_EVENT
+    ("value", "u1"),  # New occupancy (0/1) or new terrain cost
+])
+# One row per new path: the tick after which the run was following a freshly planned path
+PLAN_DTYPE = np.dtype([
+    ("tick", "<u4"),
+    ("algorithm", "u1"),
+])
+BARRIER_EVENT, TERRAIN_EVENT = 0, 1
+FORMAT_VERSION = 2
+
+
+class TrajectoryRecorder:
+    """
+    Records a Simulation into a compact binary log. Attach it with
+    ``simulation.add_observer(TrajectoryRecorder(simulation))``; after every tick it stores one
+    row for each agent that moved (position, step cost, completed task, running total), one
+    row for each barrier or terrain change and one row for each time a run planned a new path. save(path) writes a directory of NumPy arrays plus
+    a small JSON header; the map layout comes from a snapshot taken when recording started.
+    """
+
+    def __init__(self, simulation):
+        environment = simulation.environment
+        self.simulation = simulation
+        self.first_tick = simulation.ticks
+        self.world = environment.snapshot()
+        self.start = {}
+        self.last = {}  # Algorithm -> (position, total cost, tasks completed) at the last tick
+        self.last_path = {}  # Algorithm -> path being followed at the last tick; follow() always makes a new one
+        self.plans = {"tick": array("I"), "algorithm": array("B")}
+        for algorithm, run in simulation.agent.runs.items():
+            self.start[algorithm] = {
+                "position": list(run.position),
+                "total_cost": run.total_cost,
+                "last_cost": run.last_cost,  # Total when the run last completed a task, for the first leg's cost
+                "completed_tasks": list(run.completed_tasks),  # Completed before recording started
+                "tasks": [[x, y, number] for (x, y), number in run.tasks.items()],
+            }
+            self.last[algorithm] = (tuple(run.position), run.total_cost, run.task_completed)
+            self.last_path[algorithm] = run.path
+            if run.path:  # Planned before recording started
+                self.plans["tick"].append(self.first_tick)
+                self.plans["algorithm"].append(ALGORITHMS.index(algorithm))
+        self.barrier_change_index = len(environment.barrier_changes)
+        self.terrain_change_index = len(environment.terrain_changes)
+        # Column buffers; turned into one structured array on save
+        self.steps = {name: array(code) for name, code in
+                      (("tick", "I"), ("algorithm", "B"), ("x", "H"), ("y", "H"), ("cost", "B"), ("task", "h"),
+                       ("total", "I"))}
+        self.map_events = {name: array(code) for name, code in
+                           (("tick", "I"), ("cell", "I"), ("kind", "B"), ("value", "B"))}
+
+    def __call__(self, simulation):
+        """Observer: record what changed during the tick that just ran."""
+        environment, tick = simulation.environment, simulation.ticks
+        steps = self.steps
+        for index, algorithm in enumerate(ALGORITHMS):
+            run = simulation.agent.runs[algorithm]
+            if run.path is not self.last_path[algorithm]:
+                self.plans["tick"].append(tick)
+                self.plans["algorithm"].append(index)
+                self.last_path[algorithm] = run.path
+            position, total, completed = tuple(run.position), run.total_cost, run.task_completed
+            last_position, last_total, last_completed = self.last[algorithm]
+            if position == last_position and completed == last_completed:
+                continue
+            steps["tick"].append(tick)
+            steps["algorithm"].append(index)
+            steps["x"].append(position[0])
+            steps["y"].append(position[1])
+            steps["cost"].append(total - last_total)
+            steps["task"].append(self.world.tasks.get(position, -1) if completed > last_completed else -1)
+            steps["total"].append(total)
+            self.last[algorithm] = (position, total, completed)
+
+        events = self.map_events
+        for kind, changes, values in ((BARRIER_EVENT, environment.barrier_changes[self.barrier_change_index:],
+                                       environment.occupancy),
+                                      (TERRAIN_EVENT, environment.terrain_changes[self.terrain_change_index:],
+                                       environment.terrain)):
+            for cell in changes:
+                events["tick"].append(tick)
+                events["cell"].append(cell)
+                events["kind"].append(kind)
+                events["value"].append(values[cell])
+        self.barrier_change_index = len(environment.barrier_changes)
+        self.terrain_change_index = len(environment.terrain_changes)
+
+    def save(self, path):
+        """Write the log to directory path (created if needed); can be called again as the run goes on."""
+        os.makedirs(path, exist_ok=True)
+        world = self.world
+        steps = np.empty(len(self.steps["tick"]), dtype=STEP_DTYPE)
+        for name, column in self.steps.items():
+            steps[name] = column
+        steps = steps[np.argsort(steps["algorithm"], kind="stable")]  # Group by algorithm, ticks stay sorted
+        offsets = np.searchsorted(steps["algorithm"], np.arange(len(ALGORITHMS) + 1)).tolist()
+        map_events = np.empty(len(self.map_events["tick"]), dtype=MAP_EVENT_DTYPE)
+        for name, column in self.map_events.items():
+            map_events[name] = column
+        plans = np.empty(len(self.plans["tick"]), dtype=PLAN_DTYPE)
+        for name, column in self.plans.items():
+            plans[name] = column
+        plans = plans[np.argsort(plans["algorithm"], kind="stable")]
+        plan_offsets = np.searchsorted(plans["algorithm"], np.arange(len(ALGORITHMS) + 1)).tolist()
+
+        np.save(os.path.join(path, "steps.npy"), steps)
+        np.save(os.path.join(path, "map_events.npy"), map_events)
+        np.save(os.path.join(path, "plans.npy"), plans)
+        shape = (world.rows, world.columns)
+        np.save(os.path.join(path, "occupancy.npy"), np.frombuffer(world.occupancy, dtype=np.uint8).reshape(shape))
+        np.save(os.path.join(path, "terrain.npy"), np.frombuffer(world.terrain, dtype=np.uint8).reshape(shape))
+        environment = self.simulation.environment
+        header = {
+            "format_version": FORMAT_VERSION,
+            "width": environment.width,
+            "height": environment.height,
+            "grid_size": environment.grid_size,
+            "first_tick": self.first_tick,
+            "last_tick": self.simulation.ticks,
+            "algorithms": {algorithm: dict(self.start[algorithm], rows=[offsets[index], offsets[index + 1]],
+                                           plans=[plan_offsets[index], plan_offsets[index + 1]])
+                           for index, algorithm in enumerate(ALGORITHMS)},
+        }
+        with open(os.path.join(path, "header.json"), "w") as file:
+            json.dump(header, file)
+
+
+class Trajectory:
+    """
+    A recorded log opened for replay. The arrays are memory-mapped, so opening a long log is
+    instant and frame(tick) only touches the rows it needs: a binary search per algorithm plus
+    the rows of the current leg. No search is rerun.
+    """
+
+    def __init__(self, path, mmap=True):
+        with open(os.path.join(path, "header.json")) as file:
+            self.header = json.load(file)
+        if self.header["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"unsupported trajectory format {self.header['format_version']}")
+        mode = "r" if mmap else None
+        self.steps = np.load(os.path.join(path, "steps.npy"), mmap_mode=mode)
+        self.map_events = np.load(os.path.join(path, "map_events.npy"), mmap_mode=mode)
+        plans = np.load(os.path.join(path, "plans.npy"))
+        self.occupancy = np.load(os.path.join(path, "occupancy.npy"), mmap_mode=mode)
+        self.terrain = np.load(os.path.join(path, "terrain.npy"), mmap_mode=mode)
+        self.first_tick = self.header["first_tick"]
+        self.last_tick = self.header["last_tick"]
+        self.rows = {}        # Algorithm -> its slice of steps
+        self.completions = {}  # Algorithm -> row numbers (within the slice) that completed a task
+        self.plan_ticks = {}  # Algorithm -> ticks after which the run had just planned a new path
+        for algorithm, info in self.header["algorithms"].items():
+            rows = self.steps[info["rows"][0]:info["rows"][1]]
+            self.rows[algorithm] = rows
+            self.completions[algorithm] = np.flatnonzero(rows["task"] >= 0)
+            self.plan_ticks[algorithm] = plans["tick"][info["plans"][0]:info["plans"][1]]
+
+    def frame(self, tick):
+        """
+        State of every algorithm after the given tick: position, total cost, completed tasks as
+        (number, cost of that leg) plus the panel entries of tasks completed before recording,
+        remaining tasks and the path still ahead on the current leg.
+        """
+        frame = {}
+        for algorithm, rows in self.rows.items():
+            start = self.header["algorithms"][algorithm]
+            done = int(np.searchsorted(rows["tick"], tick, side="right"))  # Rows at or before tick
+            if done:
+                last = rows[done - 1]
+                position, total = (int(last["x"]), int(last["y"])), int(last["total"])
+                moved_at = int(last["tick"])
+            else:
+                position, total, moved_at = tuple(start["position"]), start["total_cost"], -1
+
+            completions = self.completions[algorithm]
+            finished = completions[:np.searchsorted(completions, done)]
+            completed, leg_start = [], start["last_cost"]
+            for row in finished.tolist():
+                completed.append((int(rows["task"][row]), int(rows["total"][row]) - leg_start))
+                leg_start = int(rows["total"][row])
+            numbers = {number for number, _ in completed}
+
+            # The path ahead is the rest of the last planned path: the recorded steps up to the next
+            # task completion or the next plan. A path that was used up by a completion is gone until
+            # the run plans again, a tick or two later.
+            plan_ticks = self.plan_ticks[algorithm]
+            planned = int(np.searchsorted(plan_ticks, tick, side="right"))
+            completed_at = int(rows["tick"][finished[-1]]) if len(finished) else -1
+            if planned and plan_ticks[planned - 1] > completed_at:
+                leg_end = completions[len(finished)] + 1 if len(finished) < len(completions) else len(rows)
+                if planned < len(plan_ticks):
+                    leg_end = min(leg_end, int(np.searchsorted(rows["tick"], plan_ticks[planned], side="left")))
+                ahead = rows[done:max(leg_end, done)]
+            else:
+                ahead = rows[done:done]
+            frame[algorithm] = {
+                "position": position,
+                "total_cost": total,
+                "completed": completed,
+                "completed_before": start["completed_tasks"],
+                "tasks": {(x, y): number for x, y, number in start["tasks"] if number not in numbers},
+                "path": list(zip(ahead["x"].tolist(), ahead["y"].tolist())),
+                "moved_at": moved_at,
+            }
+        return frame
+
+    def map_state(self, tick):
+        """Barrier and terrain values after tick for every cell changed during the recording."""
+        events = self.map_events
+        state = {}
+        for _, cell, kind, value in events[:np.searchsorted(events["tick"], tick, side="right")].tolist():
+            state[(kind, cell)] = value
+        for cell, kind in zip(events["cell"].tolist(), events["kind"].tolist()):
+            if (kind, cell) not in state:
+                initial = self.occupancy if kind == BARRIER_EVENT else self.terrain
+                state[(kind, cell)] = int(initial.flat[cell])
+        return state
+
+    def build_environment(self):
+        """A fresh Environment with the recorded map layout and tasks (no random generation)."""
+        header = self.header
+        environment = Environment(header["width"], header["height"], header["grid_size"], 0, 0)
+        environment.occupancy[:] = self.occupancy.tobytes()
+        environment.barrier_locations = {environment.cell_position(cell)
+                                         for cell in np.flatnonzero(self.occupancy.ravel()).tolist()}
+        environment.build_neighbor_table()
+        environment.build_components()
+        environment.terrain[:] = self.terrain.tobytes()
+        environment.update_terrain_bounds()
+        # Runs may have started with different tasks left; each overlay hides the ones its run had done
+        tasks = {(x, y): number for start in header["algorithms"].values() for x, y, number in start["tasks"]}
+        environment.tasks = MappingProxyType(tasks)
+        environment.task_overlays = {}
+        for algorithm, start in header["algorithms"].items():
+            remaining = {(x, y) for x, y, _ in start["tasks"]}
+            environment.task_overlay(algorithm).completed = set(tasks) - remaining
+        return environment
+
+    def apply_frame(self, environment, agent, tick):
+        """
+        Show the frame after tick on an environment from build_environment() and an Agent, so
+        the usual GridRenderer can draw it. Works in either direction, for scrubbing.
+        """
+        for (kind, cell), value in self.map_state(tick).items():
+            x, y = environment.cell_position(cell)
+            if kind == BARRIER_EVENT:
+                environment.set_barrier(x, y, bool(value))
+            else:
+                environment.set_terrain(x, y, value)
+        latest = None
+        for algorithm, state in self.frame(tick).items():
+            run = agent.runs[algorithm]
+            run.tasks.completed = set(environment.tasks) - set(state["tasks"])
+            run.position = state["position"]
+            run.total_cost = state["total_cost"]
+            run.completed_tasks = state["completed_before"] + [f"{number} (Cost {cost})"
+                                                               for number, cost in state["completed"]]
+            run.task_completed = len(run.completed_tasks)
+            run.path = deque(state["path"])
+            if latest is None or state["moved_at"] >= latest[0]:  # Same tick: UCS moves after A*
+                latest = (state["moved_at"], state["position"])
+        agent.place_sprite(latest[1])  # The sprite shows whichever agent moved last, as in a live run
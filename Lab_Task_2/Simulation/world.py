@@ -0,0 +1,120 @@
+# world.py
+from array import array
+from collections.abc import Mapping
+from types import MappingProxyType
+
+
+class GridIndex:
+    """
+    Cell-id helpers and reachability shared by Environment and WorldSnapshot. Subclasses
+    provide columns, rows, occupancy, neighbor_table, neighbor_count and component_of().
+    """
+
+    def is_within_bounds(self, x, y):
+        """Check if (x, y) is within the grid boundaries."""
+        return 0 <= x < self.columns and 0 <= y < self.rows
+
+    def is_barrier(self, x, y):
+        """Check if (x, y) is a barrier."""
+        return self.is_within_bounds(x, y) and self.occupancy[y * self.columns + x] == 1
+
+    def cell_index(self, x, y):
+        """Convert (x, y) to a flat cell id."""
+        return y * self.columns + x
+
+    def cell_position(self, cell):
+        """Convert a flat cell id back to (x, y)."""
+        y, x = divmod(cell, self.columns)
+        return (x, y)
+
+    def neighbor_cells(self, cell):
+        """Walkable neighbor cell ids of a cell id."""
+        base = 4 * cell
+        return self.neighbor_table[base:base + self.neighbor_count[cell]]
+
+    def is_reachable(self, start, goal):
+        """Whether any path leads from start to goal (x, y positions). O(1), no search."""
+        if tuple(start) == tuple(goal):
+            return True
+        goal_component = self.component_of(self.cell_index(*goal))
+        if goal_component < 0:
+            return False
+        start_cell = self.cell_index(*start)
+        if not self.occupancy[start_cell]:
+            return self.component_of(start_cell) == goal_component
+        # Standing on a barrier: the agent can still step off onto a free neighbor
+        return any(self.component_of(neighbor) == goal_component for neighbor in self.neighbor_cells(start_cell))
+
+
+class WorldSnapshot(GridIndex):
+    """
+    Read-only copy of the map at one moment: grid size, occupancy and terrain as bytes, the
+    task dict behind a read-only proxy, and copies of the neighbor table and component index
+    so searches can run against it. Nothing in it changes, so one snapshot can be shared by
+    any number of runs, threads or worker processes while the live map moves on.
+    """
+
+    def __init__(self, columns, rows, occupancy, terrain, tasks, version, neighbor_table, neighbor_count,
+                 component_labels, component_parent):
+        self.columns = columns
+        self.rows = rows
+        self.occupancy = bytes(occupancy)
+        self.terrain = bytes(terrain)
+        self.tasks = MappingProxyType(dict(tasks))  # Task position -> task number
+        self.version = version  # Environment.version when the snapshot was taken
+        self.neighbor_table = array('i', neighbor_table)
+        self.neighbor_count = bytes(neighbor_count)
+        self.component_labels = array('i', component_labels)
+        self.component_parent = tuple(component_parent)
+        self.min_terrain_cost = min(self.terrain, default=1)
+        self.max_terrain_cost = max(self.terrain, default=1)
+        self.uniform_terrain = self.min_terrain_cost == self.max_terrain_cost
+
+    def component_of(self, cell):
+        """Connected-component id of a cell id, or -1 for a barrier (no path halving: nothing is written)."""
+        label = self.component_labels[cell]
+        parent = self.component_parent
+        while label >= 0 and parent[label] != label:
+            label = parent[label]
+        return label
+
+    def __reduce__(self):
+        return WorldSnapshot, (self.columns, self.rows, self.occupancy, self.terrain, dict(self.tasks), self.version,
+                               self.neighbor_table, self.neighbor_count, self.component_labels, self.component_parent)
+
+
+class TaskOverlay(Mapping):
+    """
+    One run's view of a shared task dict: every task except the ones this run completed.
+    It reads like the old per-run dict copy (``in``, iteration, ``len``, ``[]``, ``items()``), and
+    pop(position) marks a task completed for this run only. The shared dict is never copied or
+    changed, so each extra run only costs the set of positions it has completed.
+    """
+
+    def __init__(self, tasks, completed=()):
+        self.tasks = tasks  # Shared task position -> task number, read-only
+        self.completed = set(completed)
+
+    def __getitem__(self, position):
+        if position in self.completed:
+            raise KeyError(position)
+        return self.tasks[position]
+
+    def __contains__(self, position):
+        return position in self.tasks and position not in self.completed
+
+    def __iter__(self):
+        completed = self.completed
+        return (position for position in self.tasks if position not in completed)
+
+    def __len__(self):
+        return len(self.tasks) - len(self.completed)
+
+    def pop(self, position):
+        """Mark the task at position completed for this run and return its number."""
+        task_number = self[position]
+        self.completed.add(position)
+        return task_number
+
+    def __repr__(self):
+        return f"TaskOverlay({dict(self.items())!r})"
@@ -23,3 +23,32 @@ class Agent:
         self.slots = []
 
 
+def effective_times(environment):
+    """
+    (num_students x num_classes) table of the time class c takes student s, as assign_class
+    computes it: duration / student preference * priority.
+    """
+    weights = environment.slot_durations * environment.class_priorities
+    return weights[np.newaxis, :] / environment.student_preferences[:, np.newaxis]
+
+
+def student_loads(environment, assignment, times=None):
+    """Total effective time of every student under assignment (entry c is the student given class c)."""
+    if times is None:
+        times = effective_times(environment)
+    return np.bincount(assignment, weights=times[assignment, np.arange(environment.num_classes)],
+                       minlength=environment.num_students)
+
+
+def population_loads(environment, population, times=None):
+    """
+    (population size x num_students) loads of every individual in one np.bincount: the student
+    numbers of row k are offset by k * num_students, so each individual sums into its own row.
+    """
+    if times is None:
+        times = effective_times(environment)
+    size, num_students = len(population), environment.num_students
+    gathered = times[population, np.arange(environment.num_classes)]
+    offsets = population + (np.arange(size) * num_students)[:, np.newaxis]
+    loads = np.bincount(offsets.ravel(), weights=gathered.ravel(), minlength=size * num_students)
+    return loads.reshape(size, num_students)
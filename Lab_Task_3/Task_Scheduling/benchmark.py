@@ -0,0 +1,385 @@
+import argparse
+import os
+import random
+import sys
+import time
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import numpy as np
+from agent import Agent, population_loads, student_loads
+from environment import Environment
+from genetic import GeneticAlgorithm, cut_points, gene_costs, mutate, one_point_mask, population_fitness
+from islands import IslandModel
+from solver import solve
+
+# Constants
+SEED = 366
+# (population size, classes, students) instances
+FITNESS_INSTANCES = [(50, 10, 5), (1000, 10, 5), (1000, 200, 20), (5000, 200, 20)]
+FITNESS_REPEATS = 3
+GENERATION_INSTANCES = [(1000, 10, 5), (1000, 200, 20), (5000, 10, 5), (5000, 200, 20)]
+MUTATION_RATE = 0.1
+LOOP_GENERATIONS = 3  # The old per-child loop is slow; a few generations give a stable rate
+ENGINE_GENERATIONS = 30
+# (population size, classes, students) instances with long genomes, and the mutation rates to try on each
+EVALUATION_INSTANCES = [(200, 2000, 200), (200, 8000, 200)]
+EVALUATION_RATES = [0.001, 0.01, 0.1]
+EVALUATION_REPEATS = 5
+# (islands, island size, classes, students) instances for the island model
+ISLAND_INSTANCES = [(4, 250, 200, 20), (8, 250, 1000, 50)]
+ISLAND_GENERATIONS = 40
+MIGRATION_INTERVAL = 10
+# (classes, students, load limit, instance seed) instances for the min-cost-flow solver. The 40-class ones have
+# tight limits that the safe class counts cannot meet, so they go through the fallback and repair.
+SOLVER_INSTANCES = [(40, 5, 40.0, 4), (40, 5, 40.0, 12), (40, 5, 40.0, 34), (40, 5, 40.0, 40),
+                    (200, 10, 120.0, SEED), (2000, 40, 300.0, SEED), (5000, 50, 600.0, SEED)]
+SOLVER_GA_GENERATIONS = 100
+# (population size, classes, students) instances for student load accounting
+LOAD_INSTANCES = [(50, 10, 5), (1000, 200, 20), (1000, 1000, 50)]
+LOAD_WEIGHTS = [0.0, 0.5, 2.0]
+LOAD_GA_INSTANCE = (200, 20)  # (classes, students)
+LOAD_GA_GENERATIONS = 300
+
+
+def seeded_environment(num_classes, num_students, seed=SEED):
+    return Environment(num_classes, num_students, seed=seed)
+
+
+def loop_fitness(environment, individual):
+    """Reference fitness as run.py used to compute it: one Python loop over the genes."""
+    conflict_penalty = 0
+    preference_penalty = 0.0
+    for class_index, student_index in enumerate(individual):
+        if environment.student_availability[student_index, class_index] == 0:
+            conflict_penalty += 1
+        preference = environment.student_class_preferences[student_index, class_index]
+        preference_penalty += 1.0 if preference == 0 else 1.0 / preference
+    return conflict_penalty + preference_penalty
+
+
+def loop_generation_scoring(environment, population):
+    """What one generation used to cost: sorted() for selection, min() for the best, then its score."""
+    key = lambda individual: loop_fitness(environment, individual)
+    sorted(population, key=key)
+    best = min(population, key=key)
+    return key(best)
+
+
+def loop_generation(environment, population, scores, mutation_rate=MUTATION_RATE):
+    """
+    Reference generation as run.py used to breed it: sort for the best half, then one
+    np.concatenate and a per-gene random() mutation loop for each child.
+    """
+    size = len(population)
+    selected = population[np.argsort(scores, kind="stable")[:size // 2]]
+    children = []
+    while len(children) < size:
+        index1, index2 = random.sample(range(len(selected)), 2)
+        point = random.randint(1, environment.num_classes - 1)
+        child = np.concatenate([selected[index1][:point], selected[index2][point:]])
+        for i in range(len(child)):
+            if random.random() < mutation_rate:
+                child[i] = random.randint(0, environment.num_students - 1)
+        children.append(child)
+    population = np.array(children)
+    return population, population_fitness(environment, population)
+
+
+def generation_rate(instances=GENERATION_INSTANCES, seed=SEED):
+    """
+    Generations per second of the old per-child loop and of the batched GeneticAlgorithm. Returns per
+    instance and selection: (population size, classes, students, loop generations/s, batched generations/s,
+    selection).
+    """
+    rows_out = []
+    random.seed(seed)
+    for population_size, num_classes, num_students in instances:
+        environment = seeded_environment(num_classes, num_students)
+        population = environment.generate_assignments(population_size)
+        scores = population_fitness(environment, population)
+        start = time.perf_counter()
+        for _ in range(LOOP_GENERATIONS):
+            population, scores = loop_generation(environment, population, scores)
+        loop_rate = LOOP_GENERATIONS / (time.perf_counter() - start)
+        for selection in ("truncation", "tournament"):
+            genetic_algorithm = GeneticAlgorithm(environment, population_size, MUTATION_RATE, selection=selection,
+                                                 seed=seed)
+            start = time.perf_counter()
+            for _ in range(ENGINE_GENERATIONS):
+                genetic_algorithm.step()
+            engine_rate = ENGINE_GENERATIONS / (time.perf_counter() - start)
+            rows_out.append((population_size, num_classes, num_students, loop_rate, engine_rate, selection))
+    return rows_out
+
+
+def best_of(repeats, function, *args):
+    """Lowest elapsed seconds of repeats calls."""
+    elapsed = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(*args)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+
+def fitness_scoring(instances=FITNESS_INSTANCES, repeats=FITNESS_REPEATS):
+    """
+    Time of scoring one generation with the per-individual loop (three evaluations) and with one
+    vectorized evaluation. Returns per instance: (population size, classes, students, loop seconds,
+    vectorized seconds, largest score difference).
+    """
+    rows_out = []
+    for population_size, num_classes, num_students in instances:
+        environment = seeded_environment(num_classes, num_students)
+        population = environment.generate_assignments(population_size)
+        loop_time = best_of(repeats, loop_generation_scoring, environment, population)
+        vector_time = best_of(repeats, population_fitness, environment, population)
+        reference = np.array([loop_fitness(environment, individual) for individual in population])
+        difference = np.abs(population_fitness(environment, population) - reference).max()
+        rows_out.append((population_size, num_classes, num_students, loop_time, vector_time, difference))
+    return rows_out
+
+
+def evaluation_scaling(instances=EVALUATION_INSTANCES, rates=EVALUATION_RATES, repeats=EVALUATION_REPEATS,
+                       seed=SEED):
+    """
+    Cost of scoring one bred generation by rescoring every gene and from the parents' prefix
+    sums (prefix1[point] + total2 - prefix2[point] plus one delta per mutated gene), the cost of
+    building those parents' prefix sums, and whole GeneticAlgorithm generations both ways.
+    Returns per instance and mutation rate: (population size, classes, students, rate, mutated
+    genes, full rescore seconds, prefix scoring seconds, parent prefix seconds, full generation
+    seconds, incremental generation seconds, largest score difference).
+    """
+    rows_out = []
+    for population_size, num_classes, num_students in instances:
+        environment = seeded_environment(num_classes, num_students)
+        costs = gene_costs(environment)
+        columns = np.arange(num_classes)
+        for rate in rates:
+            incremental_algorithm = GeneticAlgorithm(environment, population_size, rate, seed=seed, costs=costs)
+            full_algorithm = GeneticAlgorithm(environment, population_size, rate, seed=seed, costs=costs,
+                                              incremental=False)
+            incremental_algorithm.step()  # Past the first generation, so parents come from a bred lineage
+            # One bred generation, scored both ways
+            rng = incremental_algorithm.rng
+            first, second = incremental_algorithm.select_parents()
+            points = cut_points(rng, population_size, num_classes)
+            children = np.where(one_point_mask(rng, population_size, num_classes, points),
+                                incremental_algorithm.population[first], incremental_algorithm.population[second])
+            positions, replaced = mutate(rng, children, rate, num_students)
+            mutated_rows, mutated_columns = np.divmod(positions, num_classes)
+            parents, rows = np.unique(np.concatenate([first, second]), return_inverse=True)
+            rows1, rows2 = rows[:population_size], rows[population_size:]
+            prefix = incremental_algorithm.parent_prefix(parents)
+
+            def full():
+                return costs[children, columns].sum(axis=1)
+
+            def prefix_scoring():
+                deltas = costs[children.take(positions), mutated_columns] - costs[replaced, mutated_columns]
+                return prefix[rows1, points] + prefix[rows2, -1] - prefix[rows2, points] + \
+                    np.bincount(mutated_rows, deltas, minlength=population_size)
+
+            difference = np.abs(prefix_scoring() - full()).max()
+            rows_out.append((population_size, num_classes, num_students, rate, len(positions),
+                             best_of(repeats, full), best_of(repeats, prefix_scoring),
+                             best_of(repeats, incremental_algorithm.parent_prefix, parents),
+                             best_of(repeats, full_algorithm.step), best_of(repeats, incremental_algorithm.step),
+                             difference))
+    return rows_out
+
+
+def island_throughput(instances=ISLAND_INSTANCES, generations=ISLAND_GENERATIONS, seed=SEED):
+    """
+    Individual-generations per second of one GeneticAlgorithm holding every individual and of
+    the IslandModel at several worker counts (1, 2, 4, ... up to the CPU count, at least 2). Returns
+    per instance and worker count: (islands, island size, classes, students, workers, single
+    population rate, island model rate including worker start-up, best island score).
+    """
+    cpus = os.cpu_count() or 1
+    rows_out = []
+    for islands, island_size, num_classes, num_students in instances:
+        environment = seeded_environment(num_classes, num_students)
+        individuals = generations * islands * island_size
+        genetic_algorithm = GeneticAlgorithm(environment, islands * island_size, MUTATION_RATE, seed=seed)
+        start = time.perf_counter()
+        for _ in range(generations):
+            genetic_algorithm.step()
+        single_rate = individuals / (time.perf_counter() - start)
+        workers = 1
+        while workers <= max(cpus, 2) and workers <= islands:
+            with IslandModel(environment, islands, island_size, MUTATION_RATE, MIGRATION_INTERVAL, workers=workers,
+                             seed=seed) as model:
+                start = time.perf_counter()
+                model.run(generations)
+                island_rate = individuals / (time.perf_counter() - start)
+                rows_out.append((islands, island_size, num_classes, num_students, workers, single_rate, island_rate,
+                                 model.best()[1]))
+            workers *= 2
+    return rows_out
+
+
+def solver_quality(instances=SOLVER_INSTANCES, generations=SOLVER_GA_GENERATIONS, seed=SEED):
+    """
+    The load-limited solver against the unlimited optimum (a lower bound) and the GA from a random
+    population. Returns per instance: (classes, students, load limit, instance seed, solve seconds,
+    solver fitness, solver largest load, unlimited optimum, GA fitness, GA largest load).
+    """
+    rows_out = []
+    for num_classes, num_students, limit, instance_seed in instances:
+        environment = seeded_environment(num_classes, num_students, instance_seed)
+        costs = gene_costs(environment)
+        start = time.perf_counter()
+        assignment = solve(environment, limit, costs)
+        elapsed = time.perf_counter() - start
+        columns = np.arange(num_classes)
+        genetic_algorithm = GeneticAlgorithm(environment, seed=seed)
+        for _ in range(generations):
+            genetic_algorithm.step()
+        best, best_score = genetic_algorithm.best()
+        rows_out.append((num_classes, num_students, limit, instance_seed, elapsed, costs[assignment, columns].sum(),
+                         student_loads(environment, assignment).max(), costs.min(axis=0).sum(), best_score,
+                         student_loads(environment, best).max()))
+    return rows_out
+
+
+def agent_loads(environment, population):
+    """Reference loads the way agent.py's Agent objects compute them: assign_class per class, total_time() per student."""
+    agents = [Agent(id=i, preference=environment.student_preferences[i]) for i in range(environment.num_students)]
+    loads = []
+    for individual in population:
+        for agent in agents:
+            agent.reset_classes()
+        for class_index, student_index in enumerate(individual):
+            agents[student_index].assign_class(environment.slot_durations[class_index],
+                                               environment.class_priorities[class_index])
+        loads.append([agent.total_time() for agent in agents])
+    return np.array(loads)
+
+
+def load_accounting(instances=LOAD_INSTANCES, repeats=FITNESS_REPEATS):
+    """
+    Time of computing every student's load for a whole population with Agent objects and with one
+    population_loads() bincount. Returns per instance: (population size, classes, students, agent
+    seconds, vectorized seconds, largest load difference).
+    """
+    rows_out = []
+    for population_size, num_classes, num_students in instances:
+        environment = seeded_environment(num_classes, num_students)
+        population = environment.generate_assignments(population_size)
+        agent_time = best_of(1, agent_loads, environment, population)
+        vector_time = best_of(repeats, population_loads, environment, population)
+        difference = np.abs(population_loads(environment, population) - agent_loads(environment, population)).max()
+        rows_out.append((population_size, num_classes, num_students, agent_time, vector_time, difference))
+    return rows_out
+
+
+def load_balance(weights=LOAD_WEIGHTS, instance=LOAD_GA_INSTANCE, generations=LOAD_GA_GENERATIONS, seed=SEED):
+    """
+    The GA with several makespan weights. Returns per weight: (load weight, gene cost sum of the best
+    individual, its largest student load, its smallest student load, seconds).
+    """
+    environment = seeded_environment(*instance)
+    costs = gene_costs(environment)
+    rows_out = []
+    for load_weight in weights:
+        genetic_algorithm = GeneticAlgorithm(environment, seed=seed, load_weight=load_weight)
+        start = time.perf_counter()
+        for _ in range(generations):
+            genetic_algorithm.step()
+        elapsed = time.perf_counter() - start
+        best, _ = genetic_algorithm.best()
+        loads = student_loads(environment, best)
+        rows_out.append((load_weight, costs[best, np.arange(environment.num_classes)].sum(), loads.max(), loads.min(),
+                         elapsed))
+    return rows_out
+
+
+def print_fitness_scoring():
+    print(f"{'population':>10} {'classes':>8} {'students':>9} {'loop (ms)':>10} {'vectorized (ms)':>16} "
+          f"{'speedup':>8} {'max diff':>9}")
+    for population_size, num_classes, num_students, loop_time, vector_time, difference in fitness_scoring():
+        print(f"{population_size:>10} {num_classes:>8} {num_students:>9} {loop_time * 1000:>10.2f} "
+              f"{vector_time * 1000:>16.3f} {loop_time / vector_time:>8.0f} {difference:>9.1e}")
+
+
+def print_generation_rate():
+    print(f"{'population':>10} {'classes':>8} {'students':>9} {'selection':>11} {'loop (gen/s)':>13} "
+          f"{'batched (gen/s)':>16} {'speedup':>8}")
+    for population_size, num_classes, num_students, loop_rate, engine_rate, selection in generation_rate():
+        print(f"{population_size:>10} {num_classes:>8} {num_students:>9} {selection:>11} {loop_rate:>13.1f} "
+              f"{engine_rate:>16.1f} {engine_rate / loop_rate:>8.0f}")
+
+
+def print_evaluation_scaling():
+    print(f"{'population':>10} {'classes':>8} {'students':>9} {'rate':>6} {'mutated':>8} {'full (ms)':>10} "
+          f"{'prefix (ms)':>12} {'parent sums (ms)':>17} {'full gen (ms)':>14} {'incr. gen (ms)':>15} {'max diff':>9}")
+    for (population_size, num_classes, num_students, rate, mutated, full_time, prefix_time, parent_time,
+         full_step, incremental_step, difference) in evaluation_scaling():
+        print(f"{population_size:>10} {num_classes:>8} {num_students:>9} {rate:>6} {mutated:>8} "
+              f"{full_time * 1000:>10.2f} {prefix_time * 1000:>12.3f} {parent_time * 1000:>17.2f} "
+              f"{full_step * 1000:>14.2f} {incremental_step * 1000:>15.2f} {difference:>9.1e}")
+
+
+def print_island_throughput():
+    print(f"CPUs: {os.cpu_count()}")
+    print(f"{'islands':>7} {'size':>5} {'classes':>8} {'students':>9} {'workers':>8} {'single (ind-gen/s)':>19} "
+          f"{'islands (ind-gen/s)':>20} {'scaling':>8} {'best':>9}")
+    for (islands, island_size, num_classes, num_students, workers, single_rate, island_rate,
+         best) in island_throughput():
+        print(f"{islands:>7} {island_size:>5} {num_classes:>8} {num_students:>9} {workers:>8} {single_rate:>19.0f} "
+              f"{island_rate:>20.0f} {island_rate / single_rate:>8.2f} {best:>9.2f}")
+
+
+def print_solver_quality():
+    print(f"{'classes':>8} {'students':>9} {'limit':>7} {'seed':>5} {'solve (s)':>10} {'fitness':>10} "
+          f"{'max load':>9} {'lower bound':>11} {'GA fitness':>11} {'GA max load':>12}")
+    for (num_classes, num_students, limit, instance_seed, elapsed, fitness, max_load, unlimited, ga_fitness,
+         ga_load) in solver_quality():
+        print(f"{num_classes:>8} {num_students:>9} {limit:>7.0f} {instance_seed:>5} {elapsed:>10.2f} {fitness:>10.2f} "
+              f"{max_load:>9.1f} {unlimited:>11.2f} {ga_fitness:>11.2f} {ga_load:>12.1f}")
+
+
+def print_load_accounting():
+    print(f"{'population':>10} {'classes':>8} {'students':>9} {'agents (ms)':>12} {'bincount (ms)':>14} "
+          f"{'speedup':>8} {'max diff':>9}")
+    for population_size, num_classes, num_students, agent_time, vector_time, difference in load_accounting():
+        print(f"{population_size:>10} {num_classes:>8} {num_students:>9} {agent_time * 1000:>12.2f} "
+              f"{vector_time * 1000:>14.3f} {agent_time / vector_time:>8.0f} {difference:>9.1e}")
+    print()
+    num_classes, num_students = LOAD_GA_INSTANCE
+    print(f"GA with a makespan term, {num_classes} classes, {num_students} students, "
+          f"{LOAD_GA_GENERATIONS} generations:")
+    print(f"{'load weight':>11} {'gene costs':>11} {'max load':>9} {'min load':>9} {'time (s)':>9}")
+    for load_weight, gene_cost, max_load, min_load, elapsed in load_balance():
+        print(f"{load_weight:>11} {gene_cost:>11.2f} {max_load:>9.1f} {min_load:>9.1f} {elapsed:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the Lab_Task_3 scheduling GA.")
+    parser.add_argument("suite", nargs="?", default="fitness", choices=["fitness", "generations", "evaluation", "islands", "solver", "loads"],
+                        help="fitness: per-individual loop scoring vs one vectorized population evaluation; "
+                             "generations: generations per second of the old per-child loop vs the batched "
+                             "operators; evaluation: full rescoring vs scoring bred children from "
+                             "their parents' prefix sums at several mutation rates; islands: throughput "
+                             "of the island model across worker processes vs one population; solver: the load-limited "
+                             "min-cost-flow solver vs the unlimited optimum and the GA; loads: Agent-object "
+                             "student loads vs one bincount, and the GA with a makespan term")
+    args = parser.parse_args(argv)
+
+    if args.suite == "fitness":
+        print_fitness_scoring()
+    elif args.suite == "generations":
+        print_generation_rate()
+    elif args.suite == "evaluation":
+        print_evaluation_scaling()
+    elif args.suite == "islands":
+        print_island_throughput()
+    elif args.suite == "solver":
+        print_solver_quality()
+    elif args.suite == "loads":
+        print_load_accounting()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,21 +2,32 @@ import pygame
 import numpy as np
 
 class Environment:
-    def __init__(self, num_classes, num_students):
+    def __init__(self, num_classes, num_students, seed=None):
         self.num_classes = num_classes
         self.num_students = num_students
-        self.slot_durations = np.random.randint(1, 3, size=num_classes)
-        self.class_priorities = np.random.randint(1, 6, size=num_classes)
-        self.student_preferences = np.random.uniform(0.5, 1.5, size=num_students)
+        self.rng = np.random.default_rng(seed)  # A fixed seed gives the same instance every time
+        self.slot_durations = self.rng.integers(1, 3, size=num_classes)
+        self.class_priorities = self.rng.integers(1, 6, size=num_classes)
+        self.student_preferences = self.rng.uniform(0.5, 1.5, size=num_students)
 
-        self.student_class_preferences = np.random.uniform(0.5, 1.5, size=(self.num_students, self.num_classes))
-        self.student_availability = np.random.randint(0, 2, size=(num_students, num_classes))
+        self.student_class_preferences = self.rng.uniform(0.5, 1.5, size=(self.num_students, self.num_classes))
+        self.student_availability = self.rng.integers(0, 2, size=(num_students, num_classes))
+        self.labels = {}  # (font, text, color) -> rendered surface, reused by draw_grid
 
-    def generate_assignments(self):
+    def generate_assignments(self, count=50):
         """
         Randomly assign class to students for initial population in the genetic algorithm.
+        Returns a (count x num_classes) array; row k is one individual, entry [k, c] the student given class c.
         """
-        return [np.random.randint(0, self.num_students, size=self.num_classes) for _ in range(50)]
+        return self.rng.integers(0, self.num_students, size=(count, self.num_classes), dtype=np.int32)
+
+    def label(self, font, text, color):
+        """Rendered text surface; each distinct label is rendered once and then reused."""
+        key = (font, text, color)
+        surface = self.labels.get(key)
+        if surface is None:
+            surface = self.labels[key] = font.render(text, True, color)
+        return surface
 
     def draw_grid(self, screen, font, class_assignments):
         """
@@ -35,13 +46,13 @@ class Environment:
 
         # Display class names on the top (X-axis labels)
         for col in range(self.num_classes):
-            task_text = font.render(f"Slot {col + 1}", True, (0, 0, 0))
+            task_text = self.label(font, f"Slot {col + 1}", (0, 0, 0))
             screen.blit(task_text, (margin_left + col * cell_size + cell_size // 3, margin_top - 30))
 
         # Draw each student row with class assigned
         for row in range(self.num_students):
             # Display student preference on the left of each row
-            preference_text = font.render(f"Preference: {self.student_preferences[row]:.2f}", True, (0, 0, 0))
+            preference_text = self.label(font, f"Preference: {self.student_preferences[row]:.2f}", (0, 0, 0))
             screen.blit(preference_text, (10, margin_top + row * cell_size + cell_size // 3))
 
             for col in range(self.num_classes):
@@ -62,8 +73,9 @@ class Environment:
                 pygame.draw.rect(screen, (0, 0, 0), cell_rect, 1)  # Draw cell border
 
                 # Display task priority and duration within the cell
-                priority_text = font.render(f"P{self.class_priorities[col]}", True, (255, 255, 255) if assigned_student == row else (0, 0, 0))
-                duration_text = font.render(f"{self.slot_durations[col]}h", True, (255, 255, 255) if assigned_student == row else (0, 0, 0))
+                text_color = (255, 255, 255) if assigned_student == row else (0, 0, 0)
+                priority_text = self.label(font, f"P{self.class_priorities[col]}", text_color)
+                duration_text = self.label(font, f"{self.slot_durations[col]}h", text_color)
                 screen.blit(priority_text, (cell_rect.x + 5, cell_rect.y + 5))
                 screen.blit(duration_text, (cell_rect.x + 5, cell_rect.y + 25))
 
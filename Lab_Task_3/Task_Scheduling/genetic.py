@@ -0,0 +1,257 @@
+# genetic.py
+import numpy as np
+
+from agent import effective_times, population_loads
+
+
+def gene_costs(environment):
+    """
+    (num_students x num_classes) table of what giving class c to student s adds to the fitness:
+    a conflict penalty of 1 if the student is unavailable, plus 1 / the student's preference
+    for the class (1 if the preference is 0).
+    """
+    preferences = environment.student_class_preferences
+    conflict_penalty = environment.student_availability == 0
+    preference_penalty = np.divide(1.0, preferences, out=np.ones_like(preferences), where=preferences != 0)
+    return conflict_penalty + preference_penalty
+
+
+def population_fitness(environment, population, costs=None, load_weight=0.0, times=None):
+    """
+    Fitness of every individual at once (lower is better).
+    population is a (population size x num_classes) array: entry [k, c] is the student given
+    class c in individual k. Pass the gene_costs() table when scoring many populations.
+    load_weight > 0 adds load_weight times the individual's largest student load (makespan),
+    which favours balanced schedules; times is the effective_times() table.
+    """
+    if costs is None:
+        costs = gene_costs(environment)
+    # Fancy indexing picks the (student, class) cost of every gene of every individual
+    scores = costs[population, np.arange(environment.num_classes)].sum(axis=1)
+    if load_weight:
+        scores += load_weight * population_loads(environment, population, times).max(axis=1)
+    return scores
+
+
+def truncation_selection(scores, count):
+    """Indices of the count best (lowest) scores, in no particular order; argpartition avoids a full sort."""
+    return np.argpartition(scores, count - 1)[:count]
+
+
+def tournament_selection(rng, scores, count, size=2):
+    """Indices of count tournament winners; each tournament draws size random individuals and keeps the best."""
+    entrants = rng.integers(0, len(scores), size=(count, size))
+    return entrants[np.arange(count), np.argmin(scores[entrants], axis=1)]
+
+
+def cut_points(rng, count, num_genes):
+    """count random one-point crossover cut points, each between 1 and num_genes - 1."""
+    return rng.integers(1, num_genes, size=count)
+
+
+def one_point_mask(rng, count, num_genes, points=None):
+    """(count x num_genes) crossover mask: True before a random (or the given) cut point in each row."""
+    if points is None:
+        points = cut_points(rng, count, num_genes)
+    return np.arange(num_genes) < points[:, np.newaxis]
+
+
+def uniform_mask(rng, count, num_genes):
+    """(count x num_genes) crossover mask with each gene True with probability 0.5."""
+    return rng.random((count, num_genes)) < 0.5
+
+
+def one_point_crossover(rng, parents1, parents2):
+    """Row k of the result takes genes before a random cut point from parents1[k] and the rest from parents2[k]."""
+    return np.where(one_point_mask(rng, *parents1.shape), parents1, parents2)
+
+
+def uniform_crossover(rng, parents1, parents2):
+    """Each gene comes from parents1 or parents2 with equal probability."""
+    return np.where(uniform_mask(rng, *parents1.shape), parents1, parents2)
+
+
+def mutation_positions(rng, size, rate):
+    """
+    Sorted flat indices of the genes to mutate, each of size genes chosen independently with
+    probability rate. The gaps between chosen genes are geometric, so this draws about
+    size * rate numbers instead of one random number per gene.
+    """
+    if rate <= 0:
+        return np.empty(0, dtype=np.int64)
+    expected = size * rate
+    positions = np.cumsum(rng.geometric(rate, size=int(expected + 5 * expected ** 0.5) + 16)) - 1
+    while positions[-1] < size:  # Rarely needed: draw more gaps until past the last gene
+        more = np.cumsum(rng.geometric(rate, size=len(positions))) + positions[-1]
+        positions = np.concatenate([positions, more])
+    return positions[:np.searchsorted(positions, size)]
+
+
+def prefix_costs(costs, population):
+    """
+    (population size x num_classes + 1) running sums of every individual's gene costs:
+    entry [k, c] is the cost of the first c genes of individual k, so [k, 0] is 0 and
+    [k, num_classes] is its gene-cost fitness.
+    """
+    prefix = np.zeros((len(population), population.shape[1] + 1))
+    np.cumsum(costs[population, np.arange(population.shape[1])], axis=1, out=prefix[:, 1:])
+    return prefix
+
+
+def mutate(rng, population, rate, num_students):
+    """
+    Give each gene a random student with probability rate, in place. Returns the flat indices
+    mutated and the students those genes held before.
+    """
+    positions = mutation_positions(rng, population.size, rate)
+    replaced = population.take(positions)
+    np.put(population, positions, rng.integers(0, num_students, size=len(positions), dtype=population.dtype))
+    return positions, replaced
+
+
+
+
+class GeneticAlgorithm:
+    """
+    Batched genetic algorithm: selection, crossover and mutation each work on the whole
+    population array at once. All randomness comes from one np.random.Generator, so a
+    seed makes a run reproducible.
+    selection="truncation" breeds from the best half (as run.py always did); "tournament"
+    picks every parent by a tournament of tournament_size individuals.
+    The fitness is a sum of per-gene costs, so each individual keeps its score and children are
+    scored from their parents' prefix_costs() sums: a one-point child costs
+    prefix1[point] + (total2 - prefix2[point]) plus one delta per mutated gene, and the gene
+    costs are never summed again. The prefix sums of a child are only built if it is picked as
+    a parent, from its parents' sums and its mutations. Uniform crossover has no cut point, so it
+    carries the children's prefix sums instead. incremental=False rescores every gene from the
+    cost table each generation.
+    load_weight > 0 adds the makespan term of population_fitness(); the largest load depends on
+    the whole individual, so it is recomputed for the population in one np.bincount per generation.
+    """
+
+    def __init__(self, environment, population_size=50, mutation_rate=0.1, selection="truncation",
+                 crossover="one_point", tournament_size=2, seed=None, population=None, incremental=True, costs=None,
+                 load_weight=0.0):
+        if selection not in ("truncation", "tournament"):
+            raise ValueError(f"unknown selection {selection!r}")
+        if crossover not in ("one_point", "uniform"):
+            raise ValueError(f"unknown crossover {crossover!r}")
+        self.environment = environment
+        self.population_size = population_size
+        self.mutation_rate = mutation_rate
+        self.selection = selection
+        self.crossover = crossover
+        self.tournament_size = tournament_size
+        self.rng = np.random.default_rng(seed)
+        if population is None:
+            population = self.rng.integers(0, environment.num_students, size=(population_size, environment.num_classes),
+                                           dtype=np.int32)
+        self.population = population
+        self.costs = gene_costs(environment) if costs is None else costs  # Pass costs to reuse a gene_costs() table
+        self.incremental = incremental
+        self.load_weight = load_weight
+        self.times = effective_times(environment) if load_weight else None
+        # prefix holds prefix_costs() rows: of every individual while lineage is None, otherwise of
+        # the previous generation's parents, from which lineage rebuilds any current individual's
+        self.prefix = prefix_costs(self.costs, population) if incremental else None
+        self.lineage = None
+        self.gene_scores = self.prefix[:, -1].copy() if incremental else self.rescore()
+        self.scores = self.score()  # Scored once per generation
+        self.generation = 0
+
+    def select_parents(self):
+        """Two arrays of population indices; child k is bred from parents first[k] and second[k]."""
+        rng, size = self.rng, self.population_size
+        if self.selection == "tournament":
+            first = tournament_selection(rng, self.scores, size, self.tournament_size)
+            second = tournament_selection(rng, self.scores, size, self.tournament_size)
+        else:
+            selected = truncation_selection(self.scores, max(len(self.scores) // 2, 2))
+            # Two different parents from the selected half for every child
+            first = rng.integers(0, len(selected), size=size)
+            second = (first + rng.integers(1, len(selected), size=size)) % len(selected)
+            first, second = selected[first], selected[second]
+        return first, second
+
+    def parent_prefix(self, parents):
+        """prefix_costs() rows of the given individuals of the current population."""
+        if self.lineage is None:
+            return self.prefix[parents]
+        rows1, rows2, points, offsets, mutated_rows, mutated_columns, deltas = self.lineage
+        count, width = len(parents), self.prefix.shape[1]
+        # Up to its cut point a child's sums are its first parent's, after it its second parent's...
+        prefix = self.prefix[rows1[parents]]
+        np.copyto(prefix, self.prefix[rows2[parents]], where=np.arange(width) > points[parents, np.newaxis])
+        # ...shifted by the offset after the cut point and by each mutation's change in cost after its gene
+        slots = np.full(self.population_size, -1)
+        slots[parents] = np.arange(count)
+        kept = slots[mutated_rows] >= 0
+        steps = np.bincount(np.concatenate([np.arange(count) * width + points[parents] + 1,
+                                            slots[mutated_rows[kept]] * width + mutated_columns[kept] + 1]),
+                            np.concatenate([offsets[parents], deltas[kept]]), minlength=count * width)
+        steps = steps.reshape(count, width)
+        np.cumsum(steps, axis=1, out=steps)
+        prefix += steps
+        return prefix
+
+    def step(self):
+        """Breed the next generation and score it."""
+        first, second = self.select_parents()
+        size, num_classes = self.population_size, self.environment.num_classes
+        points = cut_points(self.rng, size, num_classes) if self.crossover == "one_point" else None
+        mask = one_point_mask(self.rng, size, num_classes, points) if points is not None else \
+            uniform_mask(self.rng, size, num_classes)
+        children = np.where(mask, self.population[first], self.population[second])
+        positions, replaced = mutate(self.rng, children, self.mutation_rate, self.environment.num_students)
+        if self.incremental:
+            self.gene_scores = self.bred_scores(first, second, points, mask, children, positions, replaced)
+            self.population = children
+        else:
+            self.population = children
+            self.gene_scores = self.rescore()
+        self.scores = self.score()
+        self.generation += 1
+
+    def bred_scores(self, first, second, points, mask, children, positions, replaced):
+        """
+        Gene-cost scores of children bred from first[k] and second[k] (cut at points[k], or by mask
+        when points is None) and then mutated at positions, from the parents' prefix sums.
+        Leaves prefix and lineage describing the children.
+        """
+        size, num_classes = children.shape
+        # Every distinct parent's prefix sums, built once; rows1[k] and rows2[k] are child k's parents
+        parents, rows = np.unique(np.concatenate([first, second]), return_inverse=True)
+        prefix = self.parent_prefix(parents)
+        rows1, rows2 = rows[:size], rows[size:]
+        mutated_rows, mutated_columns = np.divmod(positions, num_classes)
+        new_costs = self.costs[children.take(positions), mutated_columns]
+        if points is not None:
+            offsets = prefix[rows1, points] - prefix[rows2, points]
+            deltas = new_costs - self.costs[replaced, mutated_columns]  # One lookup pair per mutated gene
+            self.prefix = prefix
+            self.lineage = (rows1, rows2, points, offsets, mutated_rows, mutated_columns, deltas)
+            return prefix[rows2, -1] + offsets + np.bincount(mutated_rows, deltas, minlength=size)
+        # Uniform crossover: inherit the gene costs through the mask and keep the children's sums
+        inherited = np.diff(prefix, axis=1)
+        genes = np.where(mask, inherited[rows1], inherited[rows2])
+        np.put(genes, positions, new_costs)
+        self.prefix = np.zeros((size, num_classes + 1))
+        np.cumsum(genes, axis=1, out=self.prefix[:, 1:])
+        self.lineage = None
+        return self.prefix[:, -1].copy()
+
+    def rescore(self):
+        """Gene-cost scores of the current population looked up again from the cost table."""
+        return self.costs[self.population, np.arange(self.environment.num_classes)].sum(axis=1)
+
+    def score(self):
+        """Scores of the current population: the carried gene-cost scores plus the makespan term."""
+        scores = self.gene_scores.copy()
+        if self.load_weight:
+            scores += self.load_weight * population_loads(self.environment, self.population, self.times).max(axis=1)
+        return scores
+
+    def best(self):
+        """(individual, score) of the best individual of the current generation."""
+        index = np.argmin(self.scores)
+        return self.population[index], self.scores[index]
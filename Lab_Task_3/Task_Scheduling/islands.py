@@ -0,0 +1,210 @@
+# islands.py
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from environment import Environment
+from genetic import GeneticAlgorithm, gene_costs, population_fitness
+
+# Environment arrays the GA reads; they never change once the instance is generated
+SHARED_FIELDS = ("slot_durations", "class_priorities", "student_preferences", "student_class_preferences",
+                 "student_availability")
+
+# Environment and gene_costs() table attached by the pool initializer, once per worker process
+worker_environment = None
+worker_costs = None
+
+
+class SharedEnvironment:
+    """
+    The read-only Environment arrays copied once into a block of shared memory. handle is a
+    small picklable description (block name and array layout); attach_environment(handle) in
+    another process gives an Environment whose arrays are views of the same memory, so
+    workers never receive the matrices through pickling. close() frees the block.
+    """
+
+    def __init__(self, environment):
+        layout, size = [], 0
+        for name in SHARED_FIELDS:
+            array = np.ascontiguousarray(getattr(environment, name))
+            layout.append((name, array.dtype.str, array.shape, size))
+            size += -(-array.nbytes // 8) * 8  # Keep every array 8-byte aligned
+        self.memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, dtype, shape, offset in layout:
+            np.ndarray(shape, dtype, buffer=self.memory.buf, offset=offset)[...] = getattr(environment, name)
+        self.handle = (self.memory.name, environment.num_classes, environment.num_students, tuple(layout))
+
+    def close(self):
+        self.memory.close()
+        self.memory.unlink()
+
+
+def attach_environment(handle):
+    """An Environment backed by the shared block described by handle (no new instance is generated)."""
+    name, num_classes, num_students, layout = handle
+    memory = shared_memory.SharedMemory(name=name)
+    environment = Environment.__new__(Environment)
+    environment.num_classes = num_classes
+    environment.num_students = num_students
+    environment.memory = memory  # Keeps the block mapped as long as the environment lives
+    for field, dtype, shape, offset in layout:
+        view = np.ndarray(shape, dtype, buffer=memory.buf, offset=offset)
+        view.flags.writeable = False
+        setattr(environment, field, view)
+    return environment
+
+
+def init_worker(handle):
+    """Pool initializer: map the shared environment and build the cost table once per worker."""
+    global worker_environment, worker_costs
+    worker_environment = attach_environment(handle)
+    worker_costs = gene_costs(worker_environment)
+
+
+def evolve_island(environment, costs, job):
+    """
+    Run one island for a number of generations. job is (population, generations, seed, options);
+    returns the island's new population and its scores.
+    """
+    population, generations, seed, options = job
+    genetic_algorithm = GeneticAlgorithm(environment, len(population), seed=seed, population=population,
+                                         costs=costs, **options)
+    for _ in range(generations):
+        genetic_algorithm.step()
+    return genetic_algorithm.population, genetic_algorithm.scores
+
+
+def worker_evolve(job):
+    """Process-pool entry point: evolve one island against the worker's shared environment."""
+    return evolve_island(worker_environment, worker_costs, job)
+
+
+class IslandModel:
+    """
+    Island-model GA: islands populations of island_size evolve independently, in worker
+    processes when workers > 1. Every migration_interval generations the migrants best
+    individuals of each island replace the worst ones of the next island in a ring.
+    Workers get the environment through shared memory (SharedEnvironment) and only the
+    island populations travel between processes, once per migration interval.
+    Other keyword arguments (selection, crossover, ...) are passed to every GeneticAlgorithm.
+    """
+
+    def __init__(self, environment, islands=4, island_size=50, mutation_rate=0.1, migration_interval=10,
+                 migrants=2, workers=None, seed=None, **options):
+        if migrants >= island_size:
+            raise ValueError("migrants must be fewer than island_size")
+        self.environment = environment
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.workers = min(workers if workers is not None else (os.cpu_count() or 1), islands)
+        self.options = dict(options, mutation_rate=mutation_rate)
+        self.seed_sequence = np.random.SeedSequence(seed)
+        rngs = [np.random.default_rng(child) for child in self.seed_sequence.spawn(islands)]
+        self.populations = [rng.integers(0, environment.num_students, size=(island_size, environment.num_classes),
+                                         dtype=np.int32) for rng in rngs]
+        self.costs = gene_costs(environment)
+        self.scores = [population_fitness(environment, population, self.costs, options.get("load_weight", 0.0))
+                       for population in self.populations]
+        self.generation = 0
+        self.shared = None
+        self.pool = None
+
+    def start_pool(self):
+        if self.pool is None:
+            self.shared = SharedEnvironment(self.environment)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                            initargs=(self.shared.handle,))
+        return self.pool
+
+    def evolve(self, generations):
+        """Evolve every island for generations generations, without migrating."""
+        # Each (island, start generation) gets its own seed, so results don't depend on the worker count
+        entropy = self.seed_sequence.entropy
+        jobs = [(population, generations, np.random.SeedSequence(entropy, spawn_key=(island, self.generation)),
+                 self.options) for island, population in enumerate(self.populations)]
+        if self.workers <= 1:
+            results = [evolve_island(self.environment, self.costs, job) for job in jobs]
+        else:
+            results = list(self.start_pool().map(worker_evolve, jobs))
+        self.populations = [population for population, _ in results]
+        self.scores = [scores for _, scores in results]
+        self.generation += generations
+
+    def migrate(self):
+        """Ring migration: copies of each island's best individuals replace the next island's worst."""
+        count = self.migrants
+        if count == 0 or len(self.populations) < 2:
+            return
+        best = [np.argpartition(scores, count - 1)[:count] for scores in self.scores]
+        migrants = [(population[index], scores[index])
+                    for population, scores, index in zip(self.populations, self.scores, best)]
+        for island, (population, scores) in enumerate(zip(self.populations, self.scores)):
+            worst = np.argpartition(scores, len(scores) - count)[-count:]
+            population[worst], scores[worst] = migrants[island - 1]  # From the previous island in the ring
+
+    def run(self, generations):
+        """Evolve for generations generations, migrating every migration_interval generations."""
+        while generations > 0:
+            length = min(generations, self.migration_interval - self.generation % self.migration_interval)
+            self.evolve(length)
+            generations -= length
+            if self.generation % self.migration_interval == 0:
+                self.migrate()
+
+    def best(self):
+        """(individual, score) of the best individual over all islands."""
+        island = min(range(len(self.scores)), key=lambda index: self.scores[index].min())
+        index = np.argmin(self.scores[island])
+        return self.populations[island][index], self.scores[island][index]
+
+    def close(self):
+        """Shut down the worker processes and free the shared memory."""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.shared.close()
+            self.pool = self.shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the island-model GA headless on a random instance.")
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--students", type=int, default=5)
+    parser.add_argument("--islands", type=int, default=4)
+    parser.add_argument("--island-size", type=int, default=50)
+    parser.add_argument("--generations", type=int, default=100)
+    parser.add_argument("--migration-interval", type=int, default=10)
+    parser.add_argument("--migrants", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per CPU, at most one per island")
+    parser.add_argument("--load-weight", type=float, default=0.0, help="weight of the makespan term in the fitness")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    environment = Environment(args.classes, args.students, seed=args.seed)
+    start = time.perf_counter()
+    with IslandModel(environment, args.islands, args.island_size, migration_interval=args.migration_interval,
+                     migrants=args.migrants, workers=args.workers, seed=args.seed,
+                     load_weight=args.load_weight) as model:
+        model.run(args.generations)
+        best, score = model.best()
+    elapsed = time.perf_counter() - start
+    print(f"Best fitness after {args.generations} generations: {score:.4f}")
+    print(f"Best schedule (student per class): {best.tolist()}")
+    print(f"{args.generations * args.islands * args.island_size / elapsed:.0f} individual-generations/s "
+          f"with {model.workers} worker(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+# runner.py
+import threading
+from collections import deque, namedtuple
+
+# What the viewer needs from one generation. A new Snapshot is published after every generation
+# and never changed afterwards, so the viewer can read runner.snapshot at any time without a lock.
+Snapshot = namedtuple("Snapshot", ["generation", "current", "current_fitness", "best", "best_fitness", "recent",
+                                   "done"])
+
+
+class GeneticRunner(threading.Thread):
+    """
+    Runs a GeneticAlgorithm for a number of generations in a background thread, as fast as it
+    can (or with generation_delay milliseconds between generations, to watch it evolve).
+    After every generation it publishes a Snapshot: the generation's best individual and
+    fitness, the best found so far and the (generation, fitness) of the last recent
+    generations. The GA never waits for the viewer; stop() ends the run early.
+    """
+
+    def __init__(self, genetic_algorithm, generations, generation_delay=0, recent=5):
+        super().__init__(daemon=True)
+        self.genetic_algorithm = genetic_algorithm
+        self.generations = generations
+        self.generation_delay = generation_delay
+        self.recent = deque(maxlen=recent)
+        self.stop_event = threading.Event()
+        self.snapshot = None  # Latest Snapshot, None until the first generation is done
+
+    def run(self):
+        best, best_fitness = None, float("inf")
+        generation = 0
+        while generation < self.generations and not self.stop_event.is_set():
+            self.genetic_algorithm.step()
+            generation += 1
+            current, current_fitness = self.genetic_algorithm.best()
+            current = current.copy()  # The snapshot must not share memory with the population
+            if current_fitness < best_fitness:
+                best, best_fitness = current, current_fitness
+            self.recent.append((generation, current_fitness))
+            self.snapshot = Snapshot(generation, current, current_fitness, best, best_fitness, tuple(self.recent),
+                                     generation == self.generations)
+            if self.generation_delay:
+                self.stop_event.wait(self.generation_delay / 1000)
+        if self.snapshot is not None:
+            self.snapshot = self.snapshot._replace(done=True)
+
+    def stop(self):
+        """Stop after the current generation and wait for the thread to finish."""
+        self.stop_event.set()
+        if self.is_alive():
+            self.join()
@@ -0,0 +1,325 @@
+# solver.py
+import argparse
+import os
+import sys
+import time
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from agent import effective_times, student_loads
+from environment import Environment
+from genetic import gene_costs, mutate
+
+
+def load_capacities(environment, limit, weight=None):
+    """
+    How many classes of duration * priority weight each student can take within a load of
+    limit: limit * preference / weight, rounded down. The default weight is the heaviest
+    class, which gives counts that are safe for any choice of classes. Loads are weighted, so
+    an exact load limit is a generalized assignment problem (NP-hard); class counts are what
+    a flow can enforce exactly.
+    """
+    if weight is None:
+        weight = (environment.slot_durations * environment.class_priorities).max()
+    return np.floor(limit * environment.student_preferences / weight + 1e-9).astype(np.int64)
+
+
+def min_cost_assignment(environment, capacities, costs=None):
+    """
+    Exact minimum total gene_costs() assignment of every class to a student, with student s
+    taking at most capacities[s] classes. Raises ValueError if the capacities are too small.
+
+    Successive shortest paths, adding one class at a time. The residual graph is kept on
+    the student nodes only: the edge s -> t means "move one of s's classes to t", and its
+    cost is the cheapest such move. Dijkstra with potentials on this dense graph costs
+    O(students ** 2) per class, so the whole solve is O(classes * students ** 2) plus the
+    updates of the rows of students whose classes changed.
+    """
+    if costs is None:
+        costs = gene_costs(environment)
+    num_students, num_classes = costs.shape
+    capacities = np.minimum(np.asarray(capacities, dtype=np.int64), num_classes)
+    if capacities.sum() < num_classes:
+        raise ValueError(f"students can take {capacities.sum()} classes in total, {num_classes} are needed")
+
+    assignment = np.full(num_classes, -1, dtype=np.int64)
+    members = [[] for _ in range(num_students)]  # Classes held by each student
+    counts = np.zeros(num_students, dtype=np.int64)
+    moves = np.full((num_students, num_students), np.inf)      # Cheapest cost of moving a class from s to t
+    move_class = np.zeros((num_students, num_students), dtype=np.int64)  # ...and which class that is
+    potentials = np.zeros(num_students)
+    students = np.arange(num_students)
+
+    def refresh(student):
+        held = members[student]
+        if not held:
+            moves[student] = np.inf
+            return
+        held = np.array(held)
+        deltas = costs[:, held] - costs[student, held]
+        best = np.argmin(deltas, axis=1)
+        moves[student] = deltas[students, best]
+        move_class[student] = held[best]
+        moves[student, student] = np.inf
+
+    for class_index in range(num_classes):
+        # Dijkstra from the new class over reduced costs; the source potential keeps its edges >= 0
+        column = costs[:, class_index]
+        source_potential = np.max(potentials - column)
+        distances = column + source_potential - potentials
+        previous = np.full(num_students, -1)  # Previous student on the path, -1 for the new class itself
+        done = np.zeros(num_students, dtype=bool)
+        for _ in range(num_students):
+            student = np.argmin(np.where(done, np.inf, distances))
+            done[student] = True
+            candidates = distances[student] + moves[student] + potentials[student] - potentials
+            better = (candidates < distances) & ~done
+            distances[better] = candidates[better]
+            previous[better] = student
+
+        # The cheapest path ends at a student with room for one more class
+        open_students = np.flatnonzero(counts < capacities)
+        target = open_students[np.argmin((distances + potentials)[open_students])]
+        potentials += distances
+
+        # Shift one class along each edge of the path, then give the new class to the first student
+        changed = []
+        student = target
+        counts[target] += 1
+        while previous[student] >= 0:
+            origin = previous[student]
+            moved = move_class[origin, student]
+            members[origin].remove(moved)
+            members[student].append(moved)
+            assignment[moved] = student
+            changed.extend((origin, student))
+            student = origin
+        members[student].append(class_index)
+        assignment[class_index] = student
+        changed.append(student)
+        for student in set(changed):
+            refresh(student)
+    return assignment
+
+
+def repair_loads(environment, assignment, limit, costs=None, times=None):
+    """
+    Move classes off students whose load is over limit. Each step makes the cheapest single
+    move from the most loaded student to one with room for the class; when no single move
+    fits, the cheapest swap of one of its classes for a lighter one of another student.
+    Returns a new array; raises ValueError if neither helps.
+    """
+    if costs is None:
+        costs = gene_costs(environment)
+    if times is None:
+        times = effective_times(environment)
+    assignment = assignment.copy()
+    loads = student_loads(environment, assignment, times)
+    while loads.max() > limit + 1e-9:
+        student = np.argmax(loads)
+        held = np.flatnonzero(assignment == student)
+        increase = costs[:, held] - costs[student, held]
+        increase[loads[:, np.newaxis] + times[:, held] > limit] = np.inf
+        increase[student] = np.inf
+        target, column = np.unravel_index(np.argmin(increase), increase.shape)
+        if not np.isinf(increase[target, column]):
+            moved = held[column]
+            loads[student] -= times[student, moved]
+            loads[target] += times[target, moved]
+            assignment[moved] = target
+            continue
+        swap = best_swap(assignment, loads, student, held, limit, costs, times)
+        if swap is None:
+            raise ValueError(f"no single move or swap brings every student load within {limit}")
+        given, target, taken = swap
+        loads[student] += times[student, taken] - times[student, given]
+        loads[target] += times[target, given] - times[target, taken]
+        assignment[given], assignment[taken] = target, student
+    return assignment
+
+
+def best_swap(assignment, loads, student, held, limit, costs, times):
+    """
+    Cheapest (given class, other student, taken class) swap that lowers student's load and keeps
+    the other student within limit, or None if there is none.
+    """
+    best, best_increase = None, np.inf
+    for target in range(len(loads)):
+        if target == student:
+            continue
+        others = np.flatnonzero(assignment == target)
+        if not len(others):
+            continue
+        # Rows: the class student gives away; columns: the class it takes from target in return
+        new_student = loads[student] - times[student, held][:, np.newaxis] + times[student, others]
+        new_target = loads[target] + times[target, held][:, np.newaxis] - times[target, others]
+        increase = (costs[target, held] - costs[student, held])[:, np.newaxis] + \
+            (costs[student, others] - costs[target, others])
+        increase[(new_student >= loads[student] - 1e-12) | (new_target > limit)] = np.inf
+        row, column = np.unravel_index(np.argmin(increase), increase.shape)
+        if increase[row, column] < best_increase:
+            best, best_increase = (held[row], target, others[column]), increase[row, column]
+    return best
+
+
+def greedy_loads(environment, times=None):
+    """
+    Load-first schedule that ignores costs: classes in order of decreasing duration * priority,
+    each to the student whose load ends up smallest.
+    """
+    if times is None:
+        times = effective_times(environment)
+    loads = np.zeros(environment.num_students)
+    assignment = np.empty(environment.num_classes, dtype=np.int64)
+    for class_index in np.argsort(-(environment.slot_durations * environment.class_priorities), kind="stable"):
+        student = np.argmin(loads + times[:, class_index])
+        loads[student] += times[student, class_index]
+        assignment[class_index] = student
+    return assignment
+
+
+def improve_assignment(environment, assignment, limit, costs=None, times=None, passes=3):
+    """
+    Local search after min_cost_assignment(): move single classes to a cheaper student, and
+    swap two classes between students, wherever the loads stay within limit. Swaps help when
+    the limit is tight and no student has room for a move. Never makes the assignment worse
+    and never breaks the load limit; returns a new array.
+    """
+    if costs is None:
+        costs = gene_costs(environment)
+    if times is None:
+        times = effective_times(environment)
+    assignment = assignment.copy()
+    loads = student_loads(environment, assignment, times)
+    columns = np.arange(environment.num_classes)
+    cheapest = costs.min(axis=0)
+    for _ in range(passes):
+        improved = False
+        # How much each class costs above its cheapest student; a swap only gains if one of its classes has some
+        regret = costs[assignment, columns] - cheapest
+        for class_index in range(environment.num_classes):
+            student = assignment[class_index]
+            gains = costs[student, class_index] - costs[:, class_index]
+            gains[loads + times[:, class_index] > limit] = 0  # Moving there would overload the student
+            best = np.argmax(gains)
+            if gains[best] > 1e-12:
+                loads[student] -= times[student, class_index]
+                loads[best] += times[best, class_index]
+                assignment[class_index] = best
+                regret[class_index] = costs[best, class_index] - cheapest[class_index]
+                improved = True
+                continue
+            # Swap with other classes d: student takes d and d's student takes class_index
+            others = columns if regret[class_index] > 1e-12 else np.flatnonzero(regret > 1e-12)
+            targets = assignment[others]
+            new_loads = loads[student] - times[student, class_index] + times[student, others]
+            new_target_loads = loads[targets] - times[targets, others] + times[targets, class_index]
+            gains = costs[student, class_index] + costs[targets, others] - costs[targets, class_index] - \
+                costs[student, others]
+            gains[(targets == student) | (new_loads > limit) | (new_target_loads > limit)] = 0
+            if not len(gains):
+                continue
+            best = np.argmax(gains)
+            if gains[best] > 1e-12:
+                other, target = others[best], targets[best]
+                loads[student], loads[target] = new_loads[best], new_target_loads[best]
+                assignment[class_index], assignment[other] = target, student
+                regret[class_index] = costs[target, class_index] - cheapest[class_index]
+                regret[other] = costs[student, other] - cheapest[other]
+                improved = True
+        if not improved:
+            break
+    return assignment
+
+
+def solve(environment, limit=None, costs=None):
+    """
+    Heuristic schedule with every student's load at most limit (no limit if None). Loads are
+    weighted by effective time, so the exact problem is a generalized assignment problem
+    (NP-hard) that a flow cannot model: a flow unit is one class, but a class takes a
+    different share of each student's limit. Solves the class-count version exactly with
+    min_cost_assignment() and the safe load_capacities(), then improve_assignment() uses the
+    load room those counts leave. If the safe counts cannot hold every class, the counts are
+    sized for the average class (and scaled up with the student preferences until they hold
+    every class), repair_loads() fixes the students that end up over the limit, and the
+    repaired load-first greedy_loads() schedule is tried as well; the cheaper one is kept.
+    The result is always within the limit but is not guaranteed optimal: on small instances
+    checked by brute force it is usually optimal, but can cost tens of percent more when the
+    limit leaves almost no slack. The unlimited optimum is a lower bound.
+    Raises ValueError if the limit is provably too small (the classes need more time than
+    all students have, or one class takes longer than limit for every student), and also if
+    no candidate can be repaired to fit, which can happen under a very tight limit even
+    though a schedule exists.
+    Without a limit the result is the exact optimum (each class goes to its cheapest student).
+    """
+    if costs is None:
+        costs = gene_costs(environment)
+    if limit is None:
+        return np.argmin(costs, axis=0).astype(np.int32)
+    times = effective_times(environment)
+    shortest = times.min(axis=0)
+    if shortest.max() > limit or shortest.sum() > limit * environment.num_students:
+        raise ValueError(f"no schedule can keep every student load within {limit}")
+    candidates = []
+    capacities = load_capacities(environment, limit)
+    if capacities.sum() >= environment.num_classes:
+        candidates.append(min_cost_assignment(environment, capacities, costs))
+    else:
+        average = (environment.slot_durations * environment.class_priorities).mean()
+        preferences = environment.student_preferences
+        capacities = np.maximum(load_capacities(environment, limit, average),
+                                np.ceil(environment.num_classes * preferences / preferences.sum()).astype(np.int64))
+        for start in (min_cost_assignment(environment, capacities, costs), greedy_loads(environment, times)):
+            try:
+                candidates.append(repair_loads(environment, start, limit, costs, times))
+            except ValueError:
+                pass
+    if not candidates:
+        raise ValueError(f"no schedule found that keeps every student load within {limit} (the search is heuristic)")
+    columns = np.arange(environment.num_classes)
+    improved = [improve_assignment(environment, assignment, limit, costs, times) for assignment in candidates]
+    return min(improved, key=lambda assignment: costs[assignment, columns].sum()).astype(np.int32)
+
+
+def seeded_population(rng, assignment, size, mutation_rate, num_students):
+    """
+    An initial GA population around a solver schedule: row 0 is the schedule itself and the
+    other rows are copies mutated with mutation_rate, so the GA starts from the solution
+    and its neighbourhood.
+    """
+    population = np.tile(np.asarray(assignment, dtype=np.int32), (size, 1))
+    mutate(rng, population[1:], mutation_rate, num_students)
+    return population
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve a random instance with the min-cost-flow scheduler (heuristic under --limit).")
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--students", type=int, default=5)
+    parser.add_argument("--limit", type=float, default=None, help="largest effective-time load per student")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    environment = Environment(args.classes, args.students, seed=args.seed)
+    costs = gene_costs(environment)
+    start = time.perf_counter()
+    try:
+        assignment = solve(environment, args.limit, costs)
+    except ValueError as error:
+        print(f"No schedule: {error}")
+        return 1
+    elapsed = time.perf_counter() - start
+    loads = student_loads(environment, assignment)
+    print(f"Fitness: {costs[assignment, np.arange(args.classes)].sum():.4f} (solved in {elapsed:.3f} s)")
+    print(f"Largest student load: {loads.max():.2f}" + (f" (limit {args.limit})" if args.limit is not None else ""))
+    if args.limit is not None:
+        # Load limits make the problem NP-hard; the unlimited optimum bounds how far off the schedule can be
+        print(f"Lower bound (no limit): {costs.min(axis=0).sum():.4f}; the limited schedule is heuristic")
+    if args.classes <= 50:
+        print(f"Schedule (student per class): {assignment.tolist()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())